@@ -3,30 +3,55 @@
 # Add this section to your sandbox app
 # =========================================
 
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-from scipy import stats
 from collections import Counter
+from behaviour_analytics import AnalyticsCache, sequence_counts
+from lazy_imports import lazy_function, lazy_module
 
-def render_advanced_student_analysis(student_id: str):
+# Imported on first use by the analysis page rather than on every script run
+go = lazy_module("plotly.graph_objects")
+make_subplots = lazy_function("plotly.subplots", "make_subplots")
+stats = lazy_module("scipy.stats")
+
+ANALYTICS_CACHE_SIZE = 16
+
+
+def incident_data_version():
     """
-    Comprehensive analytics dashboard with 15+ visualizations
+    Version stamp for the session's incident data.
+    Hosts bump st.session_state.incident_data_version on edits; the list lengths
+    cover hosts that only ever append.
     """
-    student = get_student(student_id)
-    if not student:
-        st.error("No student selected.")
-        return
+    ss = st.session_state
+    return (ss.get("incident_data_version", 0), len(ss.incidents), len(ss.critical_incidents))
 
-    st.markdown(f"## 📊 Advanced Data Analysis — {student['name']}")
-    st.caption(f"{student['program']} program | Grade {student['grade']}")
+
+def student_record_version(student_id: str):
+    """The student's own fields, so a renamed or re-programmed student gets a fresh bundle."""
+    student = get_student(student_id) or {}
+    return tuple(sorted((field, str(value)) for field, value in student.items()))
+
+
+def get_student_analytics(student_id: str):
+    """Cached analytics bundle for a student; rebuilt when incident data or the student record changes."""
+    if "analytics_cache" not in st.session_state:
+        st.session_state.analytics_cache = AnalyticsCache(ANALYTICS_CACHE_SIZE)
+    key = (student_id, incident_data_version(), student_record_version(student_id))
+    return st.session_state.analytics_cache.get(key, lambda: build_student_analytics(student_id))
+
+
+def build_student_analytics(student_id: str):
+    """
+    Computes every metric, table and figure spec shown on the advanced analysis page.
+    Returns None when the student has no incidents.
+    """
+    student = get_student(student_id)
 
     # Get incidents
     quick = [i for i in st.session_state.incidents if i["student_id"] == student_id]
     crit = [c for c in st.session_state.critical_incidents if c["student_id"] == student_id]
 
     if not quick and not crit:
-        st.info("No incident data yet for this student.")
-        return
+        return None
 
     # Build unified dataframe
     quick_df = pd.DataFrame(quick) if quick else pd.DataFrame()
@@ -53,43 +78,28 @@ def render_advanced_student_analysis(student_id: str):
     full_df = pd.concat([quick_df, crit_df], ignore_index=True)
     full_df = full_df.sort_values("date_parsed")
 
-    # ==============================================
+    figures = {}
+
     # SECTION 1: EXECUTIVE SUMMARY
-    # ==============================================
-    st.markdown("## 📈 Executive Summary")
-    
-    col1, col2, col3, col4, col5 = st.columns(5)
-    with col1:
-        st.metric("Total Incidents", len(full_df))
-    with col2:
-        critical_count = len(full_df[full_df["incident_type"] == "Critical"])
-        st.metric("Critical", critical_count)
-    with col3:
-        avg_sev = round(full_df["severity"].mean(), 2)
-        st.metric("Avg Severity", avg_sev)
-    with col4:
-        days_span = (full_df["date_parsed"].max() - full_df["date_parsed"].min()).days + 1
-        st.metric("Days Tracked", days_span)
-    with col5:
-        incidents_per_day = round(len(full_df) / days_span, 2)
-        st.metric("Inc/Day", incidents_per_day)
+    days_span = (full_df["date_parsed"].max() - full_df["date_parsed"].min()).days + 1
+    summary = {
+        "total": len(full_df),
+        "critical": len(full_df[full_df["incident_type"] == "Critical"]),
+        "avg_severity": round(full_df["severity"].mean(), 2),
+        "days_span": days_span,
+        "per_day": round(len(full_df) / days_span, 2),
+        "trend": None,
+    }
 
     # Trend indicator
     if len(full_df) >= 2:
         recent_avg = full_df.tail(5)["severity"].mean()
         older_avg = full_df.head(5)["severity"].mean()
-        trend = "📈 Increasing" if recent_avg > older_avg else "📉 Decreasing" if recent_avg < older_avg else "➡️ Stable"
-        st.info(f"**Severity Trend (last 5 vs first 5):** {trend}")
+        summary["trend"] = "📈 Increasing" if recent_avg > older_avg else "📉 Decreasing" if recent_avg < older_avg else "➡️ Stable"
 
-    st.markdown("---")
-
-    # ==============================================
     # SECTION 2: TIME-SERIES ANALYSIS
-    # ==============================================
-    st.markdown("## ⏰ Time-Series Analysis")
 
     # 2.1 Daily incident frequency
-    st.markdown("### 📅 Incident Frequency Over Time")
     daily_counts = full_df.groupby(full_df["date_parsed"].dt.date).size().reset_index(name="count")
     fig1 = go.Figure()
     fig1.add_trace(go.Scatter(
@@ -107,15 +117,14 @@ def render_advanced_student_analysis(student_id: str):
         yaxis_title="Number of Incidents",
         hovermode='x unified'
     )
-    st.plotly_chart(fig1, use_container_width=True)
+    figures["daily"] = fig1.to_dict()
 
     # 2.2 Moving average (7-day)
     if len(full_df) >= 7:
-        st.markdown("### 📊 7-Day Moving Average (Smoothed Trend)")
         full_df["date_only"] = full_df["date_parsed"].dt.date
         daily = full_df.groupby("date_only").size().reset_index(name="count")
         daily["7d_avg"] = daily["count"].rolling(window=7, min_periods=1).mean()
-        
+
         fig2 = go.Figure()
         fig2.add_trace(go.Scatter(
             x=daily["date_only"],
@@ -136,16 +145,15 @@ def render_advanced_student_analysis(student_id: str):
             xaxis_title="Date",
             yaxis_title="Incidents",
         )
-        st.plotly_chart(fig2, use_container_width=True)
+        figures["moving_average"] = fig2.to_dict()
 
     # 2.3 Severity timeline with annotations
-    st.markdown("### 🎯 Severity Timeline (with Critical Incidents Highlighted)")
     fig3 = go.Figure()
-    
+
     # Regular incidents
     quick_only = full_df[full_df["incident_type"] == "Quick"]
     crit_only = full_df[full_df["incident_type"] == "Critical"]
-    
+
     if not quick_only.empty:
         fig3.add_trace(go.Scatter(
             x=quick_only["date_parsed"],
@@ -156,7 +164,7 @@ def render_advanced_student_analysis(student_id: str):
             hovertemplate='%{y} - %{text}<extra></extra>',
             text=quick_only["behaviour_type"]
         ))
-    
+
     if not crit_only.empty:
         fig3.add_trace(go.Scatter(
             x=crit_only["date_parsed"],
@@ -167,27 +175,21 @@ def render_advanced_student_analysis(student_id: str):
             hovertemplate='CRITICAL: %{text}<extra></extra>',
             text=crit_only["behaviour_type"]
         ))
-    
+
     fig3.update_layout(
         title="Severity Over Time (Quick vs Critical)",
         xaxis_title="Date",
         yaxis_title="Severity Level",
         yaxis=dict(range=[0, 6])
     )
-    st.plotly_chart(fig3, use_container_width=True)
+    figures["severity_timeline"] = fig3.to_dict()
 
-    st.markdown("---")
-
-    # ==============================================
     # SECTION 3: HEATMAPS & PATTERN ANALYSIS
-    # ==============================================
-    st.markdown("## 🔥 Heatmaps & Pattern Analysis")
 
     # 3.1 Day of week vs Time of day heatmap
-    st.markdown("### 🗓️ Day-of-Week × Time-of-Day Heatmap")
     full_df["hour"] = pd.to_datetime(full_df["time"], format="%H:%M:%S", errors="coerce").dt.hour
     full_df["day_of_week"] = full_df["date_parsed"].dt.day_name()
-    
+
     # Create pivot table
     day_order = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
     pivot = full_df.pivot_table(
@@ -198,7 +200,7 @@ def render_advanced_student_analysis(student_id: str):
         fill_value=0
     )
     pivot = pivot.reindex(day_order, fill_value=0)
-    
+
     fig4 = go.Figure(data=go.Heatmap(
         z=pivot.values,
         x=pivot.columns,
@@ -211,10 +213,9 @@ def render_advanced_student_analysis(student_id: str):
         xaxis_title="Hour of Day",
         yaxis_title="Day of Week"
     )
-    st.plotly_chart(fig4, use_container_width=True)
+    figures["day_hour_heatmap"] = fig4.to_dict()
 
     # 3.2 Location vs Session heatmap
-    st.markdown("### 📍 Location × Session Heatmap")
     loc_sess_pivot = full_df.pivot_table(
         values="severity",
         index="location",
@@ -222,7 +223,7 @@ def render_advanced_student_analysis(student_id: str):
         aggfunc="count",
         fill_value=0
     )
-    
+
     fig5 = go.Figure(data=go.Heatmap(
         z=loc_sess_pivot.values,
         x=loc_sess_pivot.columns,
@@ -235,24 +236,17 @@ def render_advanced_student_analysis(student_id: str):
         xaxis_title="Session",
         yaxis_title="Location"
     )
-    st.plotly_chart(fig5, use_container_width=True)
-
-    st.markdown("---")
+    figures["location_session_heatmap"] = fig5.to_dict()
 
-    # ==============================================
     # SECTION 4: BEHAVIOUR PATTERN ANALYSIS
-    # ==============================================
-    st.markdown("## 🧩 Behaviour Pattern Analysis")
 
     # 4.1 Antecedent-Behaviour co-occurrence
-    st.markdown("### 🔗 Antecedent → Behaviour Patterns")
-    
     ant_beh_counts = full_df.groupby(["antecedent", "behaviour_type"]).size().reset_index(name="count")
     ant_beh_counts = ant_beh_counts.sort_values("count", ascending=False).head(15)
-    
+
     fig6 = go.Figure(data=[go.Bar(
         x=ant_beh_counts["count"],
-        y=[f"{row['antecedent'][:30]}... → {row['behaviour_type']}" 
+        y=[f"{row['antecedent'][:30]}... → {row['behaviour_type']}"
            for _, row in ant_beh_counts.iterrows()],
         orientation='h',
         marker=dict(
@@ -265,12 +259,11 @@ def render_advanced_student_analysis(student_id: str):
         xaxis_title="Frequency",
         yaxis_title="Pattern"
     )
-    st.plotly_chart(fig6, use_container_width=True)
+    figures["antecedent_behaviour"] = fig6.to_dict()
 
     # 4.2 Behaviour type distribution (pie chart)
-    st.markdown("### 🥧 Behaviour Type Distribution")
     beh_counts = full_df["behaviour_type"].value_counts()
-    
+
     fig7 = go.Figure(data=[go.Pie(
         labels=beh_counts.index,
         values=beh_counts.values,
@@ -278,50 +271,37 @@ def render_advanced_student_analysis(student_id: str):
         marker=dict(colors=['#ef4444', '#f59e0b', '#10b981', '#3b82f6', '#8b5cf6', '#ec4899'])
     )])
     fig7.update_layout(title="Behaviour Type Breakdown")
-    st.plotly_chart(fig7, use_container_width=True)
+    figures["behaviour_pie"] = fig7.to_dict()
 
     # 4.3 Behaviour chains (sequences)
-    st.markdown("### 🔄 Behaviour Sequences (What Follows What)")
     if len(full_df) >= 3:
-        full_df_sorted = full_df.sort_values("date_parsed")
-        sequences = []
-        for i in range(len(full_df_sorted) - 1):
-            curr = full_df_sorted.iloc[i]["behaviour_type"]
-            next_beh = full_df_sorted.iloc[i + 1]["behaviour_type"]
-            sequences.append(f"{curr} → {next_beh}")
-        
-        seq_counts = pd.Series(sequences).value_counts().head(10)
-        
+        seq_counts = sequence_counts(full_df, "behaviour_type", n=2).head(10)
+
         fig8 = go.Figure(data=[go.Bar(
-            x=seq_counts.values,
-            y=seq_counts.index,
+            x=seq_counts["count"],
+            y=seq_counts["sequence"],
             orientation='h',
-            marker=dict(color='#8b5cf6')
+            marker=dict(color='#8b5cf6'),
+            customdata=seq_counts["probability"],
+            hovertemplate="%{y}: %{x} times (%{customdata:.0%} of the time)<extra></extra>"
         )])
         fig8.update_layout(
             title="Top 10 Behaviour Sequences",
             xaxis_title="Frequency",
             yaxis_title="Sequence"
         )
-        st.plotly_chart(fig8, use_container_width=True)
+        figures["sequences"] = fig8.to_dict()
 
-    st.markdown("---")
-
-    # ==============================================
     # SECTION 5: INTERVENTION EFFECTIVENESS
-    # ==============================================
-    st.markdown("## 🎯 Intervention Effectiveness Analysis")
 
     # 5.1 Intervention vs Severity (does intervention correlate with lower severity?)
-    st.markdown("### 📊 Intervention Success Rate (Severity Reduction)")
-    
     interv_sev = full_df.groupby("intervention").agg({
         "severity": ["mean", "count"]
     }).reset_index()
     interv_sev.columns = ["intervention", "avg_severity", "count"]
     interv_sev = interv_sev[interv_sev["count"] >= 2]  # Only interventions used 2+ times
     interv_sev = interv_sev.sort_values("avg_severity")
-    
+
     fig9 = go.Figure()
     fig9.add_trace(go.Bar(
         x=interv_sev["avg_severity"],
@@ -344,12 +324,10 @@ def render_advanced_student_analysis(student_id: str):
         yaxis_title="Intervention",
         xaxis=dict(range=[0, 5.5])
     )
-    st.plotly_chart(fig9, use_container_width=True)
+    figures["interventions"] = fig9.to_dict()
 
     # 5.2 Duration analysis
     if "duration_minutes" in full_df.columns:
-        st.markdown("### ⏱️ Incident Duration Analysis")
-        
         fig10 = go.Figure()
         fig10.add_trace(go.Box(
             y=full_df["duration_minutes"],
@@ -362,37 +340,19 @@ def render_advanced_student_analysis(student_id: str):
             yaxis_title="Duration (minutes)"
         )
         fig10.update_xaxes(tickangle=-45)
-        st.plotly_chart(fig10, use_container_width=True)
+        figures["duration"] = fig10.to_dict()
 
-    st.markdown("---")
-
-    # ==============================================
     # SECTION 6: PREDICTIVE INDICATORS
-    # ==============================================
-    st.markdown("## 🔮 Predictive Indicators & Risk Analysis")
 
-    # 6.1 Escalation pattern detection
-    st.markdown("### ⚠️ Escalation Pattern Detection")
-    
-    # Look at severity changes
+    # 6.1 Escalation pattern detection (severity changes)
     full_df["severity_change"] = full_df["severity"].diff()
     escalations = full_df[full_df["severity_change"] > 0]
-    
-    col1, col2 = st.columns(2)
-    with col1:
-        st.metric("Escalation Events", len(escalations))
-        st.caption("Times when severity increased from previous incident")
-    with col2:
-        if len(escalations) > 0:
-            avg_escalation = escalations["severity_change"].mean()
-            st.metric("Avg Escalation Jump", f"+{avg_escalation:.1f}")
-        else:
-            st.metric("Avg Escalation Jump", "N/A")
+    escalation = {
+        "events": len(escalations),
+        "avg_jump": escalations["severity_change"].mean() if len(escalations) > 0 else None,
+    }
 
     # 6.2 Risk score calculation
-    st.markdown("### 🎲 Current Risk Assessment")
-    
-    # Calculate risk factors
     recent_incidents = full_df.tail(5)
     risk_factors = {
         "Recent frequency": len(full_df.tail(7)) / 7,  # Last 7 days average
@@ -400,7 +360,7 @@ def render_advanced_student_analysis(student_id: str):
         "Critical incident rate": (len(full_df[full_df["incident_type"] == "Critical"]) / len(full_df)) * 100,
         "Escalation trend": 1 if len(full_df) >= 2 and full_df.tail(5)["severity"].mean() > full_df.head(5)["severity"].mean() else 0
     }
-    
+
     # Simple risk score (0-100)
     risk_score = min(100, int(
         (risk_factors["Recent frequency"] * 10) +
@@ -408,40 +368,24 @@ def render_advanced_student_analysis(student_id: str):
         (risk_factors["Critical incident rate"] * 0.5) +
         (risk_factors["Escalation trend"] * 20)
     ))
-    
-    # Color code
-    risk_color = "#10b981" if risk_score < 30 else "#f59e0b" if risk_score < 60 else "#ef4444"
-    risk_level = "LOW" if risk_score < 30 else "MODERATE" if risk_score < 60 else "HIGH"
-    
-    col1, col2, col3 = st.columns([2, 1, 1])
-    with col1:
-        st.markdown(f"### Overall Risk Score: <span style='color:{risk_color}; font-size:2em;'>{risk_score}/100</span>", 
-                   unsafe_allow_html=True)
-    with col2:
-        st.markdown(f"### Level: <span style='color:{risk_color};'>{risk_level}</span>", 
-                   unsafe_allow_html=True)
-    
-    with st.expander("📊 Risk Factor Breakdown"):
-        for factor, value in risk_factors.items():
-            st.metric(factor, f"{value:.2f}")
 
-    st.markdown("---")
+    # Color code
+    risk = {
+        "score": risk_score,
+        "color": "#10b981" if risk_score < 30 else "#f59e0b" if risk_score < 60 else "#ef4444",
+        "level": "LOW" if risk_score < 30 else "MODERATE" if risk_score < 60 else "HIGH",
+        "factors": risk_factors,
+    }
 
-    # ==============================================
     # SECTION 7: COMPARATIVE ANALYSIS
-    # ==============================================
-    st.markdown("## 📐 Comparative Analysis")
 
-    # 7.1 Student vs Program Average
-    st.markdown("### 👥 Student vs Program Cohort")
-    
-    # Get all students in same program
+    # 7.1 Student vs Program Average (all students in same program)
     program_students = [s["id"] for s in st.session_state.students if s["program"] == student["program"]]
     program_incidents = [i for i in st.session_state.incidents if i["student_id"] in program_students]
-    
+
     if len(program_incidents) > 0:
         program_df = pd.DataFrame(program_incidents)
-        
+
         comparison = pd.DataFrame({
             "Metric": ["Incidents", "Avg Severity", "Critical %"],
             "This Student": [
@@ -455,7 +399,7 @@ def render_advanced_student_analysis(student_id: str):
                 round((len(program_df[program_df["severity"] >= 4]) / len(program_df)) * 100, 1)
             ]
         })
-        
+
         fig11 = go.Figure()
         fig11.add_trace(go.Bar(
             name='This Student',
@@ -473,22 +417,14 @@ def render_advanced_student_analysis(student_id: str):
             title="Student vs Program Comparison",
             barmode='group'
         )
-        st.plotly_chart(fig11, use_container_width=True)
-
-    st.markdown("---")
+        figures["cohort_comparison"] = fig11.to_dict()
 
-    # ==============================================
     # SECTION 8: ABC HYPOTHESIS ANALYSIS
-    # ==============================================
-    st.markdown("## 🧠 Functional Behaviour Analysis")
-
-    # 8.1 Function distribution
+    primary_function = None
     if "hypothesis" in full_df.columns:
-        st.markdown("### 🎯 Hypothesized Functions (ABC Analysis)")
-        
         # Extract function from hypothesis
         functions = full_df["hypothesis"].value_counts()
-        
+
         fig12 = go.Figure(data=[go.Bar(
             x=functions.values,
             y=functions.index,
@@ -502,35 +438,14 @@ def render_advanced_student_analysis(student_id: str):
             xaxis_title="Frequency",
             yaxis_title="Function"
         )
-        st.plotly_chart(fig12, use_container_width=True)
+        figures["functions"] = fig12.to_dict()
 
         # Most common function
-        top_function = functions.index[0]
-        st.info(f"**Primary Function:** {top_function} ({functions.values[0]} incidents, "
-               f"{(functions.values[0]/len(full_df)*100):.1f}% of total)")
-
-    st.markdown("---")
+        primary_function = (functions.index[0], functions.values[0],
+                            functions.values[0] / len(full_df) * 100)
 
-    # ==============================================
     # SECTION 9: REPORTING & EXPORT
-    # ==============================================
-    st.markdown("## 📄 Data Export & Reporting")
-
-    col1, col2, col3 = st.columns(3)
-    
-    with col1:
-        # Download CSV
-        csv = full_df.to_csv(index=False)
-        st.download_button(
-            label="📥 Download Full Dataset (CSV)",
-            data=csv,
-            file_name=f"{student['name']}_incidents.csv",
-            mime="text/csv"
-        )
-    
-    with col2:
-        # Summary report
-        summary = f"""
+    summary_text = f"""
 INCIDENT SUMMARY REPORT
 Student: {student['name']}
 Program: {student['program']} | Grade: {student['grade']}
@@ -548,11 +463,202 @@ TOP PATTERNS:
 - Highest Risk Location: {full_df['location'].mode()[0]}
 - Highest Risk Session: {full_df['session'].mode()[0]}
 
-RISK LEVEL: {risk_level} ({risk_score}/100)
+RISK LEVEL: {risk['level']} ({risk_score}/100)
 """
+
+    return {
+        "summary": summary,
+        "figures": figures,
+        "escalation": escalation,
+        "risk": risk,
+        "primary_function": primary_function,
+        "csv": full_df.to_csv(index=False),
+        "summary_text": summary_text,
+    }
+
+
+def render_advanced_student_analysis(student_id: str):
+    """
+    Comprehensive analytics dashboard with 15+ visualizations
+    """
+    student = get_student(student_id)
+    if not student:
+        st.error("No student selected.")
+        return
+
+    st.markdown(f"## 📊 Advanced Data Analysis — {student['name']}")
+    st.caption(f"{student['program']} program | Grade {student['grade']}")
+
+    analytics = get_student_analytics(student_id)
+    if analytics is None:
+        st.info("No incident data yet for this student.")
+        return
+
+    summary = analytics["summary"]
+    figures = analytics["figures"]
+    risk = analytics["risk"]
+
+    # ==============================================
+    # SECTION 1: EXECUTIVE SUMMARY
+    # ==============================================
+    st.markdown("## 📈 Executive Summary")
+    
+    col1, col2, col3, col4, col5 = st.columns(5)
+    with col1:
+        st.metric("Total Incidents", summary["total"])
+    with col2:
+        st.metric("Critical", summary["critical"])
+    with col3:
+        st.metric("Avg Severity", summary["avg_severity"])
+    with col4:
+        st.metric("Days Tracked", summary["days_span"])
+    with col5:
+        st.metric("Inc/Day", summary["per_day"])
+
+    # Trend indicator
+    if summary["trend"]:
+        st.info(f"**Severity Trend (last 5 vs first 5):** {summary['trend']}")
+
+    st.markdown("---")
+
+    # ==============================================
+    # SECTION 2: TIME-SERIES ANALYSIS
+    # ==============================================
+    st.markdown("## ⏰ Time-Series Analysis")
+
+    st.markdown("### 📅 Incident Frequency Over Time")
+    st.plotly_chart(figures["daily"], use_container_width=True)
+
+    if "moving_average" in figures:
+        st.markdown("### 📊 7-Day Moving Average (Smoothed Trend)")
+        st.plotly_chart(figures["moving_average"], use_container_width=True)
+
+    st.markdown("### 🎯 Severity Timeline (with Critical Incidents Highlighted)")
+    st.plotly_chart(figures["severity_timeline"], use_container_width=True)
+
+    st.markdown("---")
+
+    # ==============================================
+    # SECTION 3: HEATMAPS & PATTERN ANALYSIS
+    # ==============================================
+    st.markdown("## 🔥 Heatmaps & Pattern Analysis")
+
+    st.markdown("### 🗓️ Day-of-Week × Time-of-Day Heatmap")
+    st.plotly_chart(figures["day_hour_heatmap"], use_container_width=True)
+
+    st.markdown("### 📍 Location × Session Heatmap")
+    st.plotly_chart(figures["location_session_heatmap"], use_container_width=True)
+
+    st.markdown("---")
+
+    # ==============================================
+    # SECTION 4: BEHAVIOUR PATTERN ANALYSIS
+    # ==============================================
+    st.markdown("## 🧩 Behaviour Pattern Analysis")
+
+    st.markdown("### 🔗 Antecedent → Behaviour Patterns")
+    st.plotly_chart(figures["antecedent_behaviour"], use_container_width=True)
+
+    st.markdown("### 🥧 Behaviour Type Distribution")
+    st.plotly_chart(figures["behaviour_pie"], use_container_width=True)
+
+    st.markdown("### 🔄 Behaviour Sequences (What Follows What)")
+    if "sequences" in figures:
+        st.plotly_chart(figures["sequences"], use_container_width=True)
+
+    st.markdown("---")
+
+    # ==============================================
+    # SECTION 5: INTERVENTION EFFECTIVENESS
+    # ==============================================
+    st.markdown("## 🎯 Intervention Effectiveness Analysis")
+
+    st.markdown("### 📊 Intervention Success Rate (Severity Reduction)")
+    st.plotly_chart(figures["interventions"], use_container_width=True)
+
+    if "duration" in figures:
+        st.markdown("### ⏱️ Incident Duration Analysis")
+        st.plotly_chart(figures["duration"], use_container_width=True)
+
+    st.markdown("---")
+
+    # ==============================================
+    # SECTION 6: PREDICTIVE INDICATORS
+    # ==============================================
+    st.markdown("## 🔮 Predictive Indicators & Risk Analysis")
+
+    st.markdown("### ⚠️ Escalation Pattern Detection")
+    escalation = analytics["escalation"]
+    col1, col2 = st.columns(2)
+    with col1:
+        st.metric("Escalation Events", escalation["events"])
+        st.caption("Times when severity increased from previous incident")
+    with col2:
+        if escalation["avg_jump"] is not None:
+            st.metric("Avg Escalation Jump", f"+{escalation['avg_jump']:.1f}")
+        else:
+            st.metric("Avg Escalation Jump", "N/A")
+
+    st.markdown("### 🎲 Current Risk Assessment")
+    col1, col2, col3 = st.columns([2, 1, 1])
+    with col1:
+        st.markdown(f"### Overall Risk Score: <span style='color:{risk['color']}; font-size:2em;'>{risk['score']}/100</span>", 
+                   unsafe_allow_html=True)
+    with col2:
+        st.markdown(f"### Level: <span style='color:{risk['color']};'>{risk['level']}</span>", 
+                   unsafe_allow_html=True)
+    
+    with st.expander("📊 Risk Factor Breakdown"):
+        for factor, value in risk["factors"].items():
+            st.metric(factor, f"{value:.2f}")
+
+    st.markdown("---")
+
+    # ==============================================
+    # SECTION 7: COMPARATIVE ANALYSIS
+    # ==============================================
+    st.markdown("## 📐 Comparative Analysis")
+
+    st.markdown("### 👥 Student vs Program Cohort")
+    if "cohort_comparison" in figures:
+        st.plotly_chart(figures["cohort_comparison"], use_container_width=True)
+
+    st.markdown("---")
+
+    # ==============================================
+    # SECTION 8: ABC HYPOTHESIS ANALYSIS
+    # ==============================================
+    st.markdown("## 🧠 Functional Behaviour Analysis")
+
+    if analytics["primary_function"]:
+        st.markdown("### 🎯 Hypothesized Functions (ABC Analysis)")
+        st.plotly_chart(figures["functions"], use_container_width=True)
+
+        top_function, top_count, top_pct = analytics["primary_function"]
+        st.info(f"**Primary Function:** {top_function} ({top_count} incidents, "
+               f"{top_pct:.1f}% of total)")
+
+    st.markdown("---")
+
+    # ==============================================
+    # SECTION 9: REPORTING & EXPORT
+    # ==============================================
+    st.markdown("## 📄 Data Export & Reporting")
+
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        st.download_button(
+            label="📥 Download Full Dataset (CSV)",
+            data=analytics["csv"],
+            file_name=f"{student['name']}_incidents.csv",
+            mime="text/csv"
+        )
+    
+    with col2:
         st.download_button(
             label="📄 Download Summary Report (TXT)",
-            data=summary,
+            data=analytics["summary_text"],
             file_name=f"{student['name']}_summary.txt",
             mime="text/plain"
         )
@@ -576,3 +682,6 @@ RISK LEVEL: {risk_level} ({risk_score}/100)
 # In your main() router, add:
 # elif page == "advanced_analysis":
 #     render_advanced_student_analysis(st.session_state.selected_student_id)
+
+# Wherever incidents or critical incidents are added or edited, add:
+# st.session_state.incident_data_version = st.session_state.get("incident_data_version", 0) + 1
@@ -1,17 +1,18 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
 from datetime import datetime, date, time, timedelta
 import uuid
-import random
 from collections import Counter
-from docx import Document
-from docx.shared import Inches, Pt, RGBColor
-from docx.enum.text import WD_ALIGN_PARAGRAPH
 from io import BytesIO
+from behaviour_analytics import AnalyticsCache, sequence_counts
+from lazy_imports import lazy_function, lazy_module
+from synthetic_incidents import generate_incident_frame, to_records
+
+# Heavy libraries load when an analysis page first needs them, not at login
+px = lazy_module("plotly.express")
+go = lazy_module("plotly.graph_objects")
+make_subplots = lazy_function("plotly.subplots", "make_subplots")
 
 # =========================================
 # CONFIG + CONSTANTS
@@ -296,6 +297,8 @@ def init_state():
         ss.incidents = generate_mock_incidents(70)
     if "critical_incidents" not in ss:
         ss.critical_incidents = []
+    if "incident_data_version" not in ss:
+        ss.incident_data_version = 0
     if "selected_program" not in ss:
         ss.selected_program = "JP"
     if "selected_student_id" not in ss:
@@ -374,8 +377,6 @@ def calculate_age(dob_str: str):
 
 def generate_mock_incidents(n: int = 70):
     """Create random quick incidents so the analysis page has something to show."""
-    incidents = []
-    
     # Weight certain students to have more incidents for realistic patterns
     student_weights = {
         "stu_jp1": 8,
@@ -388,50 +389,17 @@ def generate_mock_incidents(n: int = 70):
         "stu_sy2": 9,
         "stu_sy3": 6,
     }
-    
-    student_pool = []
-    for stu in MOCK_STUDENTS:
-        weight = student_weights.get(stu["id"], 5)
-        student_pool.extend([stu] * weight)
-    
-    for _ in range(n):
-        stu = random.choice(student_pool)
-        beh = random.choice(BEHAVIOUR_TYPES)
-        ant = random.choice(ANTECEDENTS)
-        loc = random.choice(LOCATIONS)
-        support = random.choice(SUPPORT_TYPES)
-        interv = random.choice(INTERVENTIONS)
-        
-        # More realistic severity distribution
-        sev = random.choices([1, 2, 3, 4, 5], weights=[20, 35, 25, 15, 5])[0]
-
-        dt = datetime.now() - timedelta(days=random.randint(0, 90))
-        t_hour = random.choices([9, 10, 11, 12, 13, 14, 15], weights=[10, 15, 12, 8, 12, 18, 10])[0]
-        dt = dt.replace(hour=t_hour, minute=random.randint(0, 59), second=0)
-
-        incidents.append(
-            {
-                "id": str(uuid.uuid4()),
-                "student_id": stu["id"],
-                "student_name": stu["name"],
-                "date": dt.date().isoformat(),
-                "time": dt.time().strftime("%H:%M:%S"),
-                "day": dt.strftime("%A"),
-                "session": get_session_from_time(dt.time()),
-                "location": loc,
-                "behaviour_type": beh,
-                "antecedent": ant,
-                "support_type": support,
-                "intervention": interv,
-                "severity": sev,
-                "reported_by": random.choice(MOCK_STAFF)["name"],
-                "additional_staff": [],
-                "description": "Auto-generated mock incident.",
-                "hypothesis": generate_simple_function(ant, beh),
-                "is_critical": sev >= 4,
-                "duration_minutes": random.randint(2, 25),
-            }
-        )
+
+    frame = generate_incident_frame(
+        n, students=MOCK_STUDENTS, student_weights=student_weights, behaviour_focus=0,
+        behaviours=BEHAVIOUR_TYPES, antecedents=ANTECEDENTS, interventions=INTERVENTIONS,
+        support_types=SUPPORT_TYPES, locations=LOCATIONS, staff=[s["name"] for s in MOCK_STAFF],
+    )
+    incidents = to_records(frame, "app")
+    for inc in incidents:
+        inc["additional_staff"] = []
+        inc["description"] = "Auto-generated mock incident."
+        inc["hypothesis"] = generate_simple_function(inc["antecedent"], inc["behaviour_type"])
     return incidents
 
 
@@ -479,6 +447,10 @@ def generate_simple_function(antecedent: str, behaviour: str) -> str:
 
 def generate_behaviour_analysis_plan_docx(student, full_df, top_ant, top_beh, top_loc, top_session, risk_score, risk_level):
     """Generate a Word document for Behaviour Analysis Plan"""
+    from docx import Document
+    from docx.shared import Inches, Pt, RGBColor
+    from docx.enum.text import WD_ALIGN_PARAGRAPH
+
     doc = Document()
     
     # Title
@@ -816,6 +788,7 @@ def render_incident_log_page():
             "is_critical": severity >= 4,
         }
         st.session_state.incidents.append(rec)
+        st.session_state.incident_data_version += 1
         st.success("✅ Incident saved (sandbox).")
 
         if severity >= 4:
@@ -982,6 +955,7 @@ def render_critical_incident_page():
             "recommendations": recommendations,
         }
         st.session_state.critical_incidents.append(record)
+        st.session_state.incident_data_version += 1
         st.success("✅ Critical incident saved (sandbox).")
 
         col1, col2 = st.columns(2)
@@ -997,30 +971,46 @@ def render_critical_incident_page():
 # ADVANCED STUDENT ANALYSIS PAGE
 # =========================================
 
-def render_student_analysis_page():
+ANALYTICS_CACHE_SIZE = 16
+
+
+def incident_data_version():
     """
-    Comprehensive analytics dashboard with 20+ visualizations
+    Version stamp for the session's incident data.
+    Hosts bump st.session_state.incident_data_version on edits; the list lengths
+    cover hosts that only ever append.
     """
-    student_id = st.session_state.get("selected_student_id")
-    student = get_student(student_id)
-    if not student:
-        st.error("No student selected.")
-        if st.button("Back to landing"):
-            go_to("landing")
-        return
+    ss = st.session_state
+    return (ss.get("incident_data_version", 0), len(ss.incidents), len(ss.critical_incidents))
 
-    st.markdown(f"## 📊 Advanced Data Analysis — {student['name']}")
-    st.caption(f"{student['program']} program | Grade {student['grade']}")
+
+def student_record_version(student_id: str):
+    """The student's own fields, so a renamed or re-programmed student gets a fresh bundle."""
+    student = get_student(student_id) or {}
+    return tuple(sorted((field, str(value)) for field, value in student.items()))
+
+
+def get_student_analytics(student_id: str):
+    """Cached analytics bundle for a student; rebuilt when incident data or the student record changes."""
+    if "analytics_cache" not in st.session_state:
+        st.session_state.analytics_cache = AnalyticsCache(ANALYTICS_CACHE_SIZE)
+    key = (student_id, incident_data_version(), student_record_version(student_id))
+    return st.session_state.analytics_cache.get(key, lambda: build_student_analytics(student_id))
+
+
+def build_student_analytics(student_id: str):
+    """
+    Computes every metric, table and figure spec shown on the advanced analysis page.
+    Returns None when the student has no incidents.
+    """
+    student = get_student(student_id)
 
     # Get incidents
     quick = [i for i in st.session_state.incidents if i["student_id"] == student_id]
     crit = [c for c in st.session_state.critical_incidents if c["student_id"] == student_id]
 
     if not quick and not crit:
-        st.info("No incident data yet for this student.")
-        if st.button("Log first incident"):
-            go_to("incident_log", selected_student_id=student_id)
-        return
+        return None
 
     # Build unified dataframe
     quick_df = pd.DataFrame(quick) if quick else pd.DataFrame()
@@ -1047,43 +1037,28 @@ def render_student_analysis_page():
     full_df = pd.concat([quick_df, crit_df], ignore_index=True)
     full_df = full_df.sort_values("date_parsed")
 
-    # ==============================================
+    figures = {}
+
     # SECTION 1: EXECUTIVE SUMMARY
-    # ==============================================
-    st.markdown("## 📈 Executive Summary")
-    
-    col1, col2, col3, col4, col5 = st.columns(5)
-    with col1:
-        st.metric("Total Incidents", len(full_df))
-    with col2:
-        critical_count = len(full_df[full_df["incident_type"] == "Critical"])
-        st.metric("Critical", critical_count)
-    with col3:
-        avg_sev = round(full_df["severity"].mean(), 2)
-        st.metric("Avg Severity", avg_sev)
-    with col4:
-        days_span = (full_df["date_parsed"].max() - full_df["date_parsed"].min()).days + 1
-        st.metric("Days Tracked", days_span)
-    with col5:
-        incidents_per_day = round(len(full_df) / days_span, 2)
-        st.metric("Inc/Day", incidents_per_day)
+    days_span = (full_df["date_parsed"].max() - full_df["date_parsed"].min()).days + 1
+    summary = {
+        "total": len(full_df),
+        "critical": len(full_df[full_df["incident_type"] == "Critical"]),
+        "avg_severity": round(full_df["severity"].mean(), 2),
+        "days_span": days_span,
+        "per_day": round(len(full_df) / days_span, 2),
+        "trend": None,
+    }
 
     # Trend indicator
     if len(full_df) >= 2:
         recent_avg = full_df.tail(5)["severity"].mean()
         older_avg = full_df.head(5)["severity"].mean()
-        trend = "📈 Increasing" if recent_avg > older_avg else "📉 Decreasing" if recent_avg < older_avg else "➡️ Stable"
-        st.info(f"**Severity Trend (last 5 vs first 5):** {trend}")
+        summary["trend"] = "📈 Increasing" if recent_avg > older_avg else "📉 Decreasing" if recent_avg < older_avg else "➡️ Stable"
 
-    st.markdown("---")
-
-    # ==============================================
     # SECTION 2: TIME-SERIES ANALYSIS
-    # ==============================================
-    st.markdown("## ⏰ Time-Series Analysis")
 
     # 2.1 Daily incident frequency
-    st.markdown("### 📅 Incident Frequency Over Time")
     daily_counts = full_df.groupby(full_df["date_parsed"].dt.date).size().reset_index(name="count")
     fig1 = go.Figure()
     fig1.add_trace(go.Scatter(
@@ -1101,15 +1076,14 @@ def render_student_analysis_page():
         yaxis_title="Number of Incidents",
         hovermode='x unified'
     )
-    st.plotly_chart(fig1, use_container_width=True)
+    figures["daily"] = fig1.to_dict()
 
     # 2.2 Moving average (7-day)
     if len(full_df) >= 7:
-        st.markdown("### 📊 7-Day Moving Average (Smoothed Trend)")
         full_df["date_only"] = full_df["date_parsed"].dt.date
         daily = full_df.groupby("date_only").size().reset_index(name="count")
         daily["7d_avg"] = daily["count"].rolling(window=7, min_periods=1).mean()
-        
+
         fig2 = go.Figure()
         fig2.add_trace(go.Scatter(
             x=daily["date_only"],
@@ -1130,16 +1104,15 @@ def render_student_analysis_page():
             xaxis_title="Date",
             yaxis_title="Incidents",
         )
-        st.plotly_chart(fig2, use_container_width=True)
+        figures["moving_average"] = fig2.to_dict()
 
     # 2.3 Severity timeline with annotations
-    st.markdown("### 🎯 Severity Timeline (with Critical Incidents Highlighted)")
     fig3 = go.Figure()
-    
+
     # Regular incidents
     quick_only = full_df[full_df["incident_type"] == "Quick"]
     crit_only = full_df[full_df["incident_type"] == "Critical"]
-    
+
     if not quick_only.empty:
         fig3.add_trace(go.Scatter(
             x=quick_only["date_parsed"],
@@ -1150,7 +1123,7 @@ def render_student_analysis_page():
             hovertemplate='%{y} - %{text}<extra></extra>',
             text=quick_only["behaviour_type"]
         ))
-    
+
     if not crit_only.empty:
         fig3.add_trace(go.Scatter(
             x=crit_only["date_parsed"],
@@ -1161,27 +1134,21 @@ def render_student_analysis_page():
             hovertemplate='CRITICAL: %{text}<extra></extra>',
             text=crit_only["behaviour_type"]
         ))
-    
+
     fig3.update_layout(
         title="Severity Over Time (Quick vs Critical)",
         xaxis_title="Date",
         yaxis_title="Severity Level",
         yaxis=dict(range=[0, 6])
     )
-    st.plotly_chart(fig3, use_container_width=True)
+    figures["severity_timeline"] = fig3.to_dict()
 
-    st.markdown("---")
-
-    # ==============================================
     # SECTION 3: HEATMAPS & PATTERN ANALYSIS
-    # ==============================================
-    st.markdown("## 🔥 Heatmaps & Pattern Analysis")
 
     # 3.1 Day of week vs Time of day heatmap
-    st.markdown("### 🗓️ Day-of-Week × Time-of-Day Heatmap")
     full_df["hour"] = pd.to_datetime(full_df["time"], format="%H:%M:%S", errors="coerce").dt.hour
     full_df["day_of_week"] = full_df["date_parsed"].dt.day_name()
-    
+
     # Create pivot table
     day_order = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
     pivot = full_df.pivot_table(
@@ -1192,7 +1159,7 @@ def render_student_analysis_page():
         fill_value=0
     )
     pivot = pivot.reindex(day_order, fill_value=0)
-    
+
     fig4 = go.Figure(data=go.Heatmap(
         z=pivot.values,
         x=pivot.columns,
@@ -1205,10 +1172,9 @@ def render_student_analysis_page():
         xaxis_title="Hour of Day",
         yaxis_title="Day of Week"
     )
-    st.plotly_chart(fig4, use_container_width=True)
+    figures["day_hour_heatmap"] = fig4.to_dict()
 
     # 3.2 Location vs Session heatmap
-    st.markdown("### 📍 Location × Session Heatmap")
     loc_sess_pivot = full_df.pivot_table(
         values="severity",
         index="location",
@@ -1216,7 +1182,7 @@ def render_student_analysis_page():
         aggfunc="count",
         fill_value=0
     )
-    
+
     fig5 = go.Figure(data=go.Heatmap(
         z=loc_sess_pivot.values,
         x=loc_sess_pivot.columns,
@@ -1229,24 +1195,17 @@ def render_student_analysis_page():
         xaxis_title="Session",
         yaxis_title="Location"
     )
-    st.plotly_chart(fig5, use_container_width=True)
+    figures["location_session_heatmap"] = fig5.to_dict()
 
-    st.markdown("---")
-
-    # ==============================================
     # SECTION 4: BEHAVIOUR PATTERN ANALYSIS
-    # ==============================================
-    st.markdown("## 🧩 Behaviour Pattern Analysis")
 
     # 4.1 Antecedent-Behaviour co-occurrence
-    st.markdown("### 🔗 Antecedent → Behaviour Patterns")
-    
     ant_beh_counts = full_df.groupby(["antecedent", "behaviour_type"]).size().reset_index(name="count")
     ant_beh_counts = ant_beh_counts.sort_values("count", ascending=False).head(15)
-    
+
     fig6 = go.Figure(data=[go.Bar(
         x=ant_beh_counts["count"],
-        y=[f"{row['antecedent'][:30]}... → {row['behaviour_type']}" 
+        y=[f"{row['antecedent'][:30]}... → {row['behaviour_type']}"
            for _, row in ant_beh_counts.iterrows()],
         orientation='h',
         marker=dict(
@@ -1259,12 +1218,11 @@ def render_student_analysis_page():
         xaxis_title="Frequency",
         yaxis_title="Pattern"
     )
-    st.plotly_chart(fig6, use_container_width=True)
+    figures["antecedent_behaviour"] = fig6.to_dict()
 
     # 4.2 Behaviour type distribution (pie chart)
-    st.markdown("### 🥧 Behaviour Type Distribution")
     beh_counts = full_df["behaviour_type"].value_counts()
-    
+
     fig7 = go.Figure(data=[go.Pie(
         labels=beh_counts.index,
         values=beh_counts.values,
@@ -1272,50 +1230,37 @@ def render_student_analysis_page():
         marker=dict(colors=['#ef4444', '#f59e0b', '#10b981', '#3b82f6', '#8b5cf6', '#ec4899'])
     )])
     fig7.update_layout(title="Behaviour Type Breakdown")
-    st.plotly_chart(fig7, use_container_width=True)
+    figures["behaviour_pie"] = fig7.to_dict()
 
     # 4.3 Behaviour chains (sequences)
-    st.markdown("### 🔄 Behaviour Sequences (What Follows What)")
     if len(full_df) >= 3:
-        full_df_sorted = full_df.sort_values("date_parsed")
-        sequences = []
-        for i in range(len(full_df_sorted) - 1):
-            curr = full_df_sorted.iloc[i]["behaviour_type"]
-            next_beh = full_df_sorted.iloc[i + 1]["behaviour_type"]
-            sequences.append(f"{curr} → {next_beh}")
-        
-        seq_counts = pd.Series(sequences).value_counts().head(10)
-        
+        seq_counts = sequence_counts(full_df, "behaviour_type", n=2).head(10)
+
         fig8 = go.Figure(data=[go.Bar(
-            x=seq_counts.values,
-            y=seq_counts.index,
+            x=seq_counts["count"],
+            y=seq_counts["sequence"],
             orientation='h',
-            marker=dict(color='#8b5cf6')
+            marker=dict(color='#8b5cf6'),
+            customdata=seq_counts["probability"],
+            hovertemplate="%{y}: %{x} times (%{customdata:.0%} of the time)<extra></extra>"
         )])
         fig8.update_layout(
             title="Top 10 Behaviour Sequences",
             xaxis_title="Frequency",
             yaxis_title="Sequence"
         )
-        st.plotly_chart(fig8, use_container_width=True)
-
-    st.markdown("---")
+        figures["sequences"] = fig8.to_dict()
 
-    # ==============================================
     # SECTION 5: INTERVENTION EFFECTIVENESS
-    # ==============================================
-    st.markdown("## 🎯 Intervention Effectiveness Analysis")
 
-    # 5.1 Intervention vs Severity
-    st.markdown("### 📊 Intervention Success Rate (Severity Reduction)")
-    
+    # 5.1 Intervention vs Severity (does intervention correlate with lower severity?)
     interv_sev = full_df.groupby("intervention").agg({
         "severity": ["mean", "count"]
     }).reset_index()
     interv_sev.columns = ["intervention", "avg_severity", "count"]
-    interv_sev = interv_sev[interv_sev["count"] >= 2]
+    interv_sev = interv_sev[interv_sev["count"] >= 2]  # Only interventions used 2+ times
     interv_sev = interv_sev.sort_values("avg_severity")
-    
+
     fig9 = go.Figure()
     fig9.add_trace(go.Bar(
         x=interv_sev["avg_severity"],
@@ -1338,12 +1283,10 @@ def render_student_analysis_page():
         yaxis_title="Intervention",
         xaxis=dict(range=[0, 5.5])
     )
-    st.plotly_chart(fig9, use_container_width=True)
+    figures["interventions"] = fig9.to_dict()
 
     # 5.2 Duration analysis
     if "duration_minutes" in full_df.columns:
-        st.markdown("### ⏱️ Incident Duration Analysis")
-        
         fig10 = go.Figure()
         fig10.add_trace(go.Box(
             y=full_df["duration_minutes"],
@@ -1356,77 +1299,49 @@ def render_student_analysis_page():
             yaxis_title="Duration (minutes)"
         )
         fig10.update_xaxes(tickangle=-45)
-        st.plotly_chart(fig10, use_container_width=True)
+        figures["duration"] = fig10.to_dict()
 
-    st.markdown("---")
-
-    # ==============================================
     # SECTION 6: PREDICTIVE INDICATORS
-    # ==============================================
-    st.markdown("## 🔮 Predictive Indicators & Risk Analysis")
 
-    # 6.1 Escalation pattern detection
-    st.markdown("### ⚠️ Escalation Pattern Detection")
-    
+    # 6.1 Escalation pattern detection (severity changes)
     full_df["severity_change"] = full_df["severity"].diff()
     escalations = full_df[full_df["severity_change"] > 0]
-    
-    col1, col2 = st.columns(2)
-    with col1:
-        st.metric("Escalation Events", len(escalations))
-        st.caption("Times when severity increased from previous incident")
-    with col2:
-        if len(escalations) > 0:
-            avg_escalation = escalations["severity_change"].mean()
-            st.metric("Avg Escalation Jump", f"+{avg_escalation:.1f}")
-        else:
-            st.metric("Avg Escalation Jump", "N/A")
+    escalation = {
+        "events": len(escalations),
+        "avg_jump": escalations["severity_change"].mean() if len(escalations) > 0 else None,
+    }
 
     # 6.2 Risk score calculation
-    st.markdown("### 🎲 Current Risk Assessment")
-    
     recent_incidents = full_df.tail(5)
     risk_factors = {
-        "Recent frequency": len(full_df.tail(7)) / 7,
+        "Recent frequency": len(full_df.tail(7)) / 7,  # Last 7 days average
         "Recent avg severity": recent_incidents["severity"].mean(),
         "Critical incident rate": (len(full_df[full_df["incident_type"] == "Critical"]) / len(full_df)) * 100,
         "Escalation trend": 1 if len(full_df) >= 2 and full_df.tail(5)["severity"].mean() > full_df.head(5)["severity"].mean() else 0
     }
-    
+
+    # Simple risk score (0-100)
     risk_score = min(100, int(
         (risk_factors["Recent frequency"] * 10) +
         (risk_factors["Recent avg severity"] * 8) +
         (risk_factors["Critical incident rate"] * 0.5) +
         (risk_factors["Escalation trend"] * 20)
     ))
-    
-    risk_color = "#10b981" if risk_score < 30 else "#f59e0b" if risk_score < 60 else "#ef4444"
-    risk_level = "LOW" if risk_score < 30 else "MODERATE" if risk_score < 60 else "HIGH"
-    
-    col1, col2, col3 = st.columns([2, 1, 1])
-    with col1:
-        st.markdown(f"### Overall Risk Score: <span style='color:{risk_color}; font-size:2em;'>{risk_score}/100</span>", 
-                   unsafe_allow_html=True)
-    with col2:
-        st.markdown(f"### Level: <span style='color:{risk_color};'>{risk_level}</span>", 
-                   unsafe_allow_html=True)
-    
-    with st.expander("📊 Risk Factor Breakdown"):
-        for factor, value in risk_factors.items():
-            st.metric(factor, f"{value:.2f}")
 
-    st.markdown("---")
+    # Color code
+    risk = {
+        "score": risk_score,
+        "color": "#10b981" if risk_score < 30 else "#f59e0b" if risk_score < 60 else "#ef4444",
+        "level": "LOW" if risk_score < 30 else "MODERATE" if risk_score < 60 else "HIGH",
+        "factors": risk_factors,
+    }
 
-    # ==============================================
     # SECTION 7: ABC HYPOTHESIS ANALYSIS
-    # ==============================================
-    st.markdown("## 🧠 Functional Behaviour Analysis")
-
+    primary_function = None
     if "hypothesis" in full_df.columns:
-        st.markdown("### 🎯 Hypothesized Functions (ABC Analysis)")
-        
+        # Extract function from hypothesis
         functions = full_df["hypothesis"].value_counts()
-        
+
         fig12 = go.Figure(data=[go.Bar(
             x=functions.values,
             y=functions.index,
@@ -1440,107 +1355,296 @@ def render_student_analysis_page():
             xaxis_title="Frequency",
             yaxis_title="Function"
         )
-        st.plotly_chart(fig12, use_container_width=True)
+        figures["functions"] = fig12.to_dict()
 
-        top_function = functions.index[0]
-        st.info(f"**Primary Function:** {top_function} ({functions.values[0]} incidents, "
-               f"{(functions.values[0]/len(full_df)*100):.1f}% of total)")
+        # Most common function
+        primary_function = (functions.index[0], functions.values[0],
+                            functions.values[0] / len(full_df) * 100)
+
+    # SECTION 8: CLINICAL INTERPRETATION
+    top_ant = full_df["antecedent"].mode()[0] if len(full_df["antecedent"]) > 0 else "Unknown"
+    top_beh = full_df["behaviour_type"].mode()[0] if len(full_df["behaviour_type"]) > 0 else "Unknown"
+    top_loc = full_df["location"].mode()[0] if len(full_df["location"]) > 0 else "Unknown"
+    top_session = full_df["session"].mode()[0] if len(full_df["session"]) > 0 else "Unknown"
+
+    total = len(full_df)
+    crit_total = len(full_df[full_df["incident_type"] == "Critical"])
+    crit_rate = (crit_total / total) * 100 if total > 0 else 0
+
+    full_sorted = full_df.sort_values("date_parsed")
+    if len(full_sorted) >= 2:
+        first_sev = full_sorted["severity"].iloc[0]
+        last_sev = full_sorted["severity"].iloc[-1]
+        if last_sev > first_sev:
+            severity_trend = "increasing over time"
+        elif last_sev < first_sev:
+            severity_trend = "decreasing over time"
+        else:
+            severity_trend = "relatively stable over time"
+    else:
+        severity_trend = "unable to determine (limited data)"
+
+    clinical = {
+        "top_ant": top_ant,
+        "top_beh": top_beh,
+        "top_loc": top_loc,
+        "top_session": top_session,
+        "quick_total": total - crit_total,
+        "crit_total": crit_total,
+        "crit_rate": crit_rate,
+        "severity_trend": severity_trend,
+    }
+
+    # SECTION 9: DATA EXPORT
+    csv = full_df.to_csv(index=False)
+
+    return {
+        "summary": summary,
+        "figures": figures,
+        "escalation": escalation,
+        "risk": risk,
+        "primary_function": primary_function,
+        "clinical": clinical,
+        "csv": csv,
+        # Built only when the plan is downloaded, not on every cache miss
+        "docx": lambda: generate_behaviour_analysis_plan_docx(
+            student, full_df, top_ant, top_beh, top_loc, top_session, risk_score, risk["level"]
+        ).getvalue(),
+    }
+
+
+def render_student_analysis_page():
+    """
+    Comprehensive analytics dashboard with 20+ visualizations
+    """
+    student_id = st.session_state.get("selected_student_id")
+    student = get_student(student_id)
+    if not student:
+        st.error("No student selected.")
+        if st.button("Back to landing"):
+            go_to("landing")
+        return
+
+    st.markdown(f"## 📊 Advanced Data Analysis — {student['name']}")
+    st.caption(f"{student['program']} program | Grade {student['grade']}")
+
+    analytics = get_student_analytics(student_id)
+    if analytics is None:
+        st.info("No incident data yet for this student.")
+        if st.button("Log first incident"):
+            go_to("incident_log", selected_student_id=student_id)
+        return
+
+    summary = analytics["summary"]
+    figures = analytics["figures"]
+    risk = analytics["risk"]
+
+    # ==============================================
+    # SECTION 1: EXECUTIVE SUMMARY
+    # ==============================================
+    st.markdown("## 📈 Executive Summary")
+    
+    col1, col2, col3, col4, col5 = st.columns(5)
+    with col1:
+        st.metric("Total Incidents", summary["total"])
+    with col2:
+        st.metric("Critical", summary["critical"])
+    with col3:
+        st.metric("Avg Severity", summary["avg_severity"])
+    with col4:
+        st.metric("Days Tracked", summary["days_span"])
+    with col5:
+        st.metric("Inc/Day", summary["per_day"])
+
+    # Trend indicator
+    if summary["trend"]:
+        st.info(f"**Severity Trend (last 5 vs first 5):** {summary['trend']}")
 
     st.markdown("---")
 
     # ==============================================
-    # SECTION 8: CLINICAL INTERPRETATION
+    # SECTION 2: TIME-SERIES ANALYSIS
+    # ==============================================
+    st.markdown("## ⏰ Time-Series Analysis")
+
+    st.markdown("### 📅 Incident Frequency Over Time")
+    st.plotly_chart(figures["daily"], use_container_width=True)
+
+    if "moving_average" in figures:
+        st.markdown("### 📊 7-Day Moving Average (Smoothed Trend)")
+        st.plotly_chart(figures["moving_average"], use_container_width=True)
+
+    st.markdown("### 🎯 Severity Timeline (with Critical Incidents Highlighted)")
+    st.plotly_chart(figures["severity_timeline"], use_container_width=True)
+
+    st.markdown("---")
+
+    # ==============================================
+    # SECTION 3: HEATMAPS & PATTERN ANALYSIS
     # ==============================================
-    if not full_df.empty:
-        top_ant = full_df["antecedent"].mode()[0] if len(full_df["antecedent"]) > 0 else "Unknown"
-        top_beh = full_df["behaviour_type"].mode()[0] if len(full_df["behaviour_type"]) > 0 else "Unknown"
-        top_loc = full_df["location"].mode()[0] if len(full_df["location"]) > 0 else "Unknown"
-        top_session = full_df["session"].mode()[0] if len(full_df["session"]) > 0 else "Unknown"
-
-        total = len(full_df)
-        crit_total = len(full_df[full_df["incident_type"] == "Critical"])
-        quick_total = total - crit_total
-        crit_rate = (crit_total / total) * 100 if total > 0 else 0
-
-        full_sorted = full_df.sort_values("date_parsed")
-        if len(full_sorted) >= 2:
-            first_sev = full_sorted["severity"].iloc[0]
-            last_sev = full_sorted["severity"].iloc[-1]
-            if last_sev > first_sev:
-                severity_trend = "increasing over time"
-            elif last_sev < first_sev:
-                severity_trend = "decreasing over time"
-            else:
-                severity_trend = "relatively stable over time"
+    st.markdown("## 🔥 Heatmaps & Pattern Analysis")
+
+    st.markdown("### 🗓️ Day-of-Week × Time-of-Day Heatmap")
+    st.plotly_chart(figures["day_hour_heatmap"], use_container_width=True)
+
+    st.markdown("### 📍 Location × Session Heatmap")
+    st.plotly_chart(figures["location_session_heatmap"], use_container_width=True)
+
+    st.markdown("---")
+
+    # ==============================================
+    # SECTION 4: BEHAVIOUR PATTERN ANALYSIS
+    # ==============================================
+    st.markdown("## 🧩 Behaviour Pattern Analysis")
+
+    st.markdown("### 🔗 Antecedent → Behaviour Patterns")
+    st.plotly_chart(figures["antecedent_behaviour"], use_container_width=True)
+
+    st.markdown("### 🥧 Behaviour Type Distribution")
+    st.plotly_chart(figures["behaviour_pie"], use_container_width=True)
+
+    st.markdown("### 🔄 Behaviour Sequences (What Follows What)")
+    if "sequences" in figures:
+        st.plotly_chart(figures["sequences"], use_container_width=True)
+
+    st.markdown("---")
+
+    # ==============================================
+    # SECTION 5: INTERVENTION EFFECTIVENESS
+    # ==============================================
+    st.markdown("## 🎯 Intervention Effectiveness Analysis")
+
+    st.markdown("### 📊 Intervention Success Rate (Severity Reduction)")
+    st.plotly_chart(figures["interventions"], use_container_width=True)
+
+    if "duration" in figures:
+        st.markdown("### ⏱️ Incident Duration Analysis")
+        st.plotly_chart(figures["duration"], use_container_width=True)
+
+    st.markdown("---")
+
+    # ==============================================
+    # SECTION 6: PREDICTIVE INDICATORS
+    # ==============================================
+    st.markdown("## 🔮 Predictive Indicators & Risk Analysis")
+
+    st.markdown("### ⚠️ Escalation Pattern Detection")
+    escalation = analytics["escalation"]
+    col1, col2 = st.columns(2)
+    with col1:
+        st.metric("Escalation Events", escalation["events"])
+        st.caption("Times when severity increased from previous incident")
+    with col2:
+        if escalation["avg_jump"] is not None:
+            st.metric("Avg Escalation Jump", f"+{escalation['avg_jump']:.1f}")
         else:
-            severity_trend = "unable to determine (limited data)"
+            st.metric("Avg Escalation Jump", "N/A")
 
-        st.markdown("## 🧠 Clinical Interpretation & Next Steps")
+    st.markdown("### 🎲 Current Risk Assessment")
+    col1, col2, col3 = st.columns([2, 1, 1])
+    with col1:
+        st.markdown(f"### Overall Risk Score: <span style='color:{risk['color']}; font-size:2em;'>{risk['score']}/100</span>", 
+                   unsafe_allow_html=True)
+    with col2:
+        st.markdown(f"### Level: <span style='color:{risk['color']};'>{risk['level']}</span>", 
+                   unsafe_allow_html=True)
+    
+    with st.expander("📊 Risk Factor Breakdown"):
+        for factor, value in risk["factors"].items():
+            st.metric(factor, f"{value:.2f}")
 
-        st.markdown("### 1. Summary of Data Findings")
+    st.markdown("---")
 
-        st.markdown(
-            f"- **Primary concern:** **{top_beh}** is the most frequently recorded behaviour of concern."
-        )
-        st.markdown(
-            f"- **Key triggers:** The most common antecedent is **{top_ant}**, "
-            f"indicating this context regularly precedes dysregulation."
-        )
-        st.markdown(
-            f"- **Hotspot locations:** Incidents most often occur in **{top_loc}**, "
-            f"particularly during the **{top_session}** session."
-        )
-        st.markdown(
-            f"- **Incident profile:** {quick_total} quick incidents and {crit_total} "
-            f"critical incidents have been recorded (critical incidents = "
-            f"**{crit_rate:.1f}%** of all incidents)."
-        )
-        st.markdown(
-            f"- **Severity trend:** Overall severity appears **{severity_trend}**."
-        )
+    # ==============================================
+    # SECTION 7: ABC HYPOTHESIS ANALYSIS
+    # ==============================================
+    st.markdown("## 🧠 Functional Behaviour Analysis")
 
-        st.markdown("### 2. Clinical Interpretation (Trauma-Informed)")
-
-        clinical_text = (
-            f"Patterns suggest that {student['name']} is most vulnerable when **{top_ant}** "
-            f"occurs, often in the **{top_loc}** during **{top_session}**. These moments "
-            "likely narrow the student's window of tolerance, increasing the risk of "
-            "fight/flight responses such as the identified behaviour.\n\n"
-            "Through a **trauma-informed lens**, this behaviour is understood as a safety "
-            "strategy rather than wilful defiance. CPI emphasises staying in the **Supportive** "
-            "phase as early as possible — calm body language, non-threatening stance and "
-            "minimal verbal load.\n\n"
-            "The **Berry Street Education Model** (Body, Relationship, Stamina, Engagement) "
-            "points towards strengthening **Body** (regulation routines, predictable transitions) "
-            "and **Relationship** (connection before correction). SMART trauma principles "
-            "highlight the importance of predictability, relational safety and reducing cognitive "
-            "load during known trigger times."
-        )
-        st.info(clinical_text)
-
-        st.markdown("### 3. Next Steps & Recommendations")
-
-        next_steps = (
-            "1. **Proactive regulation around key triggers**  \n"
-            f"   - Provide a brief check-in and clear visual cue before **{top_ant}**.  \n"
-            "   - Offer a regulated start (breathing, movement, sensory tool) before the "
-            f"high-risk **{top_session}** session.\n\n"
-            "2. **Co-regulation & staff responses (CPI aligned)**  \n"
-            "   - Use CPI Supportive stance, low slow voice and minimal language when early "
-            "signs of escalation appear.  \n"
-            "   - Reduce audience by moving peers where possible and maintain connection with "
-            "one key adult.\n\n"
-            "3. **Teaching replacement skills (Australian Curriculum – General Capabilities)**  \n"
-            "   - Link goals to **Personal and Social Capability** (self-management & "
-            "social management).  \n"
-            "   - Explicitly teach and rehearse a help-seeking routine the student can use "
-            "in place of the behaviour (e.g., card, phrase, movement to a safe space).\n\n"
-            "4. **SMART-style goal example**  \n"
-            "   - *Over the next 5 weeks, during identified trigger times, the student will "
-            "use an agreed help-seeking strategy instead of the behaviour of concern in "
-            "4 out of 5 opportunities, with co-regulation support from staff.*"
-        )
-        st.success(next_steps)
+    if analytics["primary_function"]:
+        st.markdown("### 🎯 Hypothesized Functions (ABC Analysis)")
+        st.plotly_chart(figures["functions"], use_container_width=True)
+
+        top_function, top_count, top_pct = analytics["primary_function"]
+        st.info(f"**Primary Function:** {top_function} ({top_count} incidents, "
+               f"{top_pct:.1f}% of total)")
+
+    st.markdown("---")
+
+    # ==============================================
+    # SECTION 8: CLINICAL INTERPRETATION
+    # ==============================================
+    clinical = analytics["clinical"]
+    top_ant, top_beh = clinical["top_ant"], clinical["top_beh"]
+    top_loc, top_session = clinical["top_loc"], clinical["top_session"]
+    quick_total, crit_total = clinical["quick_total"], clinical["crit_total"]
+    crit_rate, severity_trend = clinical["crit_rate"], clinical["severity_trend"]
+
+    st.markdown("## 🧠 Clinical Interpretation & Next Steps")
+
+    st.markdown("### 1. Summary of Data Findings")
+
+    st.markdown(
+        f"- **Primary concern:** **{top_beh}** is the most frequently recorded behaviour of concern."
+    )
+    st.markdown(
+        f"- **Key triggers:** The most common antecedent is **{top_ant}**, "
+        f"indicating this context regularly precedes dysregulation."
+    )
+    st.markdown(
+        f"- **Hotspot locations:** Incidents most often occur in **{top_loc}**, "
+        f"particularly during the **{top_session}** session."
+    )
+    st.markdown(
+        f"- **Incident profile:** {quick_total} quick incidents and {crit_total} "
+        f"critical incidents have been recorded (critical incidents = "
+        f"**{crit_rate:.1f}%** of all incidents)."
+    )
+    st.markdown(
+        f"- **Severity trend:** Overall severity appears **{severity_trend}**."
+    )
+
+    st.markdown("### 2. Clinical Interpretation (Trauma-Informed)")
+
+    clinical_text = (
+        f"Patterns suggest that {student['name']} is most vulnerable when **{top_ant}** "
+        f"occurs, often in the **{top_loc}** during **{top_session}**. These moments "
+        "likely narrow the student's window of tolerance, increasing the risk of "
+        "fight/flight responses such as the identified behaviour.\n\n"
+        "Through a **trauma-informed lens**, this behaviour is understood as a safety "
+        "strategy rather than wilful defiance. CPI emphasises staying in the **Supportive** "
+        "phase as early as possible — calm body language, non-threatening stance and "
+        "minimal verbal load.\n\n"
+        "The **Berry Street Education Model** (Body, Relationship, Stamina, Engagement) "
+        "points towards strengthening **Body** (regulation routines, predictable transitions) "
+        "and **Relationship** (connection before correction). SMART trauma principles "
+        "highlight the importance of predictability, relational safety and reducing cognitive "
+        "load during known trigger times."
+    )
+    st.info(clinical_text)
+
+    st.markdown("### 3. Next Steps & Recommendations")
+
+    next_steps = (
+        "1. **Proactive regulation around key triggers**  \n"
+        f"   - Provide a brief check-in and clear visual cue before **{top_ant}**.  \n"
+        "   - Offer a regulated start (breathing, movement, sensory tool) before the "
+        f"high-risk **{top_session}** session.\n\n"
+        "2. **Co-regulation & staff responses (CPI aligned)**  \n"
+        "   - Use CPI Supportive stance, low slow voice and minimal language when early "
+        "signs of escalation appear.  \n"
+        "   - Reduce audience by moving peers where possible and maintain connection with "
+        "one key adult.\n\n"
+        "3. **Teaching replacement skills (Australian Curriculum – General Capabilities)**  \n"
+        "   - Link goals to **Personal and Social Capability** (self-management & "
+        "social management).  \n"
+        "   - Explicitly teach and rehearse a help-seeking routine the student can use "
+        "in place of the behaviour (e.g., card, phrase, movement to a safe space).\n\n"
+        "4. **SMART-style goal example**  \n"
+        "   - *Over the next 5 weeks, during identified trigger times, the student will "
+        "use an agreed help-seeking strategy instead of the behaviour of concern in "
+        "4 out of 5 opportunities, with co-regulation support from staff.*"
+    )
+    st.success(next_steps)
 
     # ==============================================
     # SECTION 9: DATA EXPORT
@@ -1551,27 +1655,21 @@ def render_student_analysis_page():
     col1, col2 = st.columns(2)
     
     with col1:
-        csv = full_df.to_csv(index=False)
         st.download_button(
             label="📥 Download Full Dataset (CSV)",
-            data=csv,
+            data=analytics["csv"],
             file_name=f"{student['name']}_incidents.csv",
             mime="text/csv"
         )
     
     with col2:
-        # Generate Word document
-        docx_file = generate_behaviour_analysis_plan_docx(
-            student, full_df, top_ant, top_beh, top_loc, top_session, risk_score, risk_level
+        # The Word document is generated when the button is clicked
+        st.download_button(
+            label="📄 Download Behaviour Analysis Plan (Word)",
+            data=analytics["docx"],
+            file_name=f"Behaviour_Analysis_Plan_{student['name'].replace(' ', '_')}.docx",
+            mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document"
         )
-        
-        if docx_file:
-            st.download_button(
-                label="📄 Download Behaviour Analysis Plan (Word)",
-                data=docx_file,
-                file_name=f"Behaviour_Analysis_Plan_{student['name'].replace(' ', '_')}.docx",
-                mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document"
-            )
 
     st.markdown("---")
     if st.button("⬅ Back to Students", type="primary"):
@@ -1594,9 +1692,8 @@ def render_program_overview_page():
     df = pd.DataFrame(incidents)
     df["date_parsed"] = pd.to_datetime(df["date"])
     
-    df["program"] = df["student_id"].apply(
-        lambda sid: next((s["program"] for s in st.session_state.students if s["id"] == sid), "Unknown")
-    )
+    program_by_student = {s["id"]: s["program"] for s in st.session_state.students}
+    df["program"] = df["student_id"].map(program_by_student).fillna("Unknown")
     
     col1, col2, col3 = st.columns(3)
     with col1:
@@ -1,12 +1,16 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import plotly.graph_objects as go
+from lazy_imports import lazy_module
 from datetime import datetime, date, time, timedelta
 import uuid
-import random
 from collections import Counter
 from io import BytesIO
+from synthetic_incidents import generate_incident_frame, to_records
+from behaviour_plan_report import build_behaviour_plan_docx, generate_plans_zip, plan_findings, plan_statistics
+
+# Charts load on the analysis page's first render, not at login
+go = lazy_module("plotly.graph_objects")
 
 st.set_page_config(page_title="CLC Behaviour Support", page_icon="📊", layout="wide", initial_sidebar_state="collapsed")
 
@@ -153,147 +157,46 @@ def send_critical_incident_email(incident_data, student, staff_email, manager_em
 *(In production, this sends via SMTP)*
     """)
 
-def generate_behaviour_analysis_plan_docx(student, full_df, top_ant, top_beh, top_loc, top_session, risk_score, risk_level):
+def generate_behaviour_analysis_plan_docx(student, full_df, top_ant, top_beh, top_loc, top_session, risk_score, risk_level, stats=None):
     """Generate Word doc WITH embedded graphs using kaleido"""
     try:
-        from docx import Document
-        from docx.shared import Pt, RGBColor, Inches
-        from docx.enum.text import WD_ALIGN_PARAGRAPH
-        import plotly.graph_objects as go
-        
-        doc = Document()
-        
-        title = doc.add_heading('Behaviour Analysis Plan', 0)
-        title.alignment = WD_ALIGN_PARAGRAPH.CENTER
-        
-        doc.add_heading('Student Information', 1)
-        info_table = doc.add_table(rows=4, cols=2)
-        info_table.style = 'Light Grid Accent 1'
-        info_table.rows[0].cells[0].text = 'Student:'
-        info_table.rows[0].cells[1].text = student['name']
-        info_table.rows[1].cells[0].text = 'Program:'
-        info_table.rows[1].cells[1].text = student['program']
-        info_table.rows[2].cells[0].text = 'Grade:'
-        info_table.rows[2].cells[1].text = student['grade']
-        info_table.rows[3].cells[0].text = 'Date:'
-        info_table.rows[3].cells[1].text = datetime.now().strftime('%d/%m/%Y')
-        
-        doc.add_paragraph()
-        
-        doc.add_heading('Executive Summary', 1)
-        summary = doc.add_paragraph()
-        summary.add_run('Total Incidents: ').bold = True
-        summary.add_run(f"{len(full_df)}\n")
-        summary.add_run('Critical Incidents: ').bold = True
-        summary.add_run(f"{len(full_df[full_df['incident_type'] == 'Critical'])}\n")
-        summary.add_run('Average Severity: ').bold = True
-        summary.add_run(f"{full_df['severity'].mean():.2f}\n")
-        summary.add_run('Risk Level: ').bold = True
-        summary.add_run(f"{risk_level} ({risk_score}/100)")
-        
-        doc.add_paragraph()
-        
-        doc.add_heading('Key Findings', 1)
-        findings = doc.add_paragraph()
-        findings.add_run('Primary Behaviour: ').bold = True
-        findings.add_run(f"{top_beh}\n\n")
-        findings.add_run('Most Common Trigger: ').bold = True
-        findings.add_run(f"{top_ant}\n\n")
-        findings.add_run('Hotspot Location: ').bold = True
-        findings.add_run(f"{top_loc} during {top_session}")
-        
-        doc.add_paragraph()
-        
-        doc.add_heading('Clinical Interpretation', 1)
-        interp = doc.add_paragraph()
-        interp.add_run(f"Data indicates {student['name']} is most vulnerable when '{top_ant}' occurs in {top_loc} during {top_session}. ")
-        interp.add_run("This behaviour serves as a safety strategy. CPI principles emphasize Supportive stance. ")
-        interp.add_run("Berry Street Model suggests strengthening Body (regulation) and Relationship (connection).")
-        
-        doc.add_paragraph()
-        
-        doc.add_heading('Recommendations', 1)
-        doc.add_heading('1. Proactive Strategies', 2)
-        doc.add_paragraph(f"Provide check-in before '{top_ant}'", style='List Bullet')
-        doc.add_paragraph(f"Offer regulated start before {top_session}", style='List Bullet')
-        
-        doc.add_heading('2. Co-regulation (CPI)', 2)
-        doc.add_paragraph("Use Supportive stance, low slow voice", style='List Bullet')
-        doc.add_paragraph("Reduce audience, one key adult", style='List Bullet')
-        
-        doc.add_heading('3. Teaching Skills', 2)
-        doc.add_paragraph("Link to Personal & Social Capability", style='List Bullet')
-        doc.add_paragraph("Teach help-seeking routines", style='List Bullet')
-        
-        doc.add_heading('4. SMART Goal', 2)
-        doc.add_paragraph("Over 5 weeks, use help-seeking strategy in 4/5 opportunities with support.", style='List Bullet')
-        
-        # ADD GRAPHS TO DOCUMENT
-        doc.add_page_break()
-        doc.add_heading('Behaviour Analytics', 1)
-        
-        try:
-            # Graph 1: Behavior Frequency
-            beh_counts = full_df["behaviour_type"].value_counts().head(5)
-            fig1 = go.Figure(data=[
-                go.Bar(x=beh_counts.values, y=beh_counts.index, orientation='h',
-                       marker_color='#3498db')
-            ])
-            fig1.update_layout(
-                title="Top Behaviors",
-                xaxis_title="Frequency",
-                yaxis_title="Behavior",
-                plot_bgcolor='white',
-                paper_bgcolor='white',
-                height=400,
-                font=dict(size=12)
-            )
-            img_bytes1 = fig1.to_image(format="png", width=1000, height=600)
-            img_stream1 = BytesIO(img_bytes1)
-            doc.add_picture(img_stream1, width=Inches(6))
-            doc.add_paragraph()
-            
-            # Graph 2: Severity Trend
-            fig2 = go.Figure()
-            fig2.add_trace(go.Scatter(
-                x=full_df["date_parsed"], 
-                y=full_df["severity"],
-                mode='lines+markers',
-                line=dict(color='#e74c3c', width=2),
-                marker=dict(size=8, color='#e74c3c')
-            ))
-            fig2.update_layout(
-                title="Severity Trend Over Time",
-                xaxis_title="Date",
-                yaxis_title="Severity Level",
-                plot_bgcolor='white',
-                paper_bgcolor='white',
-                height=400,
-                font=dict(size=12)
-            )
-            img_bytes2 = fig2.to_image(format="png", width=1000, height=600)
-            img_stream2 = BytesIO(img_bytes2)
-            doc.add_picture(img_stream2, width=Inches(6))
-            
-        except Exception as e:
-            doc.add_paragraph(f"Note: Unable to generate graphs. Error: {str(e)}")
-        
-        doc.add_paragraph()
-        footer = doc.add_paragraph()
-        footer.alignment = WD_ALIGN_PARAGRAPH.CENTER
-        footer_run = footer.add_run('\n\nGenerated by CLC Behaviour Support\n')
-        footer_run.font.size = Pt(9)
-        footer_run.font.color.rgb = RGBColor(128, 128, 128)
-        footer.add_run(datetime.now().strftime('%d %B %Y'))
-        
-        file_stream = BytesIO()
-        doc.save(file_stream)
-        file_stream.seek(0)
-        return file_stream
+        return build_behaviour_plan_docx(student, full_df, top_ant, top_beh, top_loc, top_session, risk_score, risk_level, stats=stats)
     except Exception as e:
         st.error(f"Error generating document: {e}")
         return None
 
+def render_batch_plans():
+    """End-of-term: Behaviour Analysis Plans for whole programs, built in parallel."""
+    with st.expander("📦 Batch Behaviour Analysis Plans"):
+        programs = st.multiselect("Programs", options=list(PROGRAM_NAMES), default=list(PROGRAM_NAMES),
+                                  format_func=lambda p: PROGRAM_NAMES[p])
+        if st.button("Generate Plans (ZIP)", disabled=not programs):
+            students = [s for s in st.session_state.students if s["program"] in programs]
+            progress = st.progress(0.0, text="Starting report workers...")
+            
+            def on_progress(done, total, result):
+                progress.progress(done / total, text=f"{done}/{total} — {result['student']}")
+            
+            started = datetime.now()
+            zip_bytes, results = generate_plans_zip(
+                students, st.session_state.incidents, st.session_state.critical_incidents, on_progress=on_progress
+            )
+            elapsed = (datetime.now() - started).total_seconds()
+            st.session_state.batch_plans = {"zip": zip_bytes, "results": results, "elapsed": elapsed}
+        
+        batch = st.session_state.get("batch_plans")
+        if batch:
+            built = [r for r in batch["results"] if r["file"]]
+            st.success(f"{len(built)} plans generated in {batch['elapsed']:.1f}s")
+            st.download_button(
+                label="📥 Download Plans (ZIP)",
+                data=batch["zip"],
+                file_name=f"Behaviour_Analysis_Plans_{datetime.now().strftime('%Y%m%d')}.zip",
+                mime="application/zip",
+                use_container_width=True
+            )
+            st.dataframe(pd.DataFrame(batch["results"]), use_container_width=True, hide_index=True)
+
 def init_state():
     ss = st.session_state
     if "logged_in" not in ss: ss.logged_in = False
@@ -330,27 +233,16 @@ def get_student(sid): return next((s for s in st.session_state.students if s["id
 def get_session_from_time(t): return "Morning" if t.hour < 11 else "Middle" if t.hour < 13 else "Afternoon"
 
 def generate_mock_incidents(n=70):
-    incidents = []
     weights = {"stu_jp1": 8, "stu_jp2": 5, "stu_jp3": 3, "stu_py1": 10, "stu_py2": 7, "stu_py3": 4, 
                "stu_sy1": 12, "stu_sy2": 9, "stu_sy3": 6}
-    pool = []
-    for stu in MOCK_STUDENTS:
-        pool.extend([stu] * weights.get(stu["id"], 5))
-    for _ in range(n):
-        stu = random.choice(pool)
-        sev = random.choices([1, 2, 3, 4, 5], weights=[20, 35, 25, 15, 5])[0]
-        dt = datetime.now() - timedelta(days=random.randint(0, 90))
-        dt = dt.replace(hour=random.choices([9,10,11,12,13,14,15], weights=[10,15,12,8,12,18,10])[0], 
-                       minute=random.randint(0,59), second=0)
-        incidents.append({
-            "id": str(uuid.uuid4()), "student_id": stu["id"], "student_name": stu["name"],
-            "date": dt.date().isoformat(), "time": dt.time().strftime("%H:%M:%S"),
-            "day": dt.strftime("%A"), "session": get_session_from_time(dt.time()),
-            "location": random.choice(LOCATIONS), "behaviour_type": random.choice(BEHAVIOUR_TYPES),
-            "antecedent": random.choice(ANTECEDENTS), "intervention": random.choice(INTERVENTIONS),
-            "severity": sev, "reported_by": random.choice(MOCK_STAFF)["name"],
-            "description": "Mock incident", "is_critical": sev >= 4, "duration_minutes": random.randint(2, 25)
-        })
+    frame = generate_incident_frame(
+        n, students=MOCK_STUDENTS, student_weights=weights, behaviour_focus=0,
+        behaviours=BEHAVIOUR_TYPES, antecedents=ANTECEDENTS, interventions=INTERVENTIONS,
+        locations=LOCATIONS, staff=[s["name"] for s in MOCK_STAFF]
+    )
+    incidents = to_records(frame, "app")
+    for inc in incidents:
+        inc["description"] = "Mock incident"
     return incidents
 
 
@@ -410,6 +302,9 @@ def render_landing_page():
         st.markdown("#### Senior Years")
         if st.button("Enter SY", use_container_width=True, type="primary"):
             go_to("program_students", selected_program="SY")
+    
+    st.markdown("---")
+    render_batch_plans()
 
 def render_program_students_page():
     program = st.session_state.get("selected_program", "JP")
@@ -619,18 +514,19 @@ def render_student_analysis_page():
     
     full_df = pd.concat([quick_df, crit_df], ignore_index=True).sort_values("date_parsed")
     
-    # SUMMARY METRICS
+    # SUMMARY METRICS (one pass; shared with the risk score and the plan document)
+    stats = plan_statistics(full_df)
     col1, col2, col3, col4 = st.columns(4)
-    with col1: st.metric("Total Incidents", len(full_df))
-    with col2: st.metric("Critical", len(full_df[full_df["incident_type"] == "Critical"]))
-    with col3: st.metric("Avg Severity", f"{full_df['severity'].mean():.1f}")
+    with col1: st.metric("Total Incidents", stats["total"])
+    with col2: st.metric("Critical", stats["critical_count"])
+    with col3: st.metric("Avg Severity", f"{stats['avg_severity']:.1f}")
     with col4: st.metric("Last 7 days", len(full_df[full_df["date_parsed"] >= (datetime.now() - timedelta(days=7))]))
     
     st.markdown("---")
     
     # GRAPH 1: BEHAVIOR FREQUENCY - PROFESSIONAL BLUE
     st.markdown("### 📊 Behavior Types")
-    beh_counts = full_df["behaviour_type"].value_counts().head(5)
+    beh_counts = stats["counts"]["behaviour_type"].head(5)
     fig1 = go.Figure(data=[
         go.Bar(x=beh_counts.values, y=beh_counts.index, orientation='h',
                marker_color='#3498db', text=beh_counts.values, textposition='auto')
@@ -654,7 +550,7 @@ def render_student_analysis_page():
     # GRAPH 2: TIME OF DAY
     st.markdown("### 🕐 Time of Day Distribution")
     if "session" in full_df.columns:
-        session_counts = full_df["session"].value_counts()
+        session_counts = stats["counts"]["session"]
         fig2 = go.Figure(data=[
             go.Bar(x=session_counts.index, y=session_counts.values,
                    marker_color='#3498db', text=session_counts.values, textposition='auto')
@@ -678,7 +574,7 @@ def render_student_analysis_page():
     
     # GRAPH 3: ANTECEDENTS (TRIGGERS)
     st.markdown("### 🎯 Common Triggers")
-    ant_counts = full_df["antecedent"].value_counts().head(5)
+    ant_counts = stats["counts"]["antecedent"].head(5)
     fig3 = go.Figure(data=[
         go.Bar(x=ant_counts.values, y=ant_counts.index, orientation='h',
                marker_color='#3498db', text=ant_counts.values, textposition='auto')
@@ -749,14 +645,9 @@ def render_student_analysis_page():
     # RISK SCORE - PROFESSIONAL COLORS
     st.markdown("### 🎲 Current Risk Assessment")
     
-    recent = full_df.tail(7)
-    risk_score = min(100, int(
-        (len(recent) / 7 * 10) +
-        (recent["severity"].mean() * 8) +
-        (len(full_df[full_df["incident_type"] == "Critical"]) / len(full_df) * 50 if len(full_df) > 0 else 0)
-    ))
-    
-    risk_level = "LOW" if risk_score < 30 else "MODERATE" if risk_score < 60 else "HIGH"
+    findings = plan_findings(full_df, stats)
+    risk_score = findings["risk_score"]
+    risk_level = findings["risk_level"]
     risk_color = "#27ae60" if risk_score < 30 else "#f39c12" if risk_score < 60 else "#e74c3c"
     
     col1, col2 = st.columns([2, 3])
@@ -782,10 +673,10 @@ def render_student_analysis_page():
     # CLINICAL SUMMARY
     st.markdown("### 🧠 Clinical Summary")
     
-    top_beh = full_df["behaviour_type"].mode()[0] if len(full_df) > 0 else "Unknown"
-    top_ant = full_df["antecedent"].mode()[0] if len(full_df) > 0 else "Unknown"
-    top_loc = full_df["location"].mode()[0] if len(full_df) > 0 and "location" in full_df.columns else "Unknown"
-    top_session = full_df["session"].mode()[0] if len(full_df) > 0 and "session" in full_df.columns else "Unknown"
+    top_beh = findings["top_beh"]
+    top_ant = findings["top_ant"]
+    top_loc = findings["top_loc"]
+    top_session = findings["top_session"]
     
     st.info(f"""
     **Key Patterns:**
@@ -825,7 +716,7 @@ def render_student_analysis_page():
     
     with col2:
         docx_file = generate_behaviour_analysis_plan_docx(
-            student, full_df, top_ant, top_beh, top_loc, top_session, risk_score, risk_level
+            student, full_df, top_ant, top_beh, top_loc, top_session, risk_score, risk_level, stats
         )
         if docx_file:
             st.download_button(
@@ -1,15 +1,32 @@
 import streamlit as st
 import pandas as pd
+import os
 from datetime import datetime, time, timedelta
 import random
 import uuid
-import plotly.express as px
 import numpy as np
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 import logging
+import threading
+from time import monotonic
+from concurrent.futures import ThreadPoolExecutor
 from functools import wraps
 import traceback
+from io import BytesIO
 from supabase import create_client, Client
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+from incident_store import IncidentStore
+from incident_queue import IncidentWriteQueue
+from audit_log import AuditLogWriter
+from chart_cache import render_charts
+from behaviour_analytics import DAILY_ROLLUP_COLUMNS, daily_rollup, daily_series, summary_statistics
+from lazy_imports import lazy_module
+from styling_themes import inject_theme
+from render_metrics import get_render_metrics, record_frame, track_render
+from query_metrics import InstrumentedClient, get_query_metrics
+
+# Charts load on first use by the reports/analysis pages, not at login
+px = lazy_module('plotly.express')
 
 # --- SUPABASE CONFIGURATION ---
 SUPABASE_URL = "https://szhebjnxxiwomgediufp.supabase.co"
@@ -18,8 +35,8 @@ SUPABASE_KEY = "eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9.eyJpc3MiOiJzdXBhYmFzZSIsInJ
 # Initialize Supabase client
 @st.cache_resource
 def get_supabase_client() -> Client:
-    """Returns a cached Supabase client instance."""
-    return create_client(SUPABASE_URL, SUPABASE_KEY)
+    """Returns a cached Supabase client instance; every query is timed per query shape and per render."""
+    return InstrumentedClient(create_client(SUPABASE_URL, SUPABASE_KEY))
 
 # --- ERROR HANDLING SETUP ---
 
@@ -44,23 +61,31 @@ class ValidationError(AppError):
     """Raised when data validation fails"""
     pass
 
+def current_user_label() -> str:
+    """Who is rendering, for the performance metrics."""
+    user = st.session_state.get('current_user') or {}
+    return user.get('email') or user.get('name') or 'anonymous'
+
 def handle_errors(user_message: str = "An error occurred"):
-    """Decorator to catch and handle errors"""
+    """Decorator to catch and handle errors, and to record each call's timings for the performance tab"""
     def decorator(func):
         @wraps(func)
         def wrapper(*args, **kwargs):
-            try:
-                return func(*args, **kwargs)
-            except ValidationError as e:
-                logger.error(f"{func.__name__}: {e.message}", exc_info=True)
-                st.error(e.user_message)
-                return None
-            except Exception as e:
-                logger.critical(f"Unexpected error in {func.__name__}: {str(e)}", exc_info=True)
-                st.error(f"{user_message}. Please try again or contact support.")
-                with st.expander("Error Details"):
-                    st.code(str(e))
-                return None
+            with track_render(func.__name__, current_user_label()) as trace:
+                try:
+                    return func(*args, **kwargs)
+                except ValidationError as e:
+                    trace.error = e.message
+                    logger.error(f"{func.__name__}: {e.message}", exc_info=True)
+                    st.error(e.user_message)
+                    return None
+                except Exception as e:
+                    trace.error = str(e)
+                    logger.critical(f"Unexpected error in {func.__name__}: {str(e)}", exc_info=True)
+                    st.error(f"{user_message}. Please try again or contact support.")
+                    with st.expander("Error Details"):
+                        st.code(str(e))
+                    return None
         return wrapper
     return decorator
 
@@ -73,633 +98,8 @@ st.set_page_config(
     page_icon="📊"
 )
 
-# Apply Bold Modern Professional Theme with Better Contrast
-st.markdown("""
-<style>
-@import url('https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700;800&family=Poppins:wght@400;500;600;700;800&display=swap');
-
-/* ========== GLOBAL STYLES ========== */
-.main {
-    font-family: 'Inter', -apple-system, BlinkMacSystemFont, sans-serif;
-    background: linear-gradient(135deg, #1e3a8a 0%, #3730a3 100%);
-    background-attachment: fixed;
-    padding: 2rem;
-}
-
-.block-container {
-    padding-top: 3rem;
-    padding-bottom: 3rem;
-    max-width: 1400px;
-}
-
-/* ========== TYPOGRAPHY ========== */
-h1 {
-    font-family: 'Poppins', sans-serif;
-    font-size: 3.5rem !important;
-    font-weight: 800 !important;
-    background: linear-gradient(135deg, #ffffff 0%, #fbbf24 100%);
-    -webkit-background-clip: text;
-    -webkit-text-fill-color: transparent;
-    background-clip: text;
-    margin-bottom: 2rem !important;
-    text-shadow: 0 4px 6px rgba(0, 0, 0, 0.3);
-    letter-spacing: -0.02em;
-}
-
-h2 {
-    font-family: 'Poppins', sans-serif;
-    font-size: 2rem !important;
-    font-weight: 700 !important;
-    color: #ffffff !important;
-    margin-top: 2rem !important;
-    margin-bottom: 1rem !important;
-}
-
-h3 {
-    font-family: 'Poppins', sans-serif;
-    font-size: 1.5rem !important;
-    font-weight: 600 !important;
-    color: #f3f4f6 !important;
-    margin-bottom: 1rem !important;
-}
-
-h4 {
-    font-family: 'Poppins', sans-serif;
-    font-size: 1.25rem !important;
-    font-weight: 600 !important;
-    color: #e5e7eb !important;
-}
-
-p, label, span, div {
-    font-family: 'Inter', sans-serif;
-    color: #f3f4f6 !important;
-    font-size: 1rem;
-    line-height: 1.6;
-}
-
-/* Make captions more visible on dark background */
-.caption, [data-testid="stCaptionContainer"] {
-    color: #d1d5db !important;
-    font-size: 0.9rem !important;
-}
-
-/* ========== CARDS & CONTAINERS ========== */
-div[data-testid="stVerticalBlock"] > div[style*="border"] {
-    background: rgba(255, 255, 255, 0.98) !important;
-    -webkit-backdrop-filter: blur(20px) !important;
-    backdrop-filter: blur(20px) !important;
-    border-radius: 24px !important;
-    box-shadow: 
-        0 20px 25px -5px rgba(0, 0, 0, 0.2),
-        0 10px 10px -5px rgba(0, 0, 0, 0.1),
-        inset 0 1px 0 0 rgba(255, 255, 255, 0.1) !important;
-    padding: 2rem !important;
-    border: 1px solid rgba(255, 255, 255, 0.5) !important;
-    transition: all 0.4s cubic-bezier(0.4, 0, 0.2, 1) !important;
-}
-
-/* Make text INSIDE white cards dark and readable */
-div[data-testid="stVerticalBlock"] > div[style*="border"] p,
-div[data-testid="stVerticalBlock"] > div[style*="border"] label,
-div[data-testid="stVerticalBlock"] > div[style*="border"] span,
-div[data-testid="stVerticalBlock"] > div[style*="border"] div,
-div[data-testid="stVerticalBlock"] > div[style*="border"] h2,
-div[data-testid="stVerticalBlock"] > div[style*="border"] h3,
-div[data-testid="stVerticalBlock"] > div[style*="border"] h4,
-div[data-testid="stVerticalBlock"] > div[style*="border"] * {
-    color: #1f2937 !important;
-}
-
-div[data-testid="stVerticalBlock"] > div[style*="border"] .caption,
-div[data-testid="stVerticalBlock"] > div[style*="border"] [data-testid="stCaptionContainer"] {
-    color: #4b5563 !important;
-}
-
-/* Ensure form elements inside containers are visible */
-div[data-testid="stVerticalBlock"] > div[style*="border"] .stTextInput label,
-div[data-testid="stVerticalBlock"] > div[style*="border"] .stSelectbox label,
-div[data-testid="stVerticalBlock"] > div[style*="border"] .stTextArea label,
-div[data-testid="stVerticalBlock"] > div[style*="border"] .stDateInput label,
-div[data-testid="stVerticalBlock"] > div[style*="border"] .stTimeInput label,
-div[data-testid="stVerticalBlock"] > div[style*="border"] .stNumberInput label,
-div[data-testid="stVerticalBlock"] > div[style*="border"] .stSlider label {
-    color: #1f2937 !important;
-}
-
-div[data-testid="stVerticalBlock"] > div[style*="border"]:hover {
-    transform: translateY(-8px) scale(1.02) !important;
-    box-shadow: 
-        0 25px 50px -12px rgba(0, 0, 0, 0.3),
-        inset 0 1px 0 0 rgba(255, 255, 255, 0.2) !important;
-    border-color: rgba(255, 255, 255, 0.7) !important;
-}
-
-/* ========== BUTTONS ========== */
-.stButton > button {
-    font-family: 'Inter', sans-serif !important;
-    font-weight: 600 !important;
-    font-size: 1rem !important;
-    border-radius: 16px !important;
-    padding: 1rem 2.5rem !important;
-    transition: all 0.3s cubic-bezier(0.4, 0, 0.2, 1) !important;
-    border: none !important;
-    text-transform: none !important;
-    letter-spacing: 0.02em !important;
-    position: relative !important;
-    overflow: hidden !important;
-}
-
-.stButton > button::before {
-    content: '' !important;
-    position: absolute !important;
-    top: 0 !important;
-    left: -100% !important;
-    width: 100% !important;
-    height: 100% !important;
-    background: linear-gradient(90deg, transparent, rgba(255,255,255,0.3), transparent) !important;
-    transition: left 0.5s !important;
-}
-
-.stButton > button:hover::before {
-    left: 100% !important;
-}
-
-.stButton > button[kind="primary"] {
-    background: linear-gradient(135deg, #3b82f6 0%, #8b5cf6 100%) !important;
-    color: white !important;
-    box-shadow: 
-        0 10px 25px -5px rgba(59, 130, 246, 0.5),
-        0 4px 6px -2px rgba(59, 130, 246, 0.3) !important;
-}
-
-.stButton > button[kind="primary"]:hover {
-    background: linear-gradient(135deg, #2563eb 0%, #7c3aed 100%) !important;
-    box-shadow: 
-        0 20px 35px -5px rgba(59, 130, 246, 0.6),
-        0 8px 12px -2px rgba(59, 130, 246, 0.4) !important;
-    transform: translateY(-3px) !important;
-}
-
-.stButton > button[kind="secondary"] {
-    background: rgba(255, 255, 255, 0.95) !important;
-    color: #3b82f6 !important;
-    border: 3px solid #3b82f6 !important;
-    box-shadow: 0 4px 6px -1px rgba(0, 0, 0, 0.1) !important;
-}
-
-.stButton > button[kind="secondary"]:hover {
-    background: rgba(255, 255, 255, 1) !important;
-    border-color: #2563eb !important;
-    box-shadow: 0 10px 15px -3px rgba(59, 130, 246, 0.3) !important;
-    transform: translateY(-2px) !important;
-}
-
-/* ========== METRICS ========== */
-div[data-testid="stMetric"] {
-    background: linear-gradient(135deg, #ffffff 0%, #eff6ff 100%) !important;
-    padding: 2rem !important;
-    border-radius: 20px !important;
-    border-left: 6px solid #3b82f6 !important;
-    box-shadow: 
-        0 10px 15px -3px rgba(0, 0, 0, 0.1),
-        0 4px 6px -2px rgba(0, 0, 0, 0.05) !important;
-    transition: all 0.3s ease !important;
-}
-
-div[data-testid="stMetric"]:hover {
-    transform: scale(1.05) !important;
-    box-shadow: 0 20px 25px -5px rgba(59, 130, 246, 0.3) !important;
-}
-
-div[data-testid="stMetric"] label {
-    color: #1f2937 !important;
-    font-size: 0.875rem !important;
-    font-weight: 600 !important;
-    text-transform: uppercase !important;
-    letter-spacing: 0.05em !important;
-}
-
-div[data-testid="stMetric"] div[data-testid="stMetricValue"] {
-    color: #1e40af !important;
-    font-size: 3rem !important;
-    font-weight: 800 !important;
-    text-shadow: 0 2px 4px rgba(59, 130, 246, 0.2) !important;
-}
-
-/* ========== TABS ========== */
-.stTabs [data-baseweb="tab-list"] {
-    gap: 12px;
-    background: rgba(255, 255, 255, 0.95);
-    -webkit-backdrop-filter: blur(10px);
-    backdrop-filter: blur(10px);
-    padding: 1rem;
-    border-radius: 20px;
-    box-shadow: 0 4px 6px -1px rgba(0, 0, 0, 0.1);
-}
-
-.stTabs [data-baseweb="tab"] {
-    font-family: 'Inter', sans-serif;
-    font-weight: 600;
-    border-radius: 12px;
-    padding: 1rem 2rem;
-    color: #1f2937 !important;
-    background: transparent;
-    transition: all 0.3s ease;
-}
-
-.stTabs [data-baseweb="tab"]:hover {
-    background: rgba(59, 130, 246, 0.1);
-    color: #3b82f6 !important;
-}
-
-.stTabs [aria-selected="true"] {
-    background: linear-gradient(135deg, #3b82f6 0%, #8b5cf6 100%) !important;
-    color: white !important;
-    box-shadow: 0 4px 12px rgba(59, 130, 246, 0.4);
-}
-
-/* ========== INPUT FIELDS ========== */
-.stTextInput input, 
-.stSelectbox select, 
-.stTextArea textarea,
-.stDateInput input,
-.stTimeInput input,
-.stNumberInput input {
-    border-radius: 12px !important;
-    border: 2px solid #cbd5e1 !important;
-    font-family: 'Inter', sans-serif !important;
-    transition: all 0.3s ease !important;
-    padding: 0.75rem 1rem !important;
-    font-size: 1rem !important;
-    background: white !important;
-    color: #1f2937 !important;
-}
-
-.stTextInput input:focus, 
-.stSelectbox select:focus, 
-.stTextArea textarea:focus {
-    border-color: #3b82f6 !important;
-    box-shadow: 0 0 0 4px rgba(59, 130, 246, 0.1) !important;
-    outline: none !important;
-}
-
-/* Input labels - light on dark background */
-.stTextInput label, .stSelectbox label, .stTextArea label, .stDateInput label, .stTimeInput label, .stNumberInput label {
-    color: #f3f4f6 !important;
-    font-weight: 600 !important;
-}
-
-/* But dark text when inside white cards/forms */
-div[data-testid="stVerticalBlock"] > div[style*="border"] .stTextInput label,
-div[data-testid="stVerticalBlock"] > div[style*="border"] .stSelectbox label,
-div[data-testid="stVerticalBlock"] > div[style*="border"] .stTextArea label,
-div[data-testid="stVerticalBlock"] > div[style*="border"] .stDateInput label,
-div[data-testid="stVerticalBlock"] > div[style*="border"] .stTimeInput label,
-div[data-testid="stVerticalBlock"] > div[style*="border"] .stNumberInput label,
-[data-testid="stForm"] .stTextInput label,
-[data-testid="stForm"] .stSelectbox label,
-[data-testid="stForm"] .stTextArea label,
-[data-testid="stForm"] .stDateInput label,
-[data-testid="stForm"] .stTimeInput label,
-[data-testid="stForm"] .stNumberInput label {
-    color: #1f2937 !important;
-}
-
-/* Make ALL content inside forms dark and readable */
-[data-testid="stForm"],
-[data-testid="stForm"] * {
-    color: #1f2937 !important;
-}
-
-[data-testid="stForm"] h2,
-[data-testid="stForm"] h3,
-[data-testid="stForm"] h4 {
-    color: #111827 !important;
-}
-
-[data-testid="stForm"] .caption,
-[data-testid="stForm"] [data-testid="stCaptionContainer"] {
-    color: #4b5563 !important;
-}
-
-/* ========== EXPANDERS ========== */
-.streamlit-expanderHeader {
-    font-family: 'Inter', sans-serif !important;
-    font-weight: 700 !important;
-    font-size: 1.1rem !important;
-    color: #1e40af !important;
-    background: linear-gradient(135deg, #eff6ff 0%, #dbeafe 100%) !important;
-    border-radius: 12px !important;
-    padding: 1.25rem !important;
-    border: 2px solid #93c5fd !important;
-    transition: all 0.3s ease !important;
-}
-
-.streamlit-expanderHeader:hover {
-    background: linear-gradient(135deg, #dbeafe 0%, #bfdbfe 100%) !important;
-    border-color: #60a5fa !important;
-    transform: translateX(4px) !important;
-}
-
-/* Make sure expander content is readable */
-.streamlit-expanderContent {
-    background: rgba(255, 255, 255, 0.95) !important;
-    padding: 1rem !important;
-    border-radius: 0 0 12px 12px !important;
-}
-
-.streamlit-expanderContent p,
-.streamlit-expanderContent label,
-.streamlit-expanderContent span,
-.streamlit-expanderContent div,
-.streamlit-expanderContent h2,
-.streamlit-expanderContent h3,
-.streamlit-expanderContent h4,
-.streamlit-expanderContent * {
-    color: #1f2937 !important;
-}
-
-/* Make text inside expanders dark */
-.streamlit-expanderContent p,
-.streamlit-expanderContent label,
-.streamlit-expanderContent span,
-.streamlit-expanderContent div {
-    color: #1f2937 !important;
-}
-
-/* ========== TABLES ========== */
-.dataframe {
-    border-radius: 16px !important;
-    overflow: hidden !important;
-    box-shadow: 0 10px 15px -3px rgba(0, 0, 0, 0.1) !important;
-    border: none !important;
-}
-
-.dataframe thead tr {
-    background: linear-gradient(135deg, #3b82f6 0%, #8b5cf6 100%) !important;
-}
-
-.dataframe thead th {
-    color: white !important;
-    font-weight: 700 !important;
-    font-size: 0.95rem !important;
-    padding: 1.25rem !important;
-    text-transform: uppercase !important;
-    letter-spacing: 0.05em !important;
-}
-
-.dataframe tbody td {
-    color: #1f2937 !important;
-    padding: 1rem !important;
-    background: white !important;
-}
-
-.dataframe tbody tr {
-    transition: all 0.2s ease !important;
-    background: white !important;
-}
-
-.dataframe tbody tr:hover {
-    background: rgba(59, 130, 246, 0.05) !important;
-    transform: scale(1.01) !important;
-}
-
-/* ========== ALERTS ========== */
-.stSuccess {
-    background: linear-gradient(135deg, #d1fae5 0%, #a7f3d0 100%) !important;
-    color: #065f46 !important;
-    border-left: 6px solid #10b981 !important;
-    border-radius: 12px !important;
-    padding: 1.5rem !important;
-    font-family: 'Inter', sans-serif !important;
-    font-weight: 500 !important;
-    box-shadow: 0 4px 6px -1px rgba(16, 185, 129, 0.2) !important;
-}
-
-.stError {
-    background: linear-gradient(135deg, #fee2e2 0%, #fecaca 100%) !important;
-    color: #991b1b !important;
-    border-left: 6px solid #ef4444 !important;
-    border-radius: 12px !important;
-    padding: 1.5rem !important;
-    font-family: 'Inter', sans-serif !important;
-    font-weight: 500 !important;
-    box-shadow: 0 4px 6px -1px rgba(239, 68, 68, 0.2) !important;
-}
-
-.stWarning {
-    background: linear-gradient(135deg, #fef3c7 0%, #fde68a 100%) !important;
-    color: #92400e !important;
-    border-left: 6px solid #f59e0b !important;
-    border-radius: 12px !important;
-    padding: 1.5rem !important;
-    font-family: 'Inter', sans-serif !important;
-    font-weight: 500 !important;
-    box-shadow: 0 4px 6px -1px rgba(245, 158, 11, 0.2) !important;
-}
-
-.stInfo {
-    background: linear-gradient(135deg, #dbeafe 0%, #bfdbfe 100%) !important;
-    color: #1e40af !important;
-    border-left: 6px solid #3b82f6 !important;
-    border-radius: 12px !important;
-    padding: 1.5rem !important;
-    font-family: 'Inter', sans-serif !important;
-    font-weight: 500 !important;
-    box-shadow: 0 4px 6px -1px rgba(59, 130, 246, 0.2) !important;
-}
-
-/* ========== SLIDER ========== */
-.stSlider > div > div > div {
-    background: linear-gradient(135deg, #3b82f6 0%, #8b5cf6 100%) !important;
-}
-
-/* ========== PROGRESS BAR ========== */
-.stProgress > div > div > div {
-    background: linear-gradient(135deg, #3b82f6 0%, #8b5cf6 100%) !important;
-}
-
-/* ========== SPINNER ========== */
-.stSpinner > div {
-    border-top-color: #3b82f6 !important;
-}
-
-/* ========== SIDEBAR ========== */
-section[data-testid="stSidebar"] {
-    background: linear-gradient(180deg, #1e3a8a 0%, #1e40af 100%) !important;
-    backdrop-filter: blur(20px) !important;
-}
-
-section[data-testid="stSidebar"] * {
-    color: white !important;
-}
-
-/* ========== SCROLLBAR ========== */
-::-webkit-scrollbar {
-    width: 12px;
-    height: 12px;
-}
-
-::-webkit-scrollbar-track {
-    background: rgba(255, 255, 255, 0.1);
-    border-radius: 10px;
-}
-
-::-webkit-scrollbar-thumb {
-    background: linear-gradient(135deg, #3b82f6 0%, #8b5cf6 100%);
-    border-radius: 10px;
-    border: 2px solid rgba(255, 255, 255, 0.1);
-}
-
-::-webkit-scrollbar-thumb:hover {
-    background: linear-gradient(135deg, #2563eb 0%, #7c3aed 100%);
-}
-
-/* ========== ANIMATIONS ========== */
-@keyframes fadeIn {
-    from { opacity: 0; transform: translateY(20px); }
-    to { opacity: 1; transform: translateY(0); }
-}
-
-.main > div {
-    animation: fadeIn 0.6s ease-out;
-}
-
-/* ========== SPECIAL EFFECTS ========== */
-.stButton > button[kind="primary"]::after {
-    content: '→';
-    margin-left: 8px;
-    transition: margin-left 0.3s ease;
-}
-
-.stButton > button[kind="primary"]:hover::after {
-    margin-left: 12px;
-}
-
-/* ========== COMPREHENSIVE FIX FOR WHITE BACKGROUNDS ========== */
-/* Any element with a white or light background should have dark text */
-[style*="background: white"],
-[style*="background: #fff"],
-[style*="background: rgb(255, 255, 255)"],
-[style*="background-color: white"],
-[style*="background-color: #fff"],
-[style*="background-color: rgb(255, 255, 255)"],
-div[style*="background: rgba(255, 255, 255"],
-div[class*="stContainer"] {
-    color: #1f2937 !important;
-}
-
-[style*="background: white"] *,
-[style*="background: #fff"] *,
-[style*="background: rgb(255, 255, 255)"] *,
-[style*="background-color: white"] *,
-[style*="background-color: #fff"] *,
-[style*="background-color: rgb(255, 255, 255)"] *,
-div[style*="background: rgba(255, 255, 255"] *,
-div[class*="stContainer"] * {
-    color: #1f2937 !important;
-}
-
-/* Streamlit's default containers */
-.element-container {
-    color: #f3f4f6 !important;
-}
-
-/* Make markdown inside white areas dark */
-.stMarkdown {
-    color: inherit !important;
-}
-
-/* Specific override for columns and containers */
-.row-widget,
-.stColumn {
-    color: #f3f4f6 !important;
-}
-
-/* Force ALL st.container(border=True) to have dark text */
-[data-testid="stVerticalBlock"] [data-testid="stVerticalBlock"],
-[data-testid="column"] > div,
-.stContainer,
-.css-container {
-    color: #1f2937 !important;
-}
-
-[data-testid="stVerticalBlock"] [data-testid="stVerticalBlock"] *,
-[data-testid="column"] > div *,
-.stContainer *,
-.css-container * {
-    color: #1f2937 !important;
-}
-
-/* Make sure button text inside containers is visible */
-div[style*="border"] .stButton > button[kind="secondary"] {
-    color: #3b82f6 !important;
-}
-
-/* Ensure metric values are visible */
-[data-testid="stMetric"] [data-testid="stMetricLabel"],
-[data-testid="stMetric"] [data-testid="stMetricValue"] {
-    color: #1e40af !important;
-}
-
-/* Tab content should be dark */
-.stTabs [data-baseweb="tab-panel"] {
-    color: #1f2937 !important;
-}
-
-.stTabs [data-baseweb="tab-panel"] * {
-    color: #1f2937 !important;
-}
-
-/* ========== NUCLEAR OPTION - FORCE ALL TEXT TO BE VISIBLE ========== */
-/* Default: all text should be WHITE on the dark background */
-* {
-    color: #ffffff !important;
-}
-
-/* Override: text should be DARK inside white containers */
-[data-testid="stVerticalBlock"] > div[style*="border"] *,
-[data-testid="stForm"] *,
-.stTabs [data-baseweb="tab-panel"] *,
-.streamlit-expanderContent *,
-.dataframe *,
-div[data-testid="stMetric"] *,
-[style*="background: white"] *,
-[style*="background-color: white"] *,
-[style*="background: rgb(255"] *,
-div[class*="stMarkdown"] p,
-div[class*="stMarkdown"] span,
-div[class*="stMarkdown"] div {
-    color: #1f2937 !important;
-}
-
-/* Input fields - always dark text on white background */
-input, select, textarea {
-    color: #1f2937 !important;
-    background: white !important;
-}
-
-/* Labels should be WHITE by default, DARK in forms */
-label {
-    color: #ffffff !important;
-}
-
-[data-testid="stForm"] label,
-[data-testid="stVerticalBlock"] > div[style*="border"] label {
-    color: #1f2937 !important;
-}
-
-/* Button text should always be visible */
-button {
-    color: #ffffff !important;
-}
-
-button[kind="secondary"] {
-    color: #3b82f6 !important;
-}
-
-</style>
-""", unsafe_allow_html=True)
+# Apply Bold Modern Professional Theme (bundled once per process, injected once per session)
+inject_theme('bold_modern')
 
 PLOTLY_THEME = 'plotly_dark'
 
@@ -791,6 +191,20 @@ LOCATIONS = [
 
 VALID_PAGES = ['login', 'landing', 'program_students', 'direct_log_form', 'critical_incident_abch', 'student_analysis', 'admin_portal']
 
+# Columns needed by the incident lists, counts and analysis pages.
+# The free-text description is left out; use load_incident_details() when it is needed.
+INCIDENT_LIST_COLUMNS = (
+    'id,student_id,incident_date,incident_time,day_of_week,session,location,'
+    'reported_by_name,reported_by_role,behaviour_type,antecedent,intervention,'
+    'support_type,severity,is_critical,updated_at'
+)
+INCIDENT_PAGE_SIZE = 1000
+
+# Incidents are re-synced by updated_at delta far more often than the other tables
+INCIDENT_SYNC_INTERVAL_SECONDS = 30
+# Deltas never see server-side deletes, so the incident table is also reloaded in full this often
+INCIDENT_FULL_RELOAD_SECONDS = 30 * 60
+
 # --- DATA LOADING FUNCTIONS (SUPABASE) ---
 
 def load_students_from_db() -> List[Dict[str, Any]]:
@@ -813,27 +227,113 @@ def load_staff_from_db() -> List[Dict[str, Any]]:
         logger.error(f"Error loading staff: {e}")
         return []
 
-def load_incidents_from_db() -> List[Dict[str, Any]]:
-    """Load all incidents from Supabase."""
-    try:
-        supabase = get_supabase_client()
-        response = supabase.table('incidents').select('*').execute()
+def normalize_incident(inc: Dict[str, Any]) -> Dict[str, Any]:
+    """Adds the legacy date/time/day keys to a DB incident row in place."""
+    inc['date'] = inc.get('incident_date', inc.get('date', ''))
+    inc['time'] = inc.get('incident_time', inc.get('time', ''))
+    inc['day'] = inc.get('day_of_week', inc.get('day', ''))
+    return inc
+
+def iter_incident_batches(columns: str = INCIDENT_LIST_COLUMNS, page_size: int = INCIDENT_PAGE_SIZE,
+                          updated_since: Optional[str] = None):
+    """
+    Yields incidents from Supabase one page at a time.
+    Pages are keyset-ordered on (incident_date, id) so each request is an
+    index range scan and never runs into PostgREST's max-rows cap.
+    With updated_since, only rows whose updated_at is at or after that
+    timestamp are returned.
+    """
+    supabase = get_supabase_client()
+    last_date, last_id = None, None
+    
+    while True:
+        query = (
+            supabase.table('incidents')
+            .select(columns)
+            .order('incident_date')
+            .order('id')
+            .limit(page_size)
+        )
+        if updated_since:
+            query = query.gte('updated_at', updated_since)
+        if last_date is not None:
+            query = query.or_(f"incident_date.gt.{last_date},and(incident_date.eq.{last_date},id.gt.{last_id})")
         
-        # Normalize field names for backward compatibility
-        incidents = []
-        if response.data:
-            for inc in response.data:
-                # Create a copy with both old and new field names
-                normalized = inc.copy()
-                normalized['date'] = inc.get('incident_date', inc.get('date', ''))
-                normalized['time'] = inc.get('incident_time', inc.get('time', ''))
-                normalized['day'] = inc.get('day_of_week', inc.get('day', ''))
-                incidents.append(normalized)
-        
-        return incidents
+        rows = query.execute().data or []
+        if not rows:
+            return
+        
+        yield rows
+        
+        if len(rows) < page_size:
+            return
+        last_date, last_id = rows[-1]['incident_date'], rows[-1]['id']
+
+def load_incidents_from_db(on_batch=None) -> IncidentStore:
+    """Load all incidents from Supabase, page by page, into the columnar store."""
+    def batches():
+        loaded = 0
+        for batch in iter_incident_batches():
+            loaded += len(batch)
+            if on_batch:
+                on_batch(loaded)
+            yield batch
+    
+    try:
+        store = IncidentStore.from_batches(batches())
+        record_frame(store.frame)
+        return store
     except Exception as e:
         logger.error(f"Error loading incidents: {e}")
-        return []
+        return IncidentStore()
+
+def reload_incidents_from_db() -> IncidentStore:
+    """
+    Full reload for the shared cache. Unlike load_incidents_from_db it raises on
+    failure, so the current store is kept. Incidents still waiting in the write
+    queue are added back so they don't disappear until they are inserted.
+    """
+    store = IncidentStore.from_batches(iter_incident_batches())
+    pending = [normalize_incident(record) for record in get_incident_queue().pending_records()]
+    if pending:
+        store.upsert(pending)
+    return store
+
+def incident_watermark(store: IncidentStore) -> str:
+    """Returns the latest updated_at seen in the store."""
+    latest = store.frame['updated_at'].dropna()
+    return str(latest.max()) if len(latest) else ''
+
+def sync_incident_changes(store: IncidentStore, state: Dict[str, Any]) -> bool:
+    """
+    Delta sync: fetches incidents changed since the last-seen updated_at
+    watermark and upserts them into the store. The watermark is kept in state.
+    Rows deleted on the server (and optimistic rows that never reached it) are
+    dropped by the periodic full reload, every INCIDENT_FULL_RELOAD_SECONDS.
+    """
+    if 'watermark' not in state:
+        state['watermark'] = incident_watermark(store)
+    
+    changes = []
+    for batch in iter_incident_batches(updated_since=state['watermark'] or None):
+        changes.extend(batch)
+    
+    changed = store.upsert(changes)
+    if changes:
+        state['watermark'] = max([state['watermark']] + [c.get('updated_at') or '' for c in changes])
+    if changed:
+        logger.info(f"Delta sync merged {changed} changed incidents")
+    return changed > 0
+
+def load_incident_details(incident_id: str) -> Optional[Dict[str, Any]]:
+    """Load the full row (including description) for a single incident."""
+    try:
+        supabase = get_supabase_client()
+        response = supabase.table('incidents').select('*').eq('id', incident_id).limit(1).execute()
+        return normalize_incident(response.data[0]) if response.data else None
+    except Exception as e:
+        logger.error(f"Error loading incident {incident_id}: {e}")
+        return None
 
 def load_system_settings() -> Dict[str, Any]:
     """Load system settings from Supabase."""
@@ -851,18 +351,444 @@ def load_system_settings() -> Dict[str, Any]:
         logger.error(f"Error loading settings: {e}")
         return {}
 
+# --- SERVER-SIDE REPORTS ---
+
+# Report name -> Postgres function (see reporting_functions.sql)
+REPORT_FUNCTIONS = {
+    'by_program': 'incident_counts_by_program',
+    'by_program_behaviour': 'incident_counts_by_program_behaviour',
+    'by_program_week': 'incident_counts_by_program_week',
+    'by_location': 'incident_counts_by_location',
+}
+
+@st.cache_data(ttl=INCIDENT_SYNC_INTERVAL_SECONDS, show_spinner=False)
+def load_incident_report(report: str, date_from: Optional[str] = None, date_to: Optional[str] = None,
+                         program: Optional[str] = None) -> pd.DataFrame:
+    """
+    Runs one of the aggregation RPCs and returns its rows.
+    Counting happens in Postgres, so only the aggregated rows are transferred.
+    """
+    try:
+        supabase = get_supabase_client()
+        params = {'p_from': date_from, 'p_to': date_to, 'p_program': program}
+        response = supabase.rpc(REPORT_FUNCTIONS[report], params).execute()
+        return record_frame(pd.DataFrame(response.data or []))
+    except Exception as e:
+        logger.error(f"Error loading report '{report}': {e}")
+        return pd.DataFrame()
+
+@st.cache_data(ttl=INCIDENT_SYNC_INTERVAL_SECONDS, show_spinner=False)
+def load_daily_rollup(student_ids: Optional[Tuple[str, ...]] = None, date_from: Optional[str] = None,
+                      date_to: Optional[str] = None) -> pd.DataFrame:
+    """
+    Reads incident_daily_rollup (see daily_rollup.sql): one row per student per day.
+    Returns an empty frame if the table is missing so callers can fall back to the store.
+    """
+    try:
+        supabase = get_supabase_client()
+        rows, offset = [], 0
+        while True:
+            query = (
+                supabase.table('incident_daily_rollup')
+                .select(','.join(DAILY_ROLLUP_COLUMNS))
+                .order('incident_date')
+                .order('student_id')
+            )
+            if student_ids:
+                query = query.in_('student_id', list(student_ids))
+            if date_from:
+                query = query.gte('incident_date', date_from)
+            if date_to:
+                query = query.lte('incident_date', date_to)
+            page = query.range(offset, offset + INCIDENT_PAGE_SIZE - 1).execute().data or []
+            rows.extend(page)
+            if len(page) < INCIDENT_PAGE_SIZE:
+                break
+            offset += INCIDENT_PAGE_SIZE
+        
+        rollup = record_frame(pd.DataFrame(rows, columns=DAILY_ROLLUP_COLUMNS))
+        rollup['incident_date'] = pd.to_datetime(rollup['incident_date'])
+        return rollup
+    except Exception as e:
+        logger.error(f"Error loading daily rollup: {e}")
+        return pd.DataFrame(columns=DAILY_ROLLUP_COLUMNS)
+
+# --- SHARED DATA CACHE ---
+
+DATA_CACHE_TTL_SECONDS = 300
+
+class SharedDataCache:
+    """
+    Process-wide copy of the reference tables, shared by every browser session.
+    Each table is fetched at most once per TTL; concurrent sessions asking for
+    the same table wait on a per-table lock instead of issuing their own query.
+    Tables given a refresher are updated in place when they expire instead of
+    being downloaded again; with max_age_seconds they are also reloaded in full
+    once that old, on a background thread while readers keep the current copy.
+    """
+    def __init__(self, ttl_seconds: int = DATA_CACHE_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._table_locks: Dict[str, threading.Lock] = {}
+        self._guard = threading.Lock()
+        self._next_version = 0
+
+    def _lock_for(self, table: str) -> threading.Lock:
+        with self._guard:
+            return self._table_locks.setdefault(table, threading.Lock())
+
+    def _bump_version(self) -> int:
+        with self._guard:
+            self._next_version += 1
+            return self._next_version
+
+    def _is_fresh(self, entry: Optional[Dict[str, Any]], ttl_seconds: Optional[int]) -> bool:
+        if entry is None or entry['loaded_at'] is None:
+            return False
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        return monotonic() - entry['loaded_at'] < ttl
+
+    def is_fresh(self, table: str, ttl_seconds: Optional[int] = None) -> bool:
+        """True if a read of this table would be served without a query."""
+        return self._is_fresh(self._entries.get(table), ttl_seconds)
+
+    def get(self, table: str, loader, refresher=None, ttl_seconds: Optional[int] = None,
+            max_age_seconds: Optional[int] = None, reloader=None) -> Tuple[int, Any]:
+        """
+        Returns (version, data) for a table.
+        A missing table is loaded with loader(). An expired one is passed to
+        refresher(data, state) when given, which updates it in place and
+        returns True if anything changed; otherwise it is loaded again.
+        A refreshed table older than max_age_seconds is also replaced by
+        reloader() (default loader) in the background; it should raise on failure.
+        """
+        entry = self._entries.get(table)
+        if self._is_fresh(entry, ttl_seconds):
+            return entry['version'], entry['data']
+        
+        with self._lock_for(table):
+            entry = self._entries.get(table)
+            if self._is_fresh(entry, ttl_seconds):
+                return entry['version'], entry['data']
+            
+            if entry is not None and refresher is not None:
+                if max_age_seconds is not None and monotonic() - entry['created_at'] >= max_age_seconds:
+                    self._start_reload(table, entry, reloader or loader)
+                try:
+                    if refresher(entry['data'], entry['state']):
+                        entry['version'] = self._bump_version()
+                except Exception as e:
+                    logger.error(f"Error refreshing '{table}': {e}")
+                entry['loaded_at'] = monotonic()
+                return entry['version'], entry['data']
+            
+            data = loader()
+            entry = self._new_entry(data)
+            with self._guard:
+                self._entries[table] = entry
+            logger.info(f"Shared cache loaded '{table}' (version {entry['version']})")
+            return entry['version'], entry['data']
+
+    def _new_entry(self, data: Any) -> Dict[str, Any]:
+        now = monotonic()
+        return {'data': data, 'state': {}, 'loaded_at': now, 'created_at': now, 'version': self._bump_version()}
+
+    def _start_reload(self, table: str, entry: Dict[str, Any], loader):
+        """Starts one background full reload of a table (called with the table lock held)."""
+        if entry.get('reloading'):
+            return
+        entry['reloading'] = True
+        threading.Thread(target=self._reload, args=(table, entry, loader),
+                         name=f'reload-{table}', daemon=True).start()
+
+    def _reload(self, table: str, stale: Dict[str, Any], loader):
+        started = monotonic()
+        try:
+            data = loader()
+        except Exception as e:
+            logger.error(f"Error reloading '{table}', keeping the current copy: {e}")
+            with self._lock_for(table):
+                stale['reloading'] = False
+                stale['created_at'] = monotonic()
+            return
+        
+        with self._lock_for(table):
+            entry = self._new_entry(data)
+            with self._guard:
+                # Skip the swap if the table was dropped or reloaded meanwhile
+                if self._entries.get(table) is not stale:
+                    return
+                self._entries[table] = entry
+        logger.info(f"Shared cache reloaded '{table}' in {monotonic() - started:.1f}s (version {entry['version']})")
+
+    def update(self, table: str, mutator) -> bool:
+        """
+        Applies mutator(data) to a loaded table in place; if it returns True the
+        table gets a new version, so sessions pick up the change and rebuild indexes.
+        """
+        with self._lock_for(table):
+            entry = self._entries.get(table)
+            if entry is None or not mutator(entry['data']):
+                return False
+            entry['version'] = self._bump_version()
+            return True
+
+    def invalidate(self, table: Optional[str] = None):
+        """
+        Marks one table as expired so the next reader refreshes or refetches it.
+        With no table, every entry is dropped and fully reloaded.
+        """
+        with self._guard:
+            if table is None:
+                self._entries.clear()
+            elif table in self._entries:
+                self._entries[table]['loaded_at'] = None
+
+@st.cache_resource
+def get_shared_data_cache() -> SharedDataCache:
+    """Returns the process-wide data cache."""
+    return SharedDataCache()
+
+def invalidate_shared_data(table: str):
+    """Call after a write so every session picks up the change on its next rerun."""
+    get_shared_data_cache().invalidate(table)
+    if table in ('incidents', 'students'):
+        load_incident_report.clear()
+    if table == 'incidents':
+        load_daily_rollup.clear()
+
+# --- INCIDENT WRITE QUEUE ---
+
+# Local SQLite outbox for new incidents; survives restarts until rows reach Supabase
+INCIDENT_QUEUE_PATH = os.environ.get('INCIDENT_QUEUE_PATH', 'incident_queue.sqlite3')
+
+def insert_incident_batch(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Idempotent bulk insert: rows whose id already exists are skipped, so retries are safe.
+    Returns the rows that were actually inserted (the upsert only returns those).
+    """
+    supabase = get_supabase_client()
+    response = supabase.table('incidents').upsert(rows, on_conflict='id', ignore_duplicates=True).execute()
+    inserted_ids = {row['id'] for row in response.data or []}
+    return [row for row in rows if row['id'] in inserted_ids]
+
+def discard_optimistic_incidents(rows: List[Dict[str, Any]]):
+    """Removes the shown-straight-away copies of incidents the database rejected."""
+    ids = [row['id'] for row in rows]
+    get_shared_data_cache().update('incidents', lambda store: store.remove(ids) > 0)
+    logger.error(f"{len(ids)} queued incidents were rejected by the database and set aside: {ids}")
+
+def insert_queued_incidents(rows: List[Dict[str, Any]]):
+    """
+    The queue's insert_batch: inserts the rows and audits the ones that were new,
+    so a batch resent after a lost response is not audited twice. There is no
+    session on the flusher thread, so entries are attributed to the reporting staff member.
+    """
+    audit = get_audit_log()
+    for row in insert_incident_batch(rows):
+        audit.record('incidents', row['id'], 'INSERT', new=row, changed_by=row.get('reported_by_id'))
+
+@st.cache_resource
+def get_incident_queue() -> IncidentWriteQueue:
+    """Returns the process-wide incident queue with its flusher running."""
+    queue = IncidentWriteQueue(
+        INCIDENT_QUEUE_PATH,
+        insert_queued_incidents,
+        # Once rows are in the database, the next sync replaces the optimistic copies
+        on_flushed=lambda rows: invalidate_shared_data('incidents'),
+        on_dead=discard_optimistic_incidents
+    )
+    queue.start()
+    return queue
+
+# --- AUDIT LOG ---
+
+def insert_audit_batch(rows: List[Dict[str, Any]]):
+    supabase = get_supabase_client()
+    supabase.table('audit_log').insert(rows).execute()
+
+@st.cache_resource
+def get_audit_log() -> AuditLogWriter:
+    """Returns the process-wide audit writer with its flusher running."""
+    writer = AuditLogWriter(insert_audit_batch)
+    writer.start()
+    return writer
+
+def audit_change(table_name: str, record_id: Any, action: str,
+                 old: Optional[Dict[str, Any]] = None, new: Optional[Dict[str, Any]] = None):
+    """Queues an audit_log entry for the current user; never delays or fails the write itself."""
+    try:
+        user = st.session_state.get('current_user') or {}
+        get_audit_log().record(table_name, record_id, action, old=old, new=new, changed_by=user.get('id'))
+    except Exception as e:
+        logger.error(f"Error queueing audit entry for {table_name} {record_id}: {e}")
+
+def audit_many(table_name: str, action: str, records: List[Dict[str, Any]]):
+    """Audits a bulk INSERT or DELETE for the current user, one entry per record, written directly."""
+    if not records:
+        return
+    try:
+        user = st.session_state.get('current_user') or {}
+        get_audit_log().record_many(table_name, action, records, changed_by=user.get('id'))
+    except Exception as e:
+        logger.error(f"Error writing {len(records)} audit entries for {table_name}: {e}")
+
+def sync_shared_data(incident_progress=None):
+    """
+    Points this session's lists at the current shared copy of each table.
+    Tables that need a query are fetched concurrently, so a cold start waits
+    for the slowest table rather than the sum of all four.
+    """
+    cache = get_shared_data_cache()
+    tables = {
+        'students_list': {'table': 'students', 'loader': load_students_from_db},
+        'staff_list': {'table': 'staff', 'loader': load_staff_from_db},
+        'incident_store': {
+            'table': 'incidents',
+            'loader': lambda: load_incidents_from_db(on_batch=incident_progress),
+            'refresher': sync_incident_changes,
+            'ttl_seconds': INCIDENT_SYNC_INTERVAL_SECONDS,
+            'max_age_seconds': INCIDENT_FULL_RELOAD_SECONDS,
+            'reloader': reload_incidents_from_db,
+        },
+        'system_settings': {'table': 'system_settings', 'loader': load_system_settings},
+    }
+    
+    results = {}
+    timings = {}
+    
+    def fetch(key: str):
+        spec = tables[key]
+        started = monotonic()
+        results[key] = cache.get(**spec)
+        timings[spec['table']] = round(monotonic() - started, 3)
+    
+    stale = [key for key, spec in tables.items() if not cache.is_fresh(spec['table'], spec.get('ttl_seconds'))]
+    if len(stale) > 1:
+        # Worker threads need the script context to update the progress placeholder
+        ctx = get_script_run_ctx()
+        with ThreadPoolExecutor(
+            max_workers=len(stale),
+            thread_name_prefix='table-loader',
+            initializer=lambda: add_script_run_ctx(threading.current_thread(), ctx)
+        ) as pool:
+            list(pool.map(fetch, stale))
+    elif stale:
+        fetch(stale[0])
+    
+    if timings:
+        st.session_state.load_timings = timings
+        logger.info(f"Loaded tables in {max(timings.values()):.3f}s (per table: {timings})")
+    
+    versions = st.session_state.setdefault('data_versions', {})
+    for key, spec in tables.items():
+        version, data = results[key] if key in results else cache.get(**spec)
+        if versions.get(key) != version:
+            st.session_state[key] = data
+            versions[key] = version
+            if key in INDEXED_LISTS:
+                rebuild_session_index(key)
+
+# --- LOOKUP INDEXES ---
+
+def email_key(record: Dict[str, Any]) -> str:
+    return (record.get('email') or '').strip().lower()
+
+def edid_key(record: Dict[str, Any]) -> str:
+    return (record.get('edid') or '').strip().upper()
+
+class RecordIndex:
+    """
+    Hash indexes over a list of records: id -> record, plus normalised
+    secondary keys (email, EDID) -> records, so lookups don't scan the list.
+    """
+    def __init__(self, records: List[Dict[str, Any]], **key_funcs):
+        self.key_funcs = key_funcs
+        self.rebuild(records)
+
+    def rebuild(self, records: List[Dict[str, Any]]):
+        self.by_id: Dict[str, Dict[str, Any]] = {}
+        self.by_key: Dict[str, Dict[str, List[Dict[str, Any]]]] = {name: {} for name in self.key_funcs}
+        for record in records:
+            self.add(record)
+
+    def add(self, record: Dict[str, Any]):
+        """Patches a newly added record into the index."""
+        self.by_id[record['id']] = record
+        for name, key_func in self.key_funcs.items():
+            key = key_func(record)
+            if key:
+                self.by_key[name].setdefault(key, []).append(record)
+
+    def get(self, record_id: str) -> Optional[Dict[str, Any]]:
+        return self.by_id.get(record_id)
+
+    def find(self, name: str, key: str, include_archived: bool = False) -> Optional[Dict[str, Any]]:
+        """Returns the first record whose normalised key matches; archived records are skipped by default."""
+        for record in self.by_key[name].get(key, []):
+            if include_archived or not record.get('archived', False):
+                return record
+        return None
+
+class IncidentAggregates:
+    """
+    Per-student incident totals: count, critical count and last incident date.
+    Built with one groupby over the incident store and updated as incidents are added.
+    """
+    def __init__(self, store: IncidentStore):
+        self.rebuild(store)
+
+    def rebuild(self, store: IncidentStore):
+        grouped = store.frame.groupby('student_id', observed=True).agg(
+            count=('id', 'size'),
+            critical=('is_critical', 'sum'),
+            last_date=('date_parsed', 'max'),
+        )
+        self.by_student: Dict[str, Dict[str, Any]] = {
+            student_id: {
+                'count': int(row.count),
+                'critical': int(row.critical),
+                'last_date': row.last_date.strftime('%Y-%m-%d') if pd.notna(row.last_date) else '',
+            }
+            for student_id, row in zip(grouped.index, grouped.itertuples())
+        }
+
+    def add(self, incident: Dict[str, Any]):
+        stats = self.by_student.setdefault(
+            incident.get('student_id'), {'count': 0, 'critical': 0, 'last_date': ''}
+        )
+        stats['count'] += 1
+        if incident.get('is_critical', False):
+            stats['critical'] += 1
+        stats['last_date'] = max(stats['last_date'], incident.get('date') or '')
+
+    def get(self, student_id: str) -> Dict[str, Any]:
+        return self.by_student.get(student_id, {'count': 0, 'critical': 0, 'last_date': ''})
+
+# session list -> (index key in session state, index builder)
+INDEXED_LISTS = {
+    'students_list': ('student_index', lambda records: RecordIndex(records, edid=edid_key)),
+    'staff_list': ('staff_index', lambda records: RecordIndex(records, email=email_key)),
+    'incident_store': ('incident_aggregates', IncidentAggregates),
+}
+
+def rebuild_session_index(list_key: str):
+    """Rebuilds the index for a session list after it has been replaced."""
+    index_key, build = INDEXED_LISTS[list_key]
+    st.session_state[index_key] = build(st.session_state[list_key])
+
 # --- SESSION STATE INITIALIZATION ---
 
 def initialize_session_state():
-    """Initialize all session state variables from Supabase"""
+    """Initialize all session state variables from the shared data cache"""
     if 'data_loaded' not in st.session_state:
         with st.spinner("Loading data from database..."):
-            # Load from Supabase
-            st.session_state.students_list = load_students_from_db()
-            st.session_state.staff_list = load_staff_from_db()
-            st.session_state.incidents = load_incidents_from_db()
-            st.session_state.system_settings = load_system_settings()
+            progress = st.empty()
+            sync_shared_data(incident_progress=lambda n: progress.caption(f"Loaded {n} incidents..."))
+            progress.empty()
             st.session_state.data_loaded = True
+    else:
+        sync_shared_data()
     
     if 'current_page' not in st.session_state:
         st.session_state.current_page = 'login'
@@ -898,7 +824,7 @@ def get_student_by_id(student_id: str) -> Optional[Dict[str, str]]:
     try:
         if not student_id:
             return None
-        return next((s for s in st.session_state.students_list if s['id'] == student_id), None)
+        return st.session_state.student_index.get(student_id)
     except Exception as e:
         logger.error(f"Error retrieving student: {e}")
         return None
@@ -916,7 +842,7 @@ def get_staff_by_id(staff_id: str) -> Optional[Dict[str, Any]]:
     try:
         if not staff_id:
             return None
-        return next((s for s in st.session_state.staff_list if s['id'] == staff_id), None)
+        return st.session_state.staff_index.get(staff_id)
     except Exception as e:
         logger.error(f"Error retrieving staff member: {e}")
         return None
@@ -956,8 +882,7 @@ def add_staff_member(first_name: str, last_name: str, email: str, role: str) ->
         full_name = f"{first_name.strip()} {last_name.strip()}"
         
         # Check for duplicate email in current session
-        existing_email = [s for s in st.session_state.staff_list if s.get('email', '').lower() == email.strip().lower() and not s.get('archived', False)]
-        if existing_email:
+        if st.session_state.staff_index.find('email', email.strip().lower()):
             raise ValidationError("Duplicate email", "A staff member with this email already exists")
         
         new_staff = {
@@ -977,6 +902,9 @@ def add_staff_member(first_name: str, last_name: str, email: str, role: str) ->
         if response.data:
             # Update session state
             st.session_state.staff_list.append(response.data[0])
+            st.session_state.staff_index.add(response.data[0])
+            invalidate_shared_data('staff')
+            audit_change('staff', response.data[0].get('id'), 'INSERT', new=response.data[0])
             logger.info(f"Added staff member: {full_name} ({email}, {role})")
             return True
         else:
@@ -996,18 +924,19 @@ def archive_staff_member(staff_id: str) -> bool:
             raise ValidationError("Staff member not found", "Cannot archive: staff member not found")
         
         # Update in Supabase
-        supabase = get_supabase_client()
-        response = supabase.table('staff').update({
+        changes = {
             'archived': True,
             'active': False,
             'archived_date': datetime.now().isoformat()
-        }).eq('id', staff_id).execute()
+        }
+        supabase = get_supabase_client()
+        response = supabase.table('staff').update(changes).eq('id', staff_id).execute()
         
         if response.data:
             # Update session state
-            staff['archived'] = True
-            staff['active'] = False
-            staff['archived_date'] = datetime.now().isoformat()
+            audit_change('staff', staff_id, 'UPDATE', old=staff, new=changes)
+            staff.update(changes)
+            invalidate_shared_data('staff')
             
             logger.info(f"Archived staff member: {staff['name']}")
             return True
@@ -1026,16 +955,18 @@ def unarchive_staff_member(staff_id: str) -> bool:
             raise ValidationError("Staff member not found", "Cannot unarchive: staff member not found")
         
         # Update in Supabase
-        supabase = get_supabase_client()
-        response = supabase.table('staff').update({
+        changes = {
             'archived': False,
             'active': True
-        }).eq('id', staff_id).execute()
+        }
+        supabase = get_supabase_client()
+        response = supabase.table('staff').update(changes).eq('id', staff_id).execute()
         
         if response.data:
             # Update session state
-            staff['archived'] = False
-            staff['active'] = True
+            audit_change('staff', staff_id, 'UPDATE', old=staff, new=changes)
+            staff.update(changes)
+            invalidate_shared_data('staff')
             
             logger.info(f"Unarchived staff member: {staff['name']}")
             return True
@@ -1070,8 +1001,7 @@ def add_student(first_name: str, last_name: str, dob: datetime.date, program: st
         full_name = f"{first_name.strip()} {last_name.strip()}"
         
         # Check for duplicate EDID in current session
-        existing_edid = [s for s in st.session_state.students_list if s.get('edid', '').upper() == edid.strip().upper() and not s.get('archived', False)]
-        if existing_edid:
+        if st.session_state.student_index.find('edid', edid.strip().upper()):
             raise ValidationError("Duplicate EDID", f"A student with EDID {edid} already exists")
         
         # Validate DOB is not in the future
@@ -1097,6 +1027,9 @@ def add_student(first_name: str, last_name: str, dob: datetime.date, program: st
         if response.data:
             # Update session state
             st.session_state.students_list.append(response.data[0])
+            st.session_state.student_index.add(response.data[0])
+            invalidate_shared_data('students')
+            audit_change('students', response.data[0].get('id'), 'INSERT', new=response.data[0])
             logger.info(f"Added student: {full_name} (EDID: {edid}, Program: {program})")
             return True
         else:
@@ -1132,8 +1065,8 @@ def verify_login(email: str) -> Optional[Dict[str, Any]]:
         
         email = email.strip().lower()
         
-        # Check in staff list
-        staff_member = next((s for s in st.session_state.staff_list if s.get('email', '').lower() == email and not s.get('archived', False)), None)
+        # Check in staff index
+        staff_member = st.session_state.staff_index.find('email', email)
         
         return staff_member
     except Exception as e:
@@ -1250,114 +1183,8 @@ def render_landing_page():
     
     st.markdown("---")
     
-    # Spectacular animated header
+    # Spectacular animated header (styles come from the theme bundle)
     st.markdown("""
-    <style>
-    @keyframes gradient-shift {
-        0% { background-position: 0% 50%; }
-        50% { background-position: 100% 50%; }
-        100% { background-position: 0% 50%; }
-    }
-    
-    @keyframes float {
-        0%, 100% { transform: translateY(0px); }
-        50% { transform: translateY(-20px); }
-    }
-    
-    @keyframes pulse {
-        0%, 100% { transform: scale(1); }
-        50% { transform: scale(1.05); }
-    }
-    
-    .hero-section {
-        text-align: center;
-        padding: 3rem 2rem;
-        margin-bottom: 3rem;
-        background: rgba(255, 255, 255, 0.15);
-        -webkit-backdrop-filter: blur(20px);
-        backdrop-filter: blur(20px);
-        border-radius: 30px;
-        border: 2px solid rgba(255, 255, 255, 0.3);
-        box-shadow: 
-            0 25px 50px -12px rgba(0, 0, 0, 0.25),
-            inset 0 1px 0 0 rgba(255, 255, 255, 0.2);
-    }
-    
-    .hero-icon {
-        font-size: 5rem;
-        margin-bottom: 1rem;
-        animation: float 3s ease-in-out infinite;
-        display: inline-block;
-        filter: drop-shadow(0 10px 20px rgba(0, 0, 0, 0.3));
-    }
-    
-    .hero-title {
-        font-family: 'Poppins', sans-serif;
-        font-size: 4rem;
-        font-weight: 900;
-        background: linear-gradient(135deg, #ffffff 0%, #a78bfa 50%, #ec4899 100%);
-        background-size: 200% 200%;
-        -webkit-background-clip: text;
-        -webkit-text-fill-color: transparent;
-        background-clip: text;
-        margin-bottom: 1rem;
-        animation: gradient-shift 5s ease infinite;
-        letter-spacing: -0.03em;
-        line-height: 1.2;
-        text-shadow: 0 0 40px rgba(167, 139, 250, 0.5);
-    }
-    
-    .hero-subtitle {
-        font-family: 'Inter', sans-serif;
-        font-size: 1.5rem;
-        color: rgba(255, 255, 255, 0.95);
-        font-weight: 500;
-        margin-bottom: 0.5rem;
-        text-shadow: 0 2px 10px rgba(0, 0, 0, 0.3);
-        letter-spacing: 0.02em;
-    }
-    
-    .hero-tagline {
-        font-family: 'Inter', sans-serif;
-        font-size: 1.1rem;
-        color: rgba(255, 255, 255, 0.8);
-        font-weight: 400;
-        max-width: 700px;
-        margin: 0 auto;
-        line-height: 1.6;
-        text-shadow: 0 2px 10px rgba(0, 0, 0, 0.2);
-    }
-    
-    .feature-badge {
-        display: inline-block;
-        background: rgba(255, 255, 255, 0.2);
-        -webkit-backdrop-filter: blur(10px);
-        backdrop-filter: blur(10px);
-        border: 1px solid rgba(255, 255, 255, 0.3);
-        padding: 0.5rem 1.5rem;
-        border-radius: 50px;
-        margin: 0.5rem;
-        font-size: 0.9rem;
-        color: white;
-        font-weight: 600;
-        box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1);
-        transition: all 0.3s ease;
-    }
-    
-    .feature-badge:hover {
-        background: rgba(255, 255, 255, 0.3);
-        transform: translateY(-2px);
-        box-shadow: 0 6px 12px rgba(0, 0, 0, 0.2);
-    }
-    
-    .divider-line {
-        height: 2px;
-        background: linear-gradient(90deg, transparent, rgba(255, 255, 255, 0.5), transparent);
-        margin: 3rem 0;
-        border-radius: 2px;
-    }
-    </style>
-    
     <div class="hero-section">
         <div class="hero-icon">📊✨</div>
         <h1 class="hero-title">Behaviour Support<br/>& Data Analysis</h1>
@@ -1464,8 +1291,10 @@ def render_program_students():
                             st.markdown(f"**Grade:** {student['grade']}")
                             st.caption(f"EDID: {student.get('edid', 'N/A')}")
                             
-                            incident_count = len([inc for inc in st.session_state.get('incidents', []) if inc.get('student_id') == student['id']])
-                            st.metric("Incidents", incident_count)
+                            stats = st.session_state.incident_aggregates.get(student['id'])
+                            st.metric("Incidents", stats['count'])
+                            if stats['count']:
+                                st.caption(f"Critical: {stats['critical']} | Last: {stats['last_date']}")
                             
                             col_view, col_log = st.columns(2)
                             with col_view:
@@ -1489,8 +1318,8 @@ def render_program_students():
                     st.markdown(f"**Profile Status:** {student.get('profile_status', 'N/A')}")
                     st.markdown(f"**EDID:** {student.get('edid', 'N/A')}")
                     
-                    incident_count = len([inc for inc in st.session_state.get('incidents', []) if inc.get('student_id') == student['id']])
-                    st.metric("Total Incidents", incident_count)
+                    stats = st.session_state.incident_aggregates.get(student['id'])
+                    st.metric("Total Incidents", stats['count'])
                     
                     if st.button("View Historical Data", key=f"view_arch_{student['id']}"):
                         navigate_to('student_analysis', student_id=student['id'])
@@ -1511,7 +1340,7 @@ def render_admin_portal():
     st.markdown("---")
     
     # Create tabs for different admin sections
-    tab1, tab2, tab3, tab4 = st.tabs(["👥 Staff Management", "🎓 Student Management", "📊 Reports", "⚙️ Settings"])
+    tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs(["👥 Staff Management", "🎓 Student Management", "📊 Reports", "📥 Import", "⏱️ Performance", "⚙️ Settings"])
     
     with tab1:
         render_staff_management()
@@ -1520,10 +1349,16 @@ def render_admin_portal():
         render_student_management()
     
     with tab3:
-        st.markdown("### 📊 System Reports")
-        st.info("Reports functionality - to be implemented")
+        render_incident_reports()
     
     with tab4:
+        render_incident_import()
+        render_rejected_incidents()
+    
+    with tab5:
+        render_performance_metrics()
+    
+    with tab6:
         st.markdown("### ⚙️ System Settings")
         st.info("Settings functionality - to be implemented")
 
@@ -1742,7 +1577,7 @@ def render_student_management():
                         'Added': student.get('created_date', 'N/A')
                     })
                 
-                df = pd.DataFrame(student_data)
+                df = record_frame(pd.DataFrame(student_data))
                 st.dataframe(df, use_container_width=True, hide_index=True)
     
     # All students view
@@ -1782,9 +1617,413 @@ def render_student_management():
                     'Status': student.get('profile_status', 'Draft'),
                 })
             
-            df = pd.DataFrame(student_data)
+            df = record_frame(pd.DataFrame(student_data))
             st.dataframe(df, use_container_width=True, hide_index=True)
 
+@handle_errors("Unable to load reports")
+def render_incident_reports():
+    """Renders cross-program reports from the server-side aggregation functions."""
+    
+    st.markdown("## 📊 Incident Reports")
+    st.caption("Counts are calculated in the database; only the summaries are downloaded.")
+    st.markdown("---")
+    
+    col_from, col_to, col_program = st.columns([2, 2, 1])
+    with col_from:
+        date_from = st.date_input("From", value=datetime.now().date() - timedelta(days=90),
+                                  key="report_date_from", format="DD/MM/YYYY")
+    with col_to:
+        date_to = st.date_input("To", value=datetime.now().date(), key="report_date_to", format="DD/MM/YYYY")
+    with col_program:
+        program_choice = st.selectbox("Program", options=["All"] + PROGRAM_OPTIONS, key="report_program")
+    
+    filters = {
+        'date_from': date_from.isoformat(),
+        'date_to': date_to.isoformat(),
+        'program': None if program_choice == "All" else program_choice,
+    }
+    
+    by_program = load_incident_report('by_program', **filters)
+    if by_program.empty:
+        st.info("No incidents recorded for this period.")
+        return
+    
+    total = int(by_program['incidents'].sum())
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Total Incidents", total)
+    with col2:
+        st.metric("Critical Incidents", int(by_program['critical_incidents'].sum()))
+    with col3:
+        st.metric("Average Severity", round(by_program['severity_sum'].sum() / total, 2))
+    
+    st.markdown("---")
+    
+    st.markdown("### 📚 Incidents by Program")
+    fig = px.bar(by_program, x='program', y='incidents', color='program',
+                 labels={'program': 'Program', 'incidents': 'Count'})
+    st.plotly_chart(fig, use_container_width=True)
+    
+    st.markdown("### ⚠️ Behaviour Types by Program")
+    by_behaviour = load_incident_report('by_program_behaviour', **filters)
+    if not by_behaviour.empty:
+        fig = px.bar(by_behaviour, x='behaviour_type', y='incidents', color='program', barmode='group',
+                     labels={'behaviour_type': 'Behaviour', 'incidents': 'Count', 'program': 'Program'})
+        fig.update_xaxes(tickangle=-45)
+        st.plotly_chart(fig, use_container_width=True)
+    
+    st.markdown("### 📅 Incident Trends Over Time")
+    by_week = load_incident_report('by_program_week', **filters)
+    if not by_week.empty:
+        fig = px.line(by_week, x='week_start', y='incidents', color='program', markers=True,
+                      labels={'week_start': 'Week', 'incidents': 'Count', 'program': 'Program'})
+        st.plotly_chart(fig, use_container_width=True)
+    
+    st.markdown("### 📍 Location Hotspots")
+    by_location = load_incident_report('by_location', **filters)
+    if not by_location.empty:
+        location_counts = (
+            by_location.groupby('location', as_index=False)['incidents'].sum()
+            .sort_values('incidents', ascending=False)
+            .head(10)
+        )
+        fig = px.bar(location_counts, x='incidents', y='location', orientation='h',
+                     labels={'location': 'Location', 'incidents': 'Count'})
+        st.plotly_chart(fig, use_container_width=True)
+
+# --- BULK INCIDENT IMPORT ---
+
+IMPORT_BATCH_SIZE = 500
+IMPORT_CSV_CHUNK_ROWS = 5000
+
+# Accepted header spellings -> incident field
+IMPORT_COLUMN_ALIASES = {
+    'edid': 'edid', 'student_edid': 'edid',
+    'incident_date': 'incident_date', 'date': 'incident_date',
+    'incident_time': 'incident_time', 'time': 'incident_time',
+    'location': 'location',
+    'behaviour_type': 'behaviour_type', 'behaviour': 'behaviour_type', 'behavior_type': 'behaviour_type', 'behavior': 'behaviour_type',
+    'antecedent': 'antecedent',
+    'intervention': 'intervention',
+    'support_type': 'support_type',
+    'severity': 'severity',
+    'description': 'description',
+    'reported_by_name': 'reported_by_name', 'reported_by': 'reported_by_name', 'staff': 'reported_by_name',
+    'reported_by_email': 'reported_by_email', 'staff_email': 'reported_by_email',
+    'reported_by_role': 'reported_by_role', 'role': 'reported_by_role',
+}
+IMPORT_REQUIRED_COLUMNS = [
+    'edid', 'incident_date', 'incident_time', 'location', 'behaviour_type',
+    'antecedent', 'intervention', 'support_type', 'severity',
+]
+# Accepted incident_date formats, tried in order for each value (never guessed from the first row)
+IMPORT_DATE_FORMATS = ('%Y-%m-%d', '%d/%m/%Y')
+# Incident ids are derived from the row (see import_incident_id), so importing the same file twice is harmless
+IMPORT_ID_NAMESPACE = uuid.UUID('6f1c7a52-3b0e-4d8e-9a65-2f4c1d9b7e10')
+
+def read_incident_import(uploaded_file):
+    """Yields the upload as DataFrames: CSVs are streamed in chunks, workbooks read once."""
+    if uploaded_file.name.lower().endswith(('.xlsx', '.xls')):
+        yield record_frame(pd.read_excel(uploaded_file, dtype=str))
+    else:
+        for chunk in pd.read_csv(uploaded_file, dtype=str, chunksize=IMPORT_CSV_CHUNK_ROWS):
+            yield record_frame(chunk)
+
+def parse_import_dates(values: pd.Series) -> pd.Series:
+    """
+    Parses each date on its own against IMPORT_DATE_FORMATS (NaT if none match).
+    A time part, as in Excel's '2024-03-05 00:00:00', is ignored.
+    """
+    dates = values.astype(str).str.strip().str.split(r'[ T]', n=1).str[0]
+    parsed = pd.Series(pd.NaT, index=values.index, dtype='datetime64[ns]')
+    for date_format in IMPORT_DATE_FORMATS:
+        parsed = parsed.fillna(pd.to_datetime(dates, format=date_format, errors='coerce'))
+    return parsed
+
+def import_incident_id(edid: str, incident_date: str, incident_time: str, location: str, behaviour_type: str) -> str:
+    """Deterministic id for an imported incident, so a re-upload maps onto the rows already inserted."""
+    key = '|'.join([edid.strip().upper(), incident_date, incident_time, location.strip().lower(), behaviour_type.strip().lower()])
+    return str(uuid.uuid5(IMPORT_ID_NAMESPACE, key))
+
+def prepare_incident_import(chunk: pd.DataFrame, first_row: int,
+                            seen_ids: Optional[Dict[str, int]] = None) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Turns one chunk of an import file into incident records, validating each row
+    with the same rules as the incident form. Students are resolved by EDID through
+    the session's student index. Returns (records, errors); rows are numbered as in
+    the spreadsheet (header = row 1). Pass the same seen_ids dict for every chunk
+    of a file to reject rows that repeat an earlier one.
+    """
+    chunk = chunk.rename(columns=lambda c: IMPORT_COLUMN_ALIASES.get(str(c).strip().lower().replace(' ', '_'), c))
+    missing = [col for col in IMPORT_REQUIRED_COLUMNS if col not in chunk.columns]
+    if missing:
+        raise ValidationError(f"Import missing columns {missing}", f"The file is missing required columns: {', '.join(missing)}")
+    chunk = chunk.fillna('')
+    
+    # Vectorised parsing and one index lookup per distinct EDID / staff email
+    dates = parse_import_dates(chunk['incident_date'])
+    times = pd.to_datetime(chunk['incident_time'], format='mixed', errors='coerce')
+    severities = pd.to_numeric(chunk['severity'], errors='coerce')
+    whole_severity = severities.notna() & (severities == severities.round())
+    severities = severities.where(whole_severity, 0).astype(int)
+    students = {key: st.session_state.student_index.find('edid', key, include_archived=True)
+                for key in chunk['edid'].str.strip().str.upper().unique()}
+    staff = {}
+    if 'reported_by_email' in chunk.columns:
+        staff = {key: st.session_state.staff_index.find('email', key, include_archived=True)
+                 for key in chunk['reported_by_email'].str.strip().str.lower().unique()}
+    
+    records, errors = [], []
+    for offset, row in enumerate(chunk.to_dict('records')):
+        row_number = first_row + offset + 2
+        student = students.get(row['edid'].strip().upper())
+        if not student:
+            errors.append({'row': row_number, 'edid': row['edid'], 'error': f"Unknown EDID '{row['edid']}'"})
+            continue
+        
+        member = staff.get(row.get('reported_by_email', '').strip().lower())
+        if member:
+            reported_by = {'id': member['id'], 'name': member['name'], 'role': member.get('role'), 'is_special': False}
+        elif row.get('reported_by_name', '').strip():
+            # Historical records name staff who may not have an account
+            reported_by = {'id': 'Import', 'name': row['reported_by_name'].strip(),
+                           'role': row.get('reported_by_role', '').strip() or 'Historical Record', 'is_special': True}
+        else:
+            reported_by = None
+        
+        if not whole_severity.iat[offset]:
+            errors.append({'row': row_number, 'edid': row['edid'],
+                           'error': f"Severity must be a whole number from 1 to 5 (got '{row['severity']}')"})
+            continue
+        # The form always sends these (its dropdowns have no blank option) and the columns are NOT NULL
+        blank = [col for col in ('antecedent', 'intervention', 'support_type') if not row[col].strip()]
+        if blank:
+            errors.append({'row': row_number, 'edid': row['edid'], 'error': f"Missing {', '.join(blank)}"})
+            continue
+        
+        incident_date = dates.iat[offset].date() if pd.notna(dates.iat[offset]) else None
+        incident_time = times.iat[offset].time() if pd.notna(times.iat[offset]) else None
+        try:
+            validate_incident_form(
+                row['location'].strip() or "--- Select Location ---", reported_by,
+                row['behaviour_type'].strip() or "--- Select behaviour ---",
+                severities.iat[offset], incident_date, incident_time
+            )
+        except ValidationError as e:
+            errors.append({'row': row_number, 'edid': row['edid'], 'error': e.user_message.replace('Please correct: ', '')})
+            continue
+        
+        incident_id = import_incident_id(
+            row['edid'], incident_date.strftime('%Y-%m-%d'), incident_time.strftime('%H:%M:%S'),
+            row['location'], row['behaviour_type']
+        )
+        if seen_ids is not None:
+            if incident_id in seen_ids:
+                errors.append({'row': row_number, 'edid': row['edid'], 'error': f"Duplicate of row {seen_ids[incident_id]}"})
+                continue
+            seen_ids[incident_id] = row_number
+        
+        severity = int(severities.iat[offset])
+        records.append({
+            'id': incident_id,
+            'student_id': student['id'],
+            'incident_date': incident_date.strftime('%Y-%m-%d'),
+            'incident_time': incident_time.strftime('%H:%M:%S'),
+            'day_of_week': incident_date.strftime('%A'),
+            'session': get_session_window(incident_time),
+            'location': row['location'].strip(),
+            'reported_by_name': reported_by['name'],
+            'reported_by_id': None if reported_by['is_special'] else reported_by['id'],
+            'reported_by_role': reported_by['role'],
+            'is_special_staff': reported_by['is_special'],
+            'behaviour_type': row['behaviour_type'].strip(),
+            'antecedent': row['antecedent'].strip(),
+            'intervention': row['intervention'].strip(),
+            'support_type': row['support_type'].strip(),
+            'severity': severity,
+            'description': row.get('description', '').strip() or None,
+            'is_critical': severity >= 4
+        })
+    return records, errors
+
+def import_incidents(records: List[Dict[str, Any]], on_progress=None) -> int:
+    """
+    Inserts records in batches of IMPORT_BATCH_SIZE. Ids are derived from each
+    row, so re-running an interrupted import (or importing the same file again)
+    does not duplicate rows.
+    """
+    inserted = skipped = 0
+    for start in range(0, len(records), IMPORT_BATCH_SIZE):
+        batch = records[start:start + IMPORT_BATCH_SIZE]
+        new_rows = insert_incident_batch(batch)
+        audit_many('incidents', 'INSERT', new_rows)
+        skipped += len(batch) - len(new_rows)
+        inserted += len(batch)
+        if on_progress:
+            on_progress(inserted, len(records))
+    if skipped:
+        logger.info(f"Import skipped {skipped} incidents that were already in the database")
+    
+    st.session_state.incident_store.upsert([normalize_incident(dict(r)) for r in records])
+    rebuild_session_index('incident_store')
+    invalidate_shared_data('incidents')
+    return inserted
+
+@handle_errors("Unable to load incident import")
+def render_incident_import():
+    """Admin bulk import of historical incidents from CSV or Excel."""
+    
+    st.markdown("## 📥 Import Incidents")
+    st.caption(
+        "Required columns: " + ", ".join(IMPORT_REQUIRED_COLUMNS) +
+        ". Optional: description, reported_by_name, reported_by_email, reported_by_role. "
+        "Students are matched by EDID; dates are YYYY-MM-DD or DD/MM/YYYY and severity "
+        "must be a whole number from 1 to 5."
+    )
+    
+    uploaded = st.file_uploader("Incident file", type=['csv', 'xlsx'], key="incident_import_file")
+    if uploaded is None:
+        st.session_state.pop('incident_import', None)
+        return
+    
+    # Parse and validate once per uploaded file, not on every rerun
+    state = st.session_state.get('incident_import')
+    if state is None or state['file_id'] != uploaded.file_id:
+        records, errors, first_row, seen_ids = [], [], 0, {}
+        with st.spinner("Validating file..."):
+            for chunk in read_incident_import(uploaded):
+                chunk_records, chunk_errors = prepare_incident_import(chunk, first_row, seen_ids)
+                records.extend(chunk_records)
+                errors.extend(chunk_errors)
+                first_row += len(chunk)
+        state = {'file_id': uploaded.file_id, 'records': records, 'errors': errors, 'rows': first_row, 'imported': 0}
+        st.session_state.incident_import = state
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Rows", state['rows'])
+    with col2:
+        st.metric("Ready to Import", len(state['records']))
+    with col3:
+        st.metric("Rejected", len(state['errors']))
+    
+    if state['errors']:
+        rejected = pd.DataFrame(state['errors'])
+        with st.expander(f"⚠️ {len(rejected)} rows will be skipped"):
+            st.dataframe(rejected.head(500), use_container_width=True, hide_index=True)
+            st.download_button("Download rejected rows", rejected.to_csv(index=False),
+                               file_name="rejected_incidents.csv", mime="text/csv")
+    
+    if state['imported']:
+        st.success(f"✅ Imported {state['imported']} incidents")
+        return
+    
+    if state['records'] and st.button(f"Import {len(state['records'])} Incidents", type="primary"):
+        progress = st.progress(0.0)
+        state['imported'] = import_incidents(
+            state['records'],
+            on_progress=lambda done, total: progress.progress(done / total, text=f"Inserted {done} of {total}")
+        )
+        logger.info(f"Imported {state['imported']} incidents from {uploaded.name}")
+        st.rerun()
+
+@handle_errors("Unable to load rejected incidents")
+def render_rejected_incidents():
+    """Incidents from the form that the database rejected, with retry and discard."""
+    
+    incident_queue = get_incident_queue()
+    dead = incident_queue.dead_letters()
+    if not dead:
+        return
+    
+    st.markdown("## 🚫 Rejected Incidents")
+    st.caption("These incidents were saved from the form but the database would not accept them, "
+               "so they are no longer shown in the app. Retry once the cause is fixed, or discard them.")
+    rejected = pd.DataFrame([
+        {
+            'id': d['key'],
+            'student_id': d['record'].get('student_id'),
+            'incident_date': d['record'].get('incident_date'),
+            'reported_by_name': d['record'].get('reported_by_name'),
+            'attempts': d['attempts'],
+            'failed_at': datetime.fromtimestamp(d['failed_at']).strftime('%Y-%m-%d %H:%M'),
+            'error': d['error'],
+        }
+        for d in dead
+    ])
+    st.dataframe(rejected, use_container_width=True, hide_index=True)
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        if st.button(f"🔁 Retry {len(dead)} Incidents", key="dead_retry", use_container_width=True):
+            incident_queue.requeue_dead(rejected['id'].tolist())
+            st.rerun()
+    with col2:
+        if st.button(f"🗑️ Discard {len(dead)} Incidents", key="dead_discard", use_container_width=True):
+            incident_queue.discard_dead(rejected['id'].tolist())
+            logger.warning(f"Discarded {len(dead)} rejected incidents")
+            st.rerun()
+
+# --- PERFORMANCE METRICS ---
+
+@handle_errors("Unable to load performance metrics")
+def render_performance_metrics():
+    """Renders per-page render timings recorded by handle_errors (admins only)."""
+
+    st.markdown("## ⏱️ Page Performance")
+
+    if (st.session_state.get('current_user') or {}).get('role') != 'ADM':
+        st.info("Performance data is only available to administrators.")
+        return
+
+    metrics = get_render_metrics()
+    st.caption(f"The last {metrics.window} renders of each page on this server since it started. "
+               "Database time and DataFrame counts include any sections the page renders.")
+
+    by_page = metrics.summary('page')
+    if by_page.empty:
+        st.info("No renders recorded yet.")
+        return
+
+    st.markdown("### 📄 By Page")
+    st.dataframe(by_page, use_container_width=True, hide_index=True)
+
+    st.markdown("### 📊 Render Time Distribution")
+    page = st.selectbox("Page", options=["All pages"] + by_page['page'].tolist(), key="perf_page")
+    histogram = metrics.histogram(None if page == "All pages" else page)
+    fig = px.bar(histogram, x='bucket', y='renders', labels={'bucket': 'Render time', 'renders': 'Renders'})
+    st.plotly_chart(fig, use_container_width=True)
+
+    st.markdown("### 👤 By User and Page")
+    st.dataframe(metrics.summary(['user', 'page']), use_container_width=True, hide_index=True)
+
+    st.markdown("### 🐢 Slowest Recent Renders")
+    slowest = metrics.samples().nlargest(20, 'ms').round({'ms': 1, 'db_ms': 1})
+    st.dataframe(slowest, use_container_width=True, hide_index=True)
+
+    st.markdown("### 🗄️ Database Queries")
+    query_metrics = get_query_metrics()
+    st.caption(f"Per query shape (table, operation and filter columns); percentiles over the last "
+               f"{query_metrics.window} calls of each. Also written to {query_metrics.export_path} "
+               f"every {query_metrics.export_seconds:.0f}s.")
+    queries = query_metrics.summary()
+    if queries.empty:
+        st.info("No queries recorded yet.")
+    else:
+        st.dataframe(queries, use_container_width=True, hide_index=True)
+
+    queued = get_incident_queue().stats()
+    st.caption(f"Incident write queue: {queued['pending']} pending, {queued['flushed']} flushed, "
+               f"{queued['dead']} rejected" + (f" (last error: {queued['last_error']})" if queued['last_error'] else ""))
+    audit = get_audit_log().stats()
+    st.caption(f"Audit log writer: {audit['pending']} queued, {audit['written']} written, "
+               f"{audit['dropped']} dropped" + (f" (last error: {audit['last_error']})" if audit['last_error'] else ""))
+
+    if st.button("Reset Metrics", key="perf_reset"):
+        metrics.clear()
+        query_metrics.clear()
+        st.rerun()
+
 def calculate_age(dob_str: str) -> str:
     """Calculate age from date of birth string."""
     try:
@@ -1798,89 +2037,121 @@ def calculate_age(dob_str: str) -> str:
         logger.error(f"Error calculating age: {e}")
         return "N/A"
 
-def generate_student_report(student: Dict[str, Any], incidents: List[Dict[str, Any]]) -> Optional[str]:
-    """Generates a comprehensive Word document report with charts and analysis."""
+def generate_student_report(student: Dict[str, Any], incidents: pd.DataFrame) -> Optional[bytes]:
+    """
+    Generates a comprehensive Word document report with charts and analysis.
+    The document and its images are assembled in memory; returns the .docx bytes.
+    """
     try:
-        import subprocess
-        
-        # Check if Node.js is available
-        try:
-            subprocess.run(['node', '--version'], capture_output=True, check=True)
-        except (FileNotFoundError, subprocess.CalledProcessError):
-            logger.warning("Node.js not available - cannot generate reports")
-            return None
+        from docx import Document
+        from docx.shared import Inches, Pt, RGBColor
+        from docx.enum.text import WD_ALIGN_PARAGRAPH
         
-        # Create temporary directory for charts
-        chart_dir = "/home/claude/report_charts"
-        subprocess.run(['mkdir', '-p', chart_dir], check=True)
+        stats = summary_statistics(incidents)
         
-        # Generate and save charts as images
-        chart_files = {}
+        # Build the charts, then render them to PNG bytes in one batch on the warm renderer
+        figures = {}
         
         # 1. Timeline chart
-        timeline_data = pd.DataFrame([{
-            'Date': inc['date'],
-            'Count': 1
-        } for inc in incidents])
-        timeline_data['Date'] = pd.to_datetime(timeline_data['Date'])
-        daily_counts = timeline_data.groupby('Date').size().reset_index(name='Count')
+        daily_counts = incidents.groupby('date_parsed').size().reset_index(name='Count')
+        daily_counts.columns = ['Date', 'Count']
         
         fig = px.line(daily_counts, x='Date', y='Count', title='Incidents Over Time', markers=True)
-        fig.write_image(f"{chart_dir}/timeline.png", width=800, height=400)
-        chart_files['timeline'] = f"{chart_dir}/timeline.png"
+        figures['timeline'] = fig
         
         # 2. behaviour frequency chart
-        behaviour_counts = pd.DataFrame(incidents)['behaviour_type'].value_counts().reset_index()
+        behaviour_counts = stats['counts']['behaviour_type'].reset_index()
         behaviour_counts.columns = ['behaviour', 'Count']
         fig = px.bar(behaviour_counts, x='Count', y='behaviour', orientation='h', title='behaviour Frequency')
-        fig.write_image(f"{chart_dir}/behaviours.png", width=800, height=400)
-        chart_files['behaviours'] = f"{chart_dir}/behaviours.png"
+        figures['behaviours'] = fig
         
         # 3. Day of week chart
-        day_counts = pd.DataFrame(incidents)['day'].value_counts().reset_index()
+        day_counts = stats['counts']['day'].reset_index()
         day_counts.columns = ['Day', 'Count']
         day_order = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
         day_counts['Day'] = pd.Categorical(day_counts['Day'], categories=day_order, ordered=True)
         day_counts = day_counts.sort_values('Day')
         fig = px.bar(day_counts, x='Day', y='Count', title='Incidents by Day of Week')
-        fig.write_image(f"{chart_dir}/days.png", width=800, height=400)
-        chart_files['days'] = f"{chart_dir}/days.png"
+        figures['days'] = fig
         
         # 4. Location chart
-        location_counts = pd.DataFrame(incidents)['location'].value_counts().reset_index()
+        location_counts = stats['counts']['location'].reset_index()
         location_counts.columns = ['Location', 'Count']
         fig = px.bar(location_counts.head(10), x='Count', y='Location', orientation='h', title='Top 10 Incident Locations')
-        fig.write_image(f"{chart_dir}/locations.png", width=800, height=400)
-        chart_files['locations'] = f"{chart_dir}/locations.png"
-        
-        # Calculate key statistics
-        avg_severity = sum([inc.get('severity', 0) for inc in incidents]) / len(incidents)
-        critical_count = len([inc for inc in incidents if inc.get('is_critical', False)])
-        critical_rate = (critical_count / len(incidents) * 100) if len(incidents) > 0 else 0
-        
-        behaviour_counts_dict = pd.DataFrame(incidents)['behaviour_type'].value_counts()
-        top_behaviour = behaviour_counts_dict.index[0] if len(behaviour_counts_dict) > 0 else "N/A"
-        top_behaviour_count = behaviour_counts_dict.iloc[0] if len(behaviour_counts_dict) > 0 else 0
-        
-        antecedent_counts = pd.DataFrame(incidents)['antecedent'].value_counts()
-        top_antecedent = antecedent_counts.index[0] if len(antecedent_counts) > 0 else "N/A"
-        
-        location_counts_stat = pd.DataFrame(incidents)['location'].value_counts()
-        top_location = location_counts_stat.index[0] if len(location_counts_stat) > 0 else "N/A"
-        
-        day_counts_stat = pd.DataFrame(incidents)['day'].value_counts()
-        top_day = day_counts_stat.index[0] if len(day_counts_stat) > 0 else "N/A"
-        
-        session_counts = pd.DataFrame(incidents)['session'].value_counts()
-        top_session = session_counts.index[0] if len(session_counts) > 0 else "N/A"
-        
-        behaviour_pct = (top_behaviour_count/len(incidents)*100) if len(incidents) > 0 else 0
-        
-        # Note: Full docx generation code omitted for brevity
-        # Would require Node.js with docx library installed
-        
-        logger.info("Report generation attempted but requires Node.js/docx setup")
-        return None
+        figures['locations'] = fig
+        
+        chart_images = dict(zip(figures, render_charts(list(figures.values()), width=800, height=400)))
+        
+        # Key statistics
+        avg_severity = stats['avg_severity']
+        critical_count = stats['critical_count']
+        critical_rate = stats['critical_rate']
+        
+        top_behaviour = stats['top']['behaviour_type']
+        top_behaviour_count = stats['counts']['behaviour_type'].iloc[0] if stats['total'] > 0 else 0
+        top_antecedent = stats['top']['antecedent']
+        top_location = stats['top']['location']
+        top_day = stats['top']['day']
+        top_session = stats['top']['session']
+        
+        behaviour_pct = (top_behaviour_count / stats['total'] * 100) if stats['total'] > 0 else 0
+        
+        # Assemble the document
+        doc = Document()
+        
+        title = doc.add_heading('Student Behaviour Report', 0)
+        title.alignment = WD_ALIGN_PARAGRAPH.CENTER
+        
+        doc.add_heading('Student Information', 1)
+        info_rows = [
+            ('Student:', student['name']),
+            ('Grade:', str(student.get('grade', 'N/A'))),
+            ('Program:', student.get('program', 'N/A')),
+            ('EDID:', student.get('edid') or 'N/A'),
+            ('Age:', calculate_age(student.get('dob', ''))),
+            ('Report Date:', datetime.now().strftime('%d/%m/%Y')),
+        ]
+        info_table = doc.add_table(rows=len(info_rows), cols=2)
+        info_table.style = 'Light Grid Accent 1'
+        for row, (label, value) in zip(info_table.rows, info_rows):
+            row.cells[0].text = label
+            row.cells[1].text = value
+        
+        doc.add_heading('Summary', 1)
+        summary = doc.add_paragraph()
+        summary.add_run('Total Incidents: ').bold = True
+        summary.add_run(f"{len(incidents)}\n")
+        summary.add_run('Critical Incidents: ').bold = True
+        summary.add_run(f"{critical_count} ({critical_rate:.0f}%)\n")
+        summary.add_run('Average Severity: ').bold = True
+        summary.add_run(f"{avg_severity:.2f}\n")
+        summary.add_run('Period: ').bold = True
+        summary.add_run(f"{stats['first_date']:%d/%m/%Y} to {stats['last_date']:%d/%m/%Y}")
+        
+        doc.add_heading('Key Patterns', 1)
+        doc.add_paragraph(f"Most frequent behaviour: {top_behaviour} ({behaviour_pct:.0f}% of incidents)", style='List Bullet')
+        doc.add_paragraph(f"Most common trigger: {top_antecedent}", style='List Bullet')
+        doc.add_paragraph(f"Hotspot location: {top_location}", style='List Bullet')
+        doc.add_paragraph(f"Highest-risk day: {top_day}", style='List Bullet')
+        doc.add_paragraph(f"Highest-risk session: {top_session}", style='List Bullet')
+        
+        doc.add_page_break()
+        doc.add_heading('Charts', 1)
+        for key, heading in [('timeline', 'Incidents Over Time'), ('behaviours', 'Behaviour Frequency'),
+                             ('days', 'Incidents by Day of Week'), ('locations', 'Top Incident Locations')]:
+            doc.add_heading(heading, 2)
+            doc.add_picture(BytesIO(chart_images[key]), width=Inches(6))
+        
+        footer = doc.add_paragraph()
+        footer.alignment = WD_ALIGN_PARAGRAPH.CENTER
+        footer_run = footer.add_run('\n\nGenerated by CLC Behaviour Support\n')
+        footer_run.font.size = Pt(9)
+        footer_run.font.color.rgb = RGBColor(128, 128, 128)
+        footer.add_run(datetime.now().strftime('%d %B %Y'))
+        
+        buffer = BytesIO()
+        doc.save(buffer)
+        return buffer.getvalue()
         
     except Exception as e:
         logger.error(f"Error generating report: {e}", exc_info=True)
@@ -2052,26 +2323,21 @@ def render_direct_log_form():
                     'is_critical': severity_level >= 4
                 }
                 
-                # Save to Supabase
-                supabase = get_supabase_client()
-                response = supabase.table('incidents').insert(new_incident).execute()
+                # Queue locally (assigns the id) and show it straight away;
+                # the background flusher inserts it into Supabase and audits it once it lands
+                incident_queue = get_incident_queue()
+                queued_incident = incident_queue.enqueue(new_incident)
+                saved_incident = normalize_incident(dict(queued_incident))
+                st.session_state.incident_store.append([saved_incident])
+                st.session_state.incident_aggregates.add(saved_incident)
                 
-                if response.data:
-                    # Update session state with the returned record (includes DB-generated ID)
-                    saved_incident = response.data[0]
-                    # Convert DB field names back to app field names for backward compatibility
-                    saved_incident['date'] = saved_incident['incident_date']
-                    saved_incident['time'] = saved_incident['incident_time']
-                    saved_incident['day'] = saved_incident['day_of_week']
-                    st.session_state.incidents.append(saved_incident)
-                    
-                    st.success("✅ Incident report submitted successfully!")
-                    
-                    if severity_level >= 4:
-                        st.warning("⚠️ This is a critical incident (Severity 4-5). Please complete a Critical Incident ABCH form.")
-                else:
-                    st.error("Failed to save incident to database")
-                    return
+                st.success("✅ Incident report submitted successfully!")
+                pending = incident_queue.pending_count()
+                if pending > 1:
+                    st.caption(f"{pending} incidents waiting to sync to the database")
+                
+                if severity_level >= 4:
+                    st.warning("⚠️ This is a critical incident (Severity 4-5). Please complete a Critical Incident ABCH form.")
                 
                 # Option to add another or return
                 col_another, col_return = st.columns(2)
@@ -2118,9 +2384,9 @@ def render_student_analysis():
     st.markdown("---")
     
     # Get all incidents for this student
-    student_incidents = [inc for inc in st.session_state.incidents if inc.get('student_id') == student_id]
+    student_df = record_frame(st.session_state.incident_store.for_student(student_id))
     
-    if not student_incidents:
+    if student_df.empty:
         st.info("No incident data available for this student yet.")
         st.markdown("### Actions")
         if st.button("📝 Log First Incident", type="primary"):
@@ -2129,29 +2395,58 @@ def render_student_analysis():
     
     # Summary Metrics
     st.markdown("### 📈 Summary Statistics")
+    stats = summary_statistics(student_df)
     
     col1, col2, col3, col4, col5 = st.columns(5)
     
     with col1:
-        st.metric("Total Incidents", len(student_incidents))
+        st.metric("Total Incidents", stats['total'])
     
     with col2:
-        critical_count = len([inc for inc in student_incidents if inc.get('is_critical', False)])
-        st.metric("Critical Incidents", critical_count, delta=None if critical_count == 0 else f"{(critical_count/len(student_incidents)*100):.0f}%")
+        critical_count = stats['critical_count']
+        st.metric("Critical Incidents", critical_count, delta=None if critical_count == 0 else f"{stats['critical_rate']:.0f}%")
     
     with col3:
-        avg_severity = sum([inc.get('severity', 0) for inc in student_incidents]) / len(student_incidents)
-        st.metric("Avg Severity", f"{avg_severity:.1f}")
+        st.metric("Avg Severity", f"{stats['avg_severity']:.1f}")
     
     with col4:
-        # Get date range
-        dates = [datetime.strptime(inc['date'], '%Y-%m-%d') for inc in student_incidents]
-        days_span = (max(dates) - min(dates)).days + 1 if len(dates) > 0 else 1
-        st.metric("Days Tracked", days_span)
+        st.metric("Days Tracked", stats['days_tracked'])
     
     with col5:
-        incidents_per_week = (len(student_incidents) / days_span) * 7 if days_span > 0 else 0
-        st.metric("Incidents/Week", f"{incidents_per_week:.1f}")
+        st.metric("Incidents/Week", f"{stats['incidents_per_week']:.1f}")
+    
+    st.markdown("---")
+    
+    # Daily trend from the server-side rollup; fall back to the local store if it is unavailable
+    st.markdown("### 📅 Incident Frequency Over Time")
+    rollup = load_daily_rollup((student_id,))
+    if rollup.empty:
+        rollup = daily_rollup(student_df)
+    daily = daily_series(rollup).rename(columns={
+        'incident_date': 'Date', 'incidents': 'Incidents', 'moving_average': '7-day average'
+    })
+    fig = px.line(daily, x='Date', y=['Incidents', '7-day average'], title='Daily Incidents (7-Day Moving Average)')
+    fig.update_layout(yaxis_title='Incidents', legend_title_text='')
+    st.plotly_chart(fig, use_container_width=True)
+    
+    st.markdown("---")
+    
+    # Word report, built in memory and streamed straight to the browser
+    st.markdown("### 📄 Student Report")
+    report_key = f"student_report_{student_id}"
+    if st.button("Generate Report", key="generate_student_report"):
+        with st.spinner("Building report..."):
+            st.session_state[report_key] = generate_student_report(student, student_df)
+        if st.session_state[report_key] is None:
+            st.error("Unable to generate the report. Please try again.")
+    if st.session_state.get(report_key):
+        st.download_button(
+            "⬇️ Download Report (.docx)",
+            data=st.session_state[report_key],
+            file_name=f"Report_{student['name'].replace(' ', '_')}_{datetime.now().strftime('%Y%m%d')}.docx",
+            mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+            key="download_student_report"
+        )
     
     st.markdown("---")
     
@@ -0,0 +1,231 @@
+"""
+Audit Log Writer for Behaviour Support App
+Collects audit_log rows (old/new JSONB diffs) in a bounded in-memory queue and
+inserts them in batches from a background thread, off the user's request path.
+"""
+
+import atexit
+import logging
+import queue
+import threading
+import uuid
+from datetime import datetime, timezone
+from time import monotonic
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+AUDIT_QUEUE_SIZE = 10000
+AUDIT_BATCH_SIZE = 200
+AUDIT_FLUSH_INTERVAL_SECONDS = 5.0
+# A batch that keeps failing is dropped after this many attempts so it can't block the rest
+AUDIT_MAX_ATTEMPTS = 5
+AUDIT_MAX_BACKOFF_SECONDS = 60
+
+AUDIT_ACTIONS = ('INSERT', 'UPDATE', 'DELETE')
+
+
+def _as_uuid(value: Any) -> Optional[str]:
+    """The value as a UUID string, or None (audit_log's id columns are UUIDs)."""
+    try:
+        return str(uuid.UUID(str(value)))
+    except (TypeError, ValueError):
+        return None
+
+
+def audit_diff(old: Optional[Dict[str, Any]], new: Optional[Dict[str, Any]]) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+    """
+    For an update, only the keys whose values changed, as (old, new).
+    Inserts (no old) and deletes (no new) keep the full record.
+    """
+    if old is None or new is None:
+        return (dict(old) if old is not None else None), (dict(new) if new is not None else None)
+    changed = [key for key in new if old.get(key) != new[key]]
+    return {key: old.get(key) for key in changed}, {key: new[key] for key in changed}
+
+
+class AuditLogWriter:
+    """
+    Buffered writer for the audit_log table.
+
+    record() only builds the row and puts it on the queue, so a write's latency
+    is unchanged. The flusher thread sends up to batch_size rows at a time,
+    whenever a batch fills or flush_interval passes, through insert_batch(rows).
+    When the queue is full (the database has been unreachable for a long time)
+    new entries are dropped and counted rather than blocking the caller.
+    """
+
+    def __init__(self, insert_batch: Callable[[List[Dict[str, Any]]], Any],
+                 max_queue: int = AUDIT_QUEUE_SIZE, batch_size: int = AUDIT_BATCH_SIZE,
+                 flush_interval: float = AUDIT_FLUSH_INTERVAL_SECONDS,
+                 max_attempts: int = AUDIT_MAX_ATTEMPTS):
+        self.insert_batch = insert_batch
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_attempts = max_attempts
+        self.written = 0
+        self.dropped = 0
+        self.failures = 0
+        self.last_error: Optional[str] = None
+
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._retry: List[Dict[str, Any]] = []
+        self._attempts = 0
+        self._stop = threading.Event()
+        self._flush_requested = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # --- producers ---
+
+    def record(self, table_name: str, record_id: Any, action: str,
+               old: Optional[Dict[str, Any]] = None, new: Optional[Dict[str, Any]] = None,
+               changed_by: Any = None) -> bool:
+        """Queues one audit row. Returns False if it was skipped or dropped."""
+        row = self._entry(table_name, record_id, action, old, new, changed_by)
+        if row is None:
+            return False
+        if not self._enqueue(row):
+            return False
+        if self._queue.qsize() >= self.batch_size:
+            self._flush_requested.set()
+        return True
+
+    def record_many(self, table_name: str, action: str, records: List[Dict[str, Any]],
+                    changed_by: Any = None) -> int:
+        """
+        Audits many inserted or deleted records (one entry per record id) for bulk
+        callers, writing them straight away in batches rather than through the
+        queue, which they would overflow. A batch that fails is queued for the
+        flusher to retry. Returns the number of entries written or queued.
+        """
+        rows = [row for row in (
+            self._entry(table_name, record.get('id'), action,
+                        record if action == 'DELETE' else None, record if action == 'INSERT' else None, changed_by)
+            for record in records
+        ) if row is not None]
+        accepted = 0
+        for start in range(0, len(rows), self.batch_size):
+            batch = rows[start:start + self.batch_size]
+            try:
+                self.insert_batch(batch)
+            except Exception as e:
+                self.failures += 1
+                self.last_error = str(e)
+                logger.warning(f"Audit write of {len(batch)} entries failed, queueing them: {e}")
+                accepted += sum(self._enqueue(row) for row in batch)
+                continue
+            self.written += len(batch)
+            accepted += len(batch)
+        return accepted
+
+    def _entry(self, table_name: str, record_id: Any, action: str, old: Optional[Dict[str, Any]],
+               new: Optional[Dict[str, Any]], changed_by: Any) -> Optional[Dict[str, Any]]:
+        """The audit_log row, or None if there is nothing to record."""
+        record_uuid = _as_uuid(record_id)
+        if record_uuid is None or action not in AUDIT_ACTIONS:
+            logger.debug(f"Audit entry skipped: {action} {table_name} {record_id}")
+            return None
+
+        old_data, new_data = audit_diff(old, new)
+        if action == 'UPDATE' and not new_data:
+            return None
+
+        return {
+            'table_name': table_name,
+            'record_id': record_uuid,
+            'action': action,
+            'old_data': old_data,
+            'new_data': new_data,
+            'changed_by': _as_uuid(changed_by),
+            'changed_at': datetime.now(timezone.utc).isoformat(),
+        }
+
+    def _enqueue(self, row: Dict[str, Any]) -> bool:
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            self.dropped += 1
+            if self.dropped == 1 or self.dropped % 1000 == 0:
+                logger.warning(f"Audit queue full; {self.dropped} entries dropped so far")
+            return False
+        return True
+
+    def pending_count(self) -> int:
+        return self._queue.qsize() + len(self._retry)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'pending': self.pending_count(),
+            'written': self.written,
+            'dropped': self.dropped,
+            'failures': self.failures,
+            'last_error': self.last_error,
+        }
+
+    # --- flusher ---
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='audit-log-flusher', daemon=True)
+            self._thread.start()
+            atexit.register(self.stop)
+
+    def stop(self, timeout: float = 5.0):
+        """Stops the flusher after one last attempt to write what is queued."""
+        self._stop.set()
+        self._flush_requested.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def flush_now(self):
+        self._flush_requested.set()
+
+    def _run(self):
+        backoff_until = 0.0
+        while not self._stop.is_set():
+            self._flush_requested.wait(self.flush_interval)
+            self._flush_requested.clear()
+            if monotonic() < backoff_until:
+                continue
+            # Drain in batches; stop early on a failure and back off
+            while self.pending_count() and self.flush_once():
+                pass
+            if self._retry:
+                backoff_until = monotonic() + min(AUDIT_MAX_BACKOFF_SECONDS, self.flush_interval * 2 ** self._attempts)
+        while self.pending_count() and self.flush_once():
+            pass
+
+    def _next_batch(self) -> List[Dict[str, Any]]:
+        batch, self._retry = self._retry, []
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def flush_once(self) -> bool:
+        """Sends one batch. Returns True if it was written (or there was nothing to send)."""
+        batch = self._next_batch()
+        if not batch:
+            return True
+        try:
+            self.insert_batch(batch)
+        except Exception as e:
+            self.failures += 1
+            self._attempts += 1
+            self.last_error = str(e)
+            if self._attempts >= self.max_attempts:
+                logger.error(f"Dropping {len(batch)} audit entries after {self._attempts} failed attempts: {e}")
+                self.dropped += len(batch)
+                self._attempts = 0
+            else:
+                logger.warning(f"Audit log flush of {len(batch)} entries failed (attempt {self._attempts}): {e}")
+                self._retry = batch
+            return False
+
+        self._attempts = 0
+        self.written += len(batch)
+        self.last_error = None
+        return True
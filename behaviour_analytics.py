@@ -0,0 +1,224 @@
+"""
+Behaviour Analytics Helpers for Behaviour Support App
+Vectorised pattern calculations shared by the analysis pages and reports.
+Works on any incident DataFrame (including IncidentStore views); no Streamlit.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+def behaviour_ngrams(df: pd.DataFrame, column: str = 'behaviour_type', n: int = 2,
+                     group_col: Optional[str] = None, sort_col: str = 'date_parsed') -> pd.DataFrame:
+    """
+    Consecutive n-step sequences of `column`, one row per sequence (step_1 ... step_n).
+    Rows are ordered by sort_col; with group_col (e.g. student_id) a sequence never
+    spans two groups, so a whole program cohort can be processed in one call.
+    """
+    step_cols = [f'step_{k + 1}' for k in range(n)]
+    sort_keys = [group_col, sort_col] if group_col else [sort_col]
+    ordered = df.sort_values(sort_keys, kind='stable')
+
+    values = ordered[column].astype('category')
+    categories = values.cat.categories
+    codes = values.cat.codes.to_numpy()
+    windows = len(codes) - n + 1
+    if windows <= 0:
+        return pd.DataFrame({col: pd.Categorical([], categories=categories) for col in step_cols})
+
+    keep = np.ones(windows, dtype=bool)
+    for k in range(n):
+        keep &= codes[k:k + windows] >= 0
+    if group_col:
+        # Groups are contiguous after sorting, so first and last step sharing a group is enough
+        groups = ordered[group_col].astype('category').cat.codes.to_numpy()
+        keep &= groups[:windows] == groups[n - 1:n - 1 + windows]
+
+    return pd.DataFrame({
+        col: pd.Categorical.from_codes(codes[k:k + windows][keep], categories=categories)
+        for k, col in enumerate(step_cols)
+    })
+
+
+def sequence_counts(df: pd.DataFrame, column: str = 'behaviour_type', n: int = 2,
+                    group_col: Optional[str] = None, sort_col: str = 'date_parsed') -> pd.DataFrame:
+    """
+    Frequency of each observed n-step sequence, most common first.
+    `probability` is P(last step | preceding steps); `sequence` is a display label.
+    """
+    grams = behaviour_ngrams(df, column, n, group_col, sort_col)
+    step_cols: List[str] = list(grams.columns)
+    if grams.empty:
+        return pd.DataFrame(columns=step_cols + ['count', 'probability', 'sequence'])
+
+    counts = grams.groupby(step_cols, observed=True).size().reset_index(name='count')
+    prefix_totals = counts.groupby(step_cols[:-1], observed=True)['count'].transform('sum')
+    counts['probability'] = counts['count'] / prefix_totals
+    counts['sequence'] = counts[step_cols].astype(str).agg(' → '.join, axis=1)
+    return counts.sort_values('count', ascending=False, kind='stable').reset_index(drop=True)
+
+
+def transition_matrix(df: pd.DataFrame, column: str = 'behaviour_type',
+                      group_col: Optional[str] = None, sort_col: str = 'date_parsed') -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    First-order transition matrix of `column`: (counts, probabilities).
+    Rows are the current behaviour, columns the next one; probabilities sum to 1 per row.
+    """
+    pairs = behaviour_ngrams(df, column, 2, group_col, sort_col)
+    counts = pd.crosstab(pairs['step_1'], pairs['step_2'], dropna=False)
+    counts.index.name, counts.columns.name = 'from', 'to'
+    totals = counts.sum(axis=1)
+    probabilities = counts.div(totals.where(totals > 0), axis=0).fillna(0.0)
+    return counts, probabilities
+
+
+SUMMARY_COLUMNS = ('behaviour_type', 'antecedent', 'location', 'day', 'session')
+
+
+def summary_statistics(df: pd.DataFrame, columns: Sequence[str] = SUMMARY_COLUMNS,
+                       date_col: str = 'date_parsed', missing: Any = 'N/A') -> Dict[str, Any]:
+    """
+    Every headline number for a set of incidents in one sweep over the frame:
+    total, critical_count, critical_rate (%), avg_severity, first_date, last_date,
+    days_tracked, incidents_per_week, plus for each category column its full
+    counts (most frequent first, ties alphabetical as with Series.mode) under
+    'counts' and its most frequent value under 'top' (`missing` when empty).
+    Critical incidents are the incident_type == 'Critical' rows of a plan frame
+    (quick and ABCH critical reports together), otherwise the is_critical flag.
+    """
+    total = len(df)
+    if 'incident_type' in df.columns:
+        critical = int((df['incident_type'] == 'Critical').sum())
+    elif 'is_critical' in df.columns:
+        critical = int(df['is_critical'].fillna(False).astype(bool).sum())
+    else:
+        critical = 0
+    severity = pd.to_numeric(df['severity'], errors='coerce') if 'severity' in df.columns else pd.Series(dtype=float)
+
+    first_date = last_date = None
+    days_tracked = 0
+    if total and date_col in df.columns:
+        first_date, last_date = df[date_col].min(), df[date_col].max()
+        days_tracked = (last_date - first_date).days + 1
+
+    stats = {
+        'total': total,
+        'critical_count': critical,
+        'critical_rate': critical / total * 100 if total else 0.0,
+        'avg_severity': float(severity.mean()) if severity.notna().any() else 0.0,
+        'first_date': first_date,
+        'last_date': last_date,
+        'days_tracked': days_tracked,
+        'incidents_per_week': total / days_tracked * 7 if days_tracked else 0.0,
+        'counts': {},
+        'top': {},
+    }
+
+    for col in columns:
+        if col not in df.columns:
+            stats['counts'][col] = pd.Series(dtype='int64', name='count')
+            stats['top'][col] = missing
+            continue
+        # Codes + bincount: one pass per column, no per-value boolean masks. Ties are
+        # broken on the values themselves, not on codes (a categorical's codes follow
+        # its category order, which concat_frames builds in order of appearance).
+        codes, uniques = pd.factorize(df[col])
+        tallies = np.bincount(codes[codes >= 0], minlength=len(uniques))
+        order = np.lexsort((np.asarray(uniques.astype(str)), -tallies))
+        counts = pd.Series(tallies[order], index=pd.Index(np.asarray(uniques)[order], name=col), name='count')
+        stats['counts'][col] = counts
+        stats['top'][col] = counts.index[0] if len(counts) else missing
+
+    return stats
+
+
+# Columns of the incident_daily_rollup table (see daily_rollup.sql)
+DAILY_ROLLUP_COLUMNS = [
+    'student_id', 'incident_date', 'incidents', 'severity_sum', 'critical_incidents',
+    'morning_incidents', 'middle_incidents', 'afternoon_incidents', 'other_session_incidents',
+]
+
+
+def daily_rollup(df: pd.DataFrame, date_col: str = 'date_parsed') -> pd.DataFrame:
+    """
+    Builds incident_daily_rollup rows from incidents in pandas, for data that has
+    not been through the database (or when the rollup table is unavailable).
+    """
+    if df.empty:
+        return pd.DataFrame(columns=DAILY_ROLLUP_COLUMNS)
+    session = df['session'].astype(str)
+    buckets = {name: session.str.startswith(name.capitalize()) for name in ('morning', 'middle', 'afternoon')}
+    parts = pd.DataFrame({
+        'student_id': df['student_id'],
+        'incident_date': df[date_col].dt.normalize(),
+        'incidents': 1,
+        'severity_sum': df['severity'].fillna(0).astype(int),
+        'critical_incidents': df['is_critical'].fillna(False).astype(int),
+        'morning_incidents': buckets['morning'].astype(int),
+        'middle_incidents': buckets['middle'].astype(int),
+        'afternoon_incidents': buckets['afternoon'].astype(int),
+        'other_session_incidents': (~(buckets['morning'] | buckets['middle'] | buckets['afternoon'])).astype(int),
+    })
+    return parts.groupby(['student_id', 'incident_date'], observed=True, as_index=False).sum()
+
+
+def daily_series(rollup: pd.DataFrame, window: int = 7) -> pd.DataFrame:
+    """
+    Collapses rollup rows (any number of students) into one row per calendar day,
+    filling days without incidents with zero, plus a `window`-day moving average.
+    """
+    if rollup.empty:
+        return pd.DataFrame(columns=['incident_date', 'incidents', 'severity_sum', 'critical_incidents', 'moving_average'])
+    totals = (
+        rollup.assign(incident_date=pd.to_datetime(rollup['incident_date']))
+        .groupby('incident_date')[['incidents', 'severity_sum', 'critical_incidents']]
+        .sum()
+    )
+    calendar = pd.date_range(totals.index.min(), totals.index.max(), freq='D', name='incident_date')
+    totals = totals.reindex(calendar, fill_value=0)
+    totals['moving_average'] = totals['incidents'].rolling(window=window, min_periods=1).mean()
+    return totals.reset_index()
+
+
+class AnalyticsCache:
+    """
+    Small LRU cache for derived analytics bundles.
+    Keys should include a data version so stale entries are never hit; they
+    simply age out as newer versions are stored.
+    """
+
+    def __init__(self, max_entries: int = 16):
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[Hashable, Any]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, builder: Callable[[], Any]) -> Any:
+        """Returns the cached value for key, building (and storing) it on a miss."""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+
+        value = builder()
+
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
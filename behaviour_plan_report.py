@@ -0,0 +1,278 @@
+"""
+Behaviour Analysis Plan Documents for Behaviour Support App
+Builds the Word plan (with kaleido-rendered graphs) outside Streamlit, so plans
+can be generated one at a time from a page or for whole programs in a process pool.
+"""
+
+import multiprocessing
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from io import BytesIO
+from time import perf_counter
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from behaviour_analytics import summary_statistics
+from chart_cache import render_charts
+
+
+def prepare_plan_frame(student_id: str, incidents: List[Dict[str, Any]],
+                       critical_incidents: List[Dict[str, Any]]) -> Optional[pd.DataFrame]:
+    """Quick and critical incidents for one student as a single date-sorted frame."""
+    quick = [i for i in incidents if i["student_id"] == student_id]
+    crit = [c for c in critical_incidents if c["student_id"] == student_id]
+    if not quick and not crit:
+        return None
+
+    quick_df = pd.DataFrame(quick) if quick else pd.DataFrame()
+    crit_df = pd.DataFrame(crit) if crit else pd.DataFrame()
+
+    if not quick_df.empty:
+        quick_df["incident_type"] = "Quick"
+        quick_df["date_parsed"] = pd.to_datetime(quick_df["date"])
+
+    if not crit_df.empty:
+        crit_df["incident_type"] = "Critical"
+        crit_df["date_parsed"] = pd.to_datetime(crit_df.get("created_at", datetime.now().isoformat()))
+        crit_df["severity"] = 5
+        crit_df["antecedent"] = crit_df["ABCH_primary"].apply(lambda d: d.get("A", "") if isinstance(d, dict) else "")
+        crit_df["behaviour_type"] = crit_df["ABCH_primary"].apply(lambda d: d.get("B", "") if isinstance(d, dict) else "")
+
+    return pd.concat([quick_df, crit_df], ignore_index=True).sort_values("date_parsed")
+
+
+PLAN_STAT_COLUMNS = ("behaviour_type", "antecedent", "location", "session")
+
+
+def plan_statistics(full_df: pd.DataFrame) -> Dict[str, Any]:
+    """summary_statistics for a plan frame, with the plan's 'Unknown' placeholder."""
+    return summary_statistics(full_df, columns=PLAN_STAT_COLUMNS, missing="Unknown")
+
+
+def plan_findings(full_df: pd.DataFrame, stats: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Top patterns and risk score, calculated as on the student analysis page."""
+    stats = stats or plan_statistics(full_df)
+    recent = full_df.tail(7)
+    risk_score = min(100, int(
+        (len(recent) / 7 * 10) +
+        (recent["severity"].mean() * 8) +
+        (stats["critical_rate"] / 2)
+    ))
+    return {
+        "top_ant": stats["top"]["antecedent"],
+        "top_beh": stats["top"]["behaviour_type"],
+        "top_loc": stats["top"]["location"],
+        "top_session": stats["top"]["session"],
+        "risk_score": risk_score,
+        "risk_level": "LOW" if risk_score < 30 else "MODERATE" if risk_score < 60 else "HIGH",
+    }
+
+
+def build_behaviour_plan_docx(student, full_df, top_ant, top_beh, top_loc, top_session, risk_score, risk_level,
+                              stats: Optional[Dict[str, Any]] = None) -> BytesIO:
+    """Word Behaviour Analysis Plan WITH embedded graphs (kaleido). Raises on failure."""
+    from docx import Document
+    from docx.shared import Pt, RGBColor, Inches
+    from docx.enum.text import WD_ALIGN_PARAGRAPH
+    import plotly.graph_objects as go
+
+    stats = stats or plan_statistics(full_df)
+    doc = Document()
+
+    title = doc.add_heading('Behaviour Analysis Plan', 0)
+    title.alignment = WD_ALIGN_PARAGRAPH.CENTER
+
+    doc.add_heading('Student Information', 1)
+    info_table = doc.add_table(rows=4, cols=2)
+    info_table.style = 'Light Grid Accent 1'
+    info_table.rows[0].cells[0].text = 'Student:'
+    info_table.rows[0].cells[1].text = student['name']
+    info_table.rows[1].cells[0].text = 'Program:'
+    info_table.rows[1].cells[1].text = student['program']
+    info_table.rows[2].cells[0].text = 'Grade:'
+    info_table.rows[2].cells[1].text = student['grade']
+    info_table.rows[3].cells[0].text = 'Date:'
+    info_table.rows[3].cells[1].text = datetime.now().strftime('%d/%m/%Y')
+
+    doc.add_paragraph()
+
+    doc.add_heading('Executive Summary', 1)
+    summary = doc.add_paragraph()
+    summary.add_run('Total Incidents: ').bold = True
+    summary.add_run(f"{stats['total']}\n")
+    summary.add_run('Critical Incidents: ').bold = True
+    summary.add_run(f"{stats['critical_count']}\n")
+    summary.add_run('Average Severity: ').bold = True
+    summary.add_run(f"{stats['avg_severity']:.2f}\n")
+    summary.add_run('Risk Level: ').bold = True
+    summary.add_run(f"{risk_level} ({risk_score}/100)")
+
+    doc.add_paragraph()
+
+    doc.add_heading('Key Findings', 1)
+    findings = doc.add_paragraph()
+    findings.add_run('Primary Behaviour: ').bold = True
+    findings.add_run(f"{top_beh}\n\n")
+    findings.add_run('Most Common Trigger: ').bold = True
+    findings.add_run(f"{top_ant}\n\n")
+    findings.add_run('Hotspot Location: ').bold = True
+    findings.add_run(f"{top_loc} during {top_session}")
+
+    doc.add_paragraph()
+
+    doc.add_heading('Clinical Interpretation', 1)
+    interp = doc.add_paragraph()
+    interp.add_run(f"Data indicates {student['name']} is most vulnerable when '{top_ant}' occurs in {top_loc} during {top_session}. ")
+    interp.add_run("This behaviour serves as a safety strategy. CPI principles emphasize Supportive stance. ")
+    interp.add_run("Berry Street Model suggests strengthening Body (regulation) and Relationship (connection).")
+
+    doc.add_paragraph()
+
+    doc.add_heading('Recommendations', 1)
+    doc.add_heading('1. Proactive Strategies', 2)
+    doc.add_paragraph(f"Provide check-in before '{top_ant}'", style='List Bullet')
+    doc.add_paragraph(f"Offer regulated start before {top_session}", style='List Bullet')
+
+    doc.add_heading('2. Co-regulation (CPI)', 2)
+    doc.add_paragraph("Use Supportive stance, low slow voice", style='List Bullet')
+    doc.add_paragraph("Reduce audience, one key adult", style='List Bullet')
+
+    doc.add_heading('3. Teaching Skills', 2)
+    doc.add_paragraph("Link to Personal & Social Capability", style='List Bullet')
+    doc.add_paragraph("Teach help-seeking routines", style='List Bullet')
+
+    doc.add_heading('4. SMART Goal', 2)
+    doc.add_paragraph("Over 5 weeks, use help-seeking strategy in 4/5 opportunities with support.", style='List Bullet')
+
+    # ADD GRAPHS TO DOCUMENT
+    doc.add_page_break()
+    doc.add_heading('Behaviour Analytics', 1)
+
+    try:
+        # Graph 1: Behavior Frequency
+        beh_counts = stats["counts"]["behaviour_type"].head(5)
+        fig1 = go.Figure(data=[
+            go.Bar(x=beh_counts.values, y=beh_counts.index, orientation='h',
+                   marker_color='#3498db')
+        ])
+        fig1.update_layout(
+            title="Top Behaviors",
+            xaxis_title="Frequency",
+            yaxis_title="Behavior",
+            plot_bgcolor='white',
+            paper_bgcolor='white',
+            height=400,
+            font=dict(size=12)
+        )
+
+        # Graph 2: Severity Trend
+        fig2 = go.Figure()
+        fig2.add_trace(go.Scatter(
+            x=full_df["date_parsed"],
+            y=full_df["severity"],
+            mode='lines+markers',
+            line=dict(color='#e74c3c', width=2),
+            marker=dict(size=8, color='#e74c3c')
+        ))
+        fig2.update_layout(
+            title="Severity Trend Over Time",
+            xaxis_title="Date",
+            yaxis_title="Severity Level",
+            plot_bgcolor='white',
+            paper_bgcolor='white',
+            height=400,
+            font=dict(size=12)
+        )
+
+        # Both graphs go to the warm renderer in one batch
+        beh_png, trend_png = render_charts([fig1, fig2], width=1000, height=600)
+        doc.add_picture(BytesIO(beh_png), width=Inches(6))
+        doc.add_paragraph()
+        doc.add_picture(BytesIO(trend_png), width=Inches(6))
+
+    except Exception as e:
+        doc.add_paragraph(f"Note: Unable to generate graphs. Error: {str(e)}")
+
+    doc.add_paragraph()
+    footer = doc.add_paragraph()
+    footer.alignment = WD_ALIGN_PARAGRAPH.CENTER
+    footer_run = footer.add_run('\n\nGenerated by CLC Behaviour Support\n')
+    footer_run.font.size = Pt(9)
+    footer_run.font.color.rgb = RGBColor(128, 128, 128)
+    footer.add_run(datetime.now().strftime('%d %B %Y'))
+
+    file_stream = BytesIO()
+    doc.save(file_stream)
+    file_stream.seek(0)
+    return file_stream
+
+
+def plan_filename(student: Dict[str, Any]) -> str:
+    return f"BAP_{student['name'].replace(' ', '_')}.docx"
+
+
+# --- BATCH GENERATION ---
+
+def _render_plan_job(student: Dict[str, Any], full_df: pd.DataFrame) -> Tuple[bytes, float]:
+    """Worker entry point: builds one plan and returns (docx bytes, seconds taken)."""
+    started = perf_counter()
+    stats = plan_statistics(full_df)
+    findings = plan_findings(full_df, stats)
+    docx_bytes = build_behaviour_plan_docx(student, full_df, **findings, stats=stats).getvalue()
+    return docx_bytes, perf_counter() - started
+
+
+def generate_plans_zip(students: List[Dict[str, Any]], incidents: List[Dict[str, Any]],
+                       critical_incidents: List[Dict[str, Any]], max_workers: Optional[int] = None,
+                       on_progress: Optional[Callable[[int, int, Dict[str, Any]], None]] = None
+                       ) -> Tuple[bytes, List[Dict[str, Any]]]:
+    """
+    Builds a plan for every student with incident data across a process pool and
+    returns (zip bytes, per-student results). Each result has student, program,
+    file, seconds and error; students without data are reported and skipped.
+    on_progress(done, total, result) is called in this process as plans finish.
+    """
+    results: List[Dict[str, Any]] = []
+    jobs = []
+    for student in students:
+        full_df = prepare_plan_frame(student["id"], incidents, critical_incidents)
+        if full_df is None:
+            results.append({"student": student["name"], "program": student["program"], "file": None,
+                            "seconds": 0.0, "error": "No incident data"})
+        else:
+            jobs.append((student, full_df))
+
+    total, done = len(students), len(results)
+    if on_progress:
+        for result in results:
+            on_progress(done, total, result)
+
+    archive = BytesIO()
+    # spawn, not fork: the parent is a threaded Streamlit server
+    context = multiprocessing.get_context("spawn")
+    with zipfile.ZipFile(archive, "w", zipfile.ZIP_DEFLATED) as zf, \
+            ProcessPoolExecutor(max_workers=max_workers, mp_context=context) as pool:
+        futures = {pool.submit(_render_plan_job, student, full_df): student for student, full_df in jobs}
+        written = set()
+        for future in as_completed(futures):
+            student = futures[future]
+            result = {"student": student["name"], "program": student["program"], "file": None,
+                      "seconds": 0.0, "error": None}
+            try:
+                docx_bytes, result["seconds"] = future.result()
+                name = f"{student['program']}/{plan_filename(student)}"
+                if name in written:
+                    name = name.replace(".docx", f"_{student['id']}.docx")
+                written.add(name)
+                result["file"] = name
+                zf.writestr(name, docx_bytes)
+            except Exception as e:
+                result["error"] = str(e)
+            results.append(result)
+            done += 1
+            if on_progress:
+                on_progress(done, total, result)
+
+    return archive.getvalue(), results
@@ -0,0 +1,549 @@
+"""
+Hot-Path Benchmark for Behaviour Support App
+Runs the data-heavy pages and loaders headless, against a stubbed `st` module and
+an in-memory Supabase, at increasing incident counts. Records wall time and peak
+memory per case and writes a JSON baseline that later runs can be compared with.
+
+Usage: python benchmark_hot_paths.py [--sizes 1000 10000 100000 1000000] [--repeats 3]
+                                     [--out baseline.json] [--compare baseline.json]
+"""
+
+import argparse
+import functools
+import gc
+import importlib.util
+import json
+import os
+import platform
+import statistics
+import sys
+import tracemalloc
+import types
+from datetime import date, datetime
+from time import perf_counter
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+# A case is flagged when it is this much slower (or bigger) than the baseline
+DEFAULT_TOLERANCE = 0.25
+
+
+# --- STREAMLIT STUB ---
+
+class _Element:
+    """Stand-in for any element or container: every method is a no-op and it works as a context manager."""
+
+    def __init__(self, stub: 'StreamlitStub'):
+        self._stub = stub
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __getattr__(self, name: str):
+        return getattr(self._stub, name)
+
+
+class SessionState(dict):
+    """Dict with attribute access, like st.session_state."""
+
+    def __getattr__(self, name: str):
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name)
+
+    def __setattr__(self, name: str, value: Any):
+        self[name] = value
+
+    def __delattr__(self, name: str):
+        del self[name]
+
+
+def _passthrough_cache(func=None, **_):
+    """@st.cache_data without caching, so every call does the real work."""
+    def decorate(f):
+        f.clear = lambda *a, **k: None
+        return f
+    return decorate(func) if callable(func) else decorate
+
+
+def _resource_cache(func=None, **_):
+    """@st.cache_resource: one shared object per argument tuple, as in Streamlit (clients, writers)."""
+    def decorate(f):
+        cache = {}
+
+        @functools.wraps(f)
+        def cached(*args):
+            if args not in cache:
+                cache[args] = f(*args)
+            return cache[args]
+        cached.clear = cache.clear
+        return cached
+    return decorate(func) if callable(func) else decorate
+
+
+class StreamlitStub(types.ModuleType):
+    """
+    Minimal `streamlit` replacement. Widgets return their defaults (buttons are
+    never pressed), layout calls return no-op elements, and plotly_chart
+    serialises the figure as Streamlit would so chart payload cost is counted.
+    """
+
+    cache_data = staticmethod(_passthrough_cache)
+    cache_resource = staticmethod(_resource_cache)
+
+    def __init__(self):
+        super().__init__('streamlit')
+        self.session_state = SessionState()
+        self.secrets = {}
+        self.reset_counters()
+
+    def reset_counters(self):
+        self.__dict__['calls'] = 0
+        self.__dict__['chart_bytes'] = 0
+
+    def __getattr__(self, name: str):
+        if name.startswith('__'):
+            raise AttributeError(name)
+        return self._element
+
+    def _element(self, *args, **kwargs) -> _Element:
+        self.__dict__['calls'] += 1
+        return _Element(self)
+
+    def columns(self, spec, **kwargs) -> List[_Element]:
+        self.__dict__['calls'] += 1
+        return [_Element(self) for _ in range(spec if isinstance(spec, int) else len(spec))]
+
+    def tabs(self, labels, **kwargs) -> List[_Element]:
+        self.__dict__['calls'] += 1
+        return [_Element(self) for _ in labels]
+
+    def plotly_chart(self, fig, *args, **kwargs):
+        self.__dict__['calls'] += 1
+        import plotly.io as pio
+        self.__dict__['chart_bytes'] += len(pio.to_json(fig, validate=False))
+
+    def button(self, *args, **kwargs) -> bool:
+        self.__dict__['calls'] += 1
+        return False
+
+    form_submit_button = download_button = button
+
+    def checkbox(self, label, value=False, *args, **kwargs) -> bool:
+        self.__dict__['calls'] += 1
+        return value
+
+    toggle = checkbox
+
+    def selectbox(self, label, options=(), index=0, *args, **kwargs):
+        self.__dict__['calls'] += 1
+        options = list(options)
+        return options[index] if options and index is not None else None
+
+    radio = selectbox
+
+    def multiselect(self, label, options=(), default=None, *args, **kwargs) -> list:
+        self.__dict__['calls'] += 1
+        return list(default or [])
+
+    def text_input(self, label, value='', *args, **kwargs) -> str:
+        self.__dict__['calls'] += 1
+        return value
+
+    text_area = text_input
+
+    def number_input(self, label, min_value=None, max_value=None, value=None, *args, **kwargs):
+        self.__dict__['calls'] += 1
+        return value if value is not None else (min_value or 0)
+
+    def slider(self, label, min_value=None, max_value=None, value=None, *args, **kwargs):
+        self.__dict__['calls'] += 1
+        return value if value is not None else min_value
+
+    def date_input(self, label, value=None, *args, **kwargs):
+        self.__dict__['calls'] += 1
+        return value or date.today()
+
+    def time_input(self, label, value=None, *args, **kwargs):
+        self.__dict__['calls'] += 1
+        return value or datetime.now().time().replace(second=0, microsecond=0)
+
+    def file_uploader(self, *args, **kwargs):
+        self.__dict__['calls'] += 1
+        return None
+
+    def rerun(self, *args, **kwargs):
+        pass
+
+    def stop(self):
+        pass
+
+
+def install_streamlit_stub() -> StreamlitStub:
+    """Registers the stub (and the submodules the apps import) in sys.modules."""
+    st = StreamlitStub()
+    components = types.ModuleType('streamlit.components')
+    components_v1 = types.ModuleType('streamlit.components.v1')
+    components_v1.html = lambda *args, **kwargs: None
+    components.v1 = components_v1
+    runtime = types.ModuleType('streamlit.runtime')
+    scriptrunner = types.ModuleType('streamlit.runtime.scriptrunner')
+    scriptrunner.add_script_run_ctx = lambda thread, ctx=None: thread
+    scriptrunner.get_script_run_ctx = lambda *args, **kwargs: None
+    runtime.scriptrunner = scriptrunner
+    st.components, st.runtime = components, runtime
+    sys.modules.update({
+        'streamlit': st,
+        'streamlit.components': components,
+        'streamlit.components.v1': components_v1,
+        'streamlit.runtime': runtime,
+        'streamlit.runtime.scriptrunner': scriptrunner,
+    })
+    return st
+
+
+def load_app(filename: str, module_name: str) -> types.ModuleType:
+    """Imports an app script as a module; its `if __name__ == '__main__'` block does not run."""
+    spec = importlib.util.spec_from_file_location(module_name, os.path.join(HERE, filename))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+# --- IN-MEMORY SUPABASE ---
+
+class _Response:
+    def __init__(self, data: List[Dict[str, Any]]):
+        self.data = data
+
+
+class _Query:
+    """The subset of the PostgREST query builder the benchmarked paths use."""
+
+    def __init__(self, db: 'InMemorySupabase', table: str):
+        if table not in db.tables:
+            raise Exception(f'relation "{table}" does not exist')
+        self.db, self.table = db, table
+        self.select_string = '*'
+        self.masks: List[Callable] = []
+        self.after: Optional[str] = None
+        self.start, self.stop = 0, None
+
+    def select(self, columns: str = '*', **kwargs) -> '_Query':
+        self.select_string = columns
+        return self
+
+    def order(self, column: str, desc: bool = False) -> '_Query':
+        # Tables are stored pre-sorted in the order the app requests
+        return self
+
+    def eq(self, column: str, value) -> '_Query':
+        self.masks.append(lambda df: df[column] == value)
+        return self
+
+    def gte(self, column: str, value) -> '_Query':
+        self.masks.append(lambda df: df[column] >= value)
+        return self
+
+    def lte(self, column: str, value) -> '_Query':
+        self.masks.append(lambda df: df[column] <= value)
+        return self
+
+    def in_(self, column: str, values) -> '_Query':
+        self.masks.append(lambda df: df[column].isin(values))
+        return self
+
+    def or_(self, expression: str) -> '_Query':
+        # Only the keyset expression from iter_incident_batches:
+        # incident_date.gt.D,and(incident_date.eq.D,id.gt.I)
+        last_date = expression.split(',')[0].split('.gt.')[1]
+        last_id = expression.rsplit('id.gt.', 1)[1].rstrip(')')
+        self.after = f"{last_date}|{last_id}"
+        return self
+
+    def limit(self, n: int) -> '_Query':
+        self.stop = self.start + n
+        return self
+
+    def range(self, start: int, end: int) -> '_Query':
+        self.start, self.stop = start, end + 1
+        return self
+
+    def execute(self) -> _Response:
+        offset = 0
+        if self.after is not None:
+            offset = int(np.searchsorted(self.db.keysets[self.table], self.after, side='right'))
+
+        encoded = self.db.encoded.get((self.table, self.select_string))
+        if encoded is not None and not self.masks:
+            # Decode the page's JSON, as the real client does with the HTTP response
+            stop = None if self.stop is None else offset + self.stop
+            return _Response(json.loads('[' + ','.join(encoded[offset + self.start:stop]) + ']'))
+
+        df = self.db.tables[self.table].iloc[offset:]
+        for mask in self.masks:
+            df = df[mask(df)]
+        df = df.iloc[self.start:self.stop]
+        if self.select_string != '*':
+            df = df[self.select_string.split(',')]
+        return _Response(df.to_dict('records'))
+
+
+class InMemorySupabase:
+    """
+    Serves DataFrames through the Supabase client interface. Network time is not
+    modelled; what is measured is the app's own paging, parsing and processing.
+    """
+
+    def __init__(self, tables: Dict[str, Any]):
+        self.tables = tables
+        self.encoded: Dict[Any, List[str]] = {}
+        # (incident_date, id) sort keys for keyset paging
+        self.keysets = {
+            name: (df['incident_date'] + '|' + df['id']).to_numpy(dtype=str)
+            for name, df in tables.items() if {'incident_date', 'id'} <= set(df.columns)
+        }
+
+    def table(self, name: str) -> _Query:
+        return _Query(self, name)
+
+    def encode(self, table: str, columns: str):
+        """Pre-renders each row of `select(columns)` as JSON so paging only pays for decoding."""
+        if (table, columns) not in self.encoded:
+            text = self.tables[table][columns.split(',')].to_json(orient='records', lines=True)
+            self.encoded[(table, columns)] = text.splitlines()
+
+
+# --- DATASETS ---
+
+def students_for(n_incidents: int) -> int:
+    """Student count scaled with incident volume (50 to 5,000)."""
+    return min(5000, max(50, n_incidents // 200))
+
+
+def build_dataset(n: int, seed: int) -> Dict[str, Any]:
+    """Synthetic students and incidents in the DB and sandbox shapes, generated once per size."""
+    from behaviour_analytics import daily_rollup
+    from synthetic_incidents import generate_incident_frame, incident_table, synthetic_students
+
+    students = synthetic_students(students_for(n), seed=seed)
+    frame = generate_incident_frame(n, students=students, days=365, seed=seed)
+
+    incidents = incident_table(frame, 'db')
+    incidents['updated_at'] = incidents['incident_date'].astype(str) + 'T00:00:00+00:00'
+    incidents = incidents.astype({'id': str, 'student_id': str, 'incident_date': str}).sort_values(
+        ['incident_date', 'id'], ignore_index=True
+    )
+    rollup = daily_rollup(frame)
+    rollup['incident_date'] = rollup['incident_date'].dt.strftime('%Y-%m-%d')
+    rollup['student_id'] = rollup['student_id'].astype(str)
+
+    return {
+        'students': students,
+        'frame': frame,
+        'db': InMemorySupabase({
+            'incidents': incidents,
+            'incident_daily_rollup': rollup.sort_values(['incident_date', 'student_id'], ignore_index=True),
+        }),
+        'busiest_student': str(frame['student_id'].value_counts().idxmax()),
+    }
+
+
+# --- CASES ---
+
+class Case:
+    """setup(data) prepares untimed state and returns the callable that is timed."""
+
+    def __init__(self, name: str, setup: Callable[[Dict[str, Any]], Callable[[], Any]],
+                 requires: Optional[str] = None, returns_value: bool = False):
+        self.name = name
+        self.setup = setup
+        self.requires = requires
+        # Loaders and report builders signal failure by returning None
+        self.returns_value = returns_value
+
+
+def build_cases(st: StreamlitStub) -> List[Case]:
+    prod = load_app('app_fixed_visibility.py', 'bench_app_fixed_visibility')
+    sandbox = load_app('app (8).py', 'bench_app_8')
+
+    def use_db(data):
+        data['db'].encode('incidents', prod.INCIDENT_LIST_COLUMNS)
+        prod.get_supabase_client = lambda: data['db']
+
+    def production_session(data):
+        use_db(data)
+        if 'store' not in data:
+            data['store'] = prod.load_incidents_from_db()
+        st.session_state.clear()
+        st.session_state.update({
+            'students_list': data['students'],
+            'incident_store': prod.IncidentStore(data['store'].frame),
+            'current_page': 'landing',
+            'logged_in': True,
+        })
+        for list_key in ('students_list', 'incident_store'):
+            prod.rebuild_session_index(list_key)
+
+    def load_incidents(data):
+        use_db(data)
+        return prod.load_incidents_from_db
+
+    def program_students(data):
+        production_session(data)
+        st.session_state.selected_program = data['students'][0]['program']
+        return prod.render_program_students
+
+    def student_analysis(data):
+        production_session(data)
+        st.session_state.selected_student_id = data['busiest_student']
+        return prod.render_student_analysis
+
+    def student_report(data):
+        production_session(data)
+        student = prod.get_student_by_id(data['busiest_student'])
+        store = st.session_state.incident_store
+        return lambda: prod.generate_student_report(student, store.for_student(student['id']))
+
+    def advanced_analysis(data):
+        from synthetic_incidents import to_records
+        if 'sandbox_incidents' not in data:
+            data['sandbox_incidents'] = to_records(data['frame'], 'app')
+        st.session_state.clear()
+        st.session_state.update({
+            'students': data['students'],
+            'incidents': data['sandbox_incidents'],
+            'critical_incidents': [],
+            'incident_data_version': 0,
+            'selected_student_id': data['busiest_student'],
+        })
+        return sandbox.render_student_analysis_page
+
+    return [
+        Case('load_incidents_from_db', load_incidents, returns_value=True),
+        Case('render_program_students', program_students),
+        Case('render_student_analysis', student_analysis),
+        Case('generate_student_report', student_report, requires='kaleido', returns_value=True),
+        Case('render_advanced_student_analysis', advanced_analysis),
+    ]
+
+
+def measure(case: Case, data: Dict[str, Any], st: StreamlitStub, repeats: int) -> Dict[str, Any]:
+    """
+    An untimed warm-up (lazy imports, first-use caches), one traced run for peak
+    memory, then best/median wall time over `repeats` runs, each from a fresh setup.
+    """
+    if case.requires and importlib.util.find_spec(case.requires) is None:
+        return {'status': f"skipped ({case.requires} not installed)"}
+
+    case.setup(data)()
+    run = case.setup(data)
+    gc.collect()
+    tracemalloc.start()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    seconds = []
+    for _ in range(repeats):
+        run = case.setup(data)
+        gc.collect()
+        st.reset_counters()
+        started = perf_counter()
+        result = run()
+        seconds.append(perf_counter() - started)
+
+    return {
+        'status': 'returned None' if case.returns_value and result is None else 'ok',
+        'seconds_min': min(seconds),
+        'seconds_median': statistics.median(seconds),
+        'peak_mb': peak / 2 ** 20,
+        'st_calls': st.calls,
+        'chart_kb': st.chart_bytes / 1024,
+    }
+
+
+# --- BASELINE ---
+
+def compare(results: List[Dict[str, Any]], baseline_path: str, tolerance: float) -> List[str]:
+    """Lines describing cases that got slower or bigger than the baseline by more than tolerance."""
+    with open(baseline_path) as f:
+        baseline = {(r['case'], r['incidents']): r for r in json.load(f)['results']}
+
+    regressions = []
+    for r in results:
+        before = baseline.get((r['case'], r['incidents']))
+        if not before or r['status'] != 'ok' or before['status'] != 'ok':
+            continue
+        for metric in ('seconds_min', 'peak_mb'):
+            if before[metric] > 0 and r[metric] > before[metric] * (1 + tolerance):
+                regressions.append(
+                    f"{r['case']} @ {r['incidents']:,}: {metric} {before[metric]:.3f} -> {r[metric]:.3f} "
+                    f"(+{(r[metric] / before[metric] - 1) * 100:.0f}%)"
+                )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[1])
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--cases', nargs='+', help='Only run these cases')
+    parser.add_argument('--out', default='benchmark_baseline.json', help='Where to write the JSON results')
+    parser.add_argument('--compare', help='Baseline JSON to check against; exits 1 on regressions')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE)
+    args = parser.parse_args()
+
+    sys.path.insert(0, HERE)
+    st = install_streamlit_stub()
+    cases = [c for c in build_cases(st) if not args.cases or c.name in args.cases]
+
+    print(f"{'Case':<34}{'Incidents':>11}{'Min (s)':>10}{'Median (s)':>12}{'Peak (MB)':>11}{'st calls':>10}")
+    results = []
+    for n in args.sizes:
+        data = build_dataset(n, args.seed)
+        for case in cases:
+            row = {'case': case.name, 'incidents': n, 'students': len(data['students'])}
+            row.update(measure(case, data, st, args.repeats))
+            results.append(row)
+            if row['status'] == 'ok':
+                print(f"{case.name:<34}{n:>11,}{row['seconds_min']:>10.3f}{row['seconds_median']:>12.3f}"
+                      f"{row['peak_mb']:>11.1f}{row['st_calls']:>10,}")
+            else:
+                print(f"{case.name:<34}{n:>11,}  {row['status']}")
+        del data
+        gc.collect()
+
+    import pandas as pd
+    with open(args.out, 'w') as f:
+        json.dump({
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'pandas': pd.__version__,
+            'numpy': np.__version__,
+            'repeats': args.repeats,
+            'seed': args.seed,
+            'results': results,
+        }, f, indent=2)
+    print(f"Wrote {args.out}")
+
+    if args.compare:
+        regressions = compare(results, args.compare, args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions beyond {args.tolerance:.0%} of {args.compare}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""
+Startup Benchmark for Behaviour Support App
+Times a cold first render (the login page) of each app with lazy imports and
+with BEHAVIOUR_APP_EAGER_IMPORTS=1, each in a fresh interpreter.
+
+Usage: python benchmark_startup.py [--runs 5] [--apps app.py "app (8).py"]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+HEAVY_MODULES = ['plotly.express', 'plotly.subplots', 'scipy.stats', 'docx']
+
+# Runs inside the child interpreter; prints one JSON line
+_CHILD = """
+import json, sys, time
+from streamlit.testing.v1 import AppTest
+app = sys.argv[1]
+at = AppTest.from_file(app, default_timeout=120)
+started = time.perf_counter()
+at.run()
+elapsed = time.perf_counter() - started
+print(json.dumps({
+    'seconds': elapsed,
+    'exception': bool(at.exception),
+    'loaded': [m for m in %r if m in sys.modules],
+}))
+""" % (HEAVY_MODULES,)
+
+
+def time_first_render(app: str, eager: bool) -> dict:
+    env = dict(os.environ, BEHAVIOUR_APP_EAGER_IMPORTS='1' if eager else '0')
+    out = subprocess.run([sys.executable, '-c', _CHILD, app], env=env, capture_output=True,
+                         text=True, check=True, cwd=os.path.dirname(os.path.abspath(app)))
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[1])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--apps', nargs='+', default=['app.py', 'app (8).py', 'app_fixed_visibility.py'])
+    args = parser.parse_args()
+
+    print(f"{'App':<28}{'Mode':<8}{'Median (s)':>12}{'Min (s)':>10}  Heavy modules loaded")
+    for app in args.apps:
+        medians = {}
+        for eager in (True, False):
+            runs = [time_first_render(app, eager) for _ in range(args.runs)]
+            seconds = [r['seconds'] for r in runs]
+            mode = 'eager' if eager else 'lazy'
+            medians[mode] = statistics.median(seconds)
+            note = ' (app raised)' if any(r['exception'] for r in runs) else ''
+            print(f"{app:<28}{mode:<8}{medians[mode]:>12.3f}{min(seconds):>10.3f}  "
+                  f"{', '.join(runs[-1]['loaded']) or '-'}{note}")
+        saved = medians['eager'] - medians['lazy']
+        print(f"{'':<28}{'saved':<8}{saved:>12.3f}{'':>10}  ({saved / medians['eager'] * 100:.0f}%)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,194 @@
+"""
+Chart Image Cache for Behaviour Support App
+Renders plotly figures to PNG bytes through one warm kaleido renderer per process,
+keeping results in files named by a hash of the figure and size so identical
+charts are rendered once and concurrent reports never share paths.
+"""
+
+import atexit
+import hashlib
+import logging
+import os
+import queue
+import shutil
+import tempfile
+import threading
+from concurrent.futures import Future
+from typing import List, Optional
+
+import plotly.io as pio
+
+logger = logging.getLogger(__name__)
+
+CHART_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+
+# --- RENDER SERVICE ---
+
+class ChartRenderService:
+    """
+    Keeps one kaleido renderer warm for the life of the process.
+    A single worker thread owns it (kaleido is not thread-safe); callers submit
+    a whole batch of figures and get PNG bytes back in one round trip.
+    """
+
+    def __init__(self):
+        self._jobs: queue.Queue = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+
+    def submit(self, figs: List, width: int = 800, height: int = 400, fmt: str = 'png') -> Future:
+        """Queues a batch; the future resolves to one bytes object per figure, in order."""
+        future: Future = Future()
+        self._ensure_running()
+        self._jobs.put((list(figs), width, height, fmt, future))
+        return future
+
+    def render(self, figs: List, width: int = 800, height: int = 400, fmt: str = 'png') -> List[bytes]:
+        return self.submit(figs, width, height, fmt).result()
+
+    def _ensure_running(self):
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='chart-render-service', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        self._warm_up()
+        while True:
+            figs, width, height, fmt, future = self._jobs.get()
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result([pio.to_image(fig, format=fmt, width=width, height=height) for fig in figs])
+            except Exception as e:
+                future.set_exception(e)
+
+    @staticmethod
+    def _warm_up():
+        """Starts kaleido's persistent browser (kaleido >= 1.1); kaleido 0.2 keeps its own subprocess."""
+        try:
+            import kaleido
+            if hasattr(kaleido, 'start_sync_server'):
+                kaleido.start_sync_server()
+                atexit.register(kaleido.stop_sync_server)
+        except Exception as e:
+            logger.warning(f"Chart renderer warm-up skipped: {e}")
+
+
+# --- IMAGE CACHE ---
+
+class ChartImageCache:
+    """
+    Content-addressed store of rendered charts in a private temp directory.
+    Files are touched on every hit; the least recently used are deleted once
+    the directory grows past max_bytes.
+    """
+
+    def __init__(self, directory: Optional[str] = None, max_bytes: int = CHART_CACHE_MAX_BYTES):
+        self.directory = directory or tempfile.mkdtemp(prefix=f"report_charts_{os.getpid()}_")
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(fig, width: int, height: int, fmt: str = 'png') -> str:
+        """Hash of the full figure spec plus output size and format."""
+        spec = fig.to_json(validate=False)
+        return hashlib.sha256(f"{spec}|{width}x{height}|{fmt}".encode('utf-8')).hexdigest()
+
+    def get_many(self, figs: List, width: int = 800, height: int = 400, fmt: str = 'png') -> List[bytes]:
+        """Image bytes for each figure, in order; all misses are rendered as one batch."""
+        paths = [os.path.join(self.directory, f"{self.key(fig, width, height, fmt)}.{fmt}") for fig in figs]
+        images: List[Optional[bytes]] = [None] * len(figs)
+        missing = []
+        for i, path in enumerate(paths):
+            try:
+                with open(path, 'rb') as f:
+                    images[i] = f.read()
+                os.utime(path)
+                self.hits += 1
+            except FileNotFoundError:
+                missing.append(i)
+
+        if missing:
+            self.misses += len(missing)
+            rendered = get_render_service().render([figs[i] for i in missing], width, height, fmt)
+            for i, data in zip(missing, rendered):
+                images[i] = data
+                self._store(paths[i], data, fmt)
+            self._evict()
+        return images
+
+    def _store(self, path: str, data: bytes, fmt: str):
+        # Write under a unique name then rename, so readers never see a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=f".{fmt}.tmp")
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def _evict(self):
+        with self._lock:
+            entries = []
+            for entry in os.scandir(self.directory):
+                if entry.is_file() and not entry.name.endswith('.tmp'):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                    total -= size
+                except FileNotFoundError:
+                    pass
+
+    def clear(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+# --- PER-PROCESS SINGLETONS ---
+
+_service: Optional[ChartRenderService] = None
+_cache: Optional[ChartImageCache] = None
+_owner_pid: Optional[int] = None
+_guard = threading.Lock()
+
+
+def _clear_if_owner(cache: ChartImageCache, pid: int):
+    # Forked children inherit atexit handlers; only the creating process cleans up
+    if os.getpid() == pid:
+        cache.clear()
+
+
+def _ensure_process_singletons():
+    """(Re)creates the service and cache in a new process; threads and dirs don't survive fork."""
+    global _service, _cache, _owner_pid
+    with _guard:
+        if _owner_pid != os.getpid():
+            _service, _cache, _owner_pid = ChartRenderService(), ChartImageCache(), os.getpid()
+            atexit.register(_clear_if_owner, _cache, _owner_pid)
+            logger.info(f"Chart cache directory: {_cache.directory}")
+
+
+def get_render_service() -> ChartRenderService:
+    """The warm chart renderer for this process."""
+    _ensure_process_singletons()
+    return _service
+
+
+def get_chart_cache() -> ChartImageCache:
+    """The chart cache for this process (forked or spawned workers get their own)."""
+    _ensure_process_singletons()
+    return _cache
+
+
+def render_charts(figs: List, width: int = 800, height: int = 400, fmt: str = 'png') -> List[bytes]:
+    """PNG bytes for each figure, via this process's cache and warm renderer."""
+    return get_chart_cache().get_many(figs, width, height, fmt)
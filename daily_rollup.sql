@@ -0,0 +1,141 @@
+-- Behaviour Support App - Daily Incident Rollup
+-- Run these commands in your Supabase SQL editor (after supabase_schema_CLEAN)
+--
+-- One row per (student_id, incident_date) with the counts the time-series
+-- charts need, kept current by a trigger on incidents. Charts read a few
+-- hundred rollup rows instead of every incident.
+-- Note: the app writes behaviour_type; this table does not depend on it.
+
+-- ============================================
+-- 1. ROLLUP TABLE
+-- ============================================
+CREATE TABLE IF NOT EXISTS incident_daily_rollup (
+    student_id UUID NOT NULL REFERENCES students(id) ON DELETE CASCADE,
+    incident_date DATE NOT NULL,
+    incidents INTEGER NOT NULL DEFAULT 0,
+    severity_sum INTEGER NOT NULL DEFAULT 0,
+    critical_incidents INTEGER NOT NULL DEFAULT 0,
+    morning_incidents INTEGER NOT NULL DEFAULT 0,
+    middle_incidents INTEGER NOT NULL DEFAULT 0,
+    afternoon_incidents INTEGER NOT NULL DEFAULT 0,
+    other_session_incidents INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMPTZ DEFAULT NOW(),
+    PRIMARY KEY (student_id, incident_date)
+);
+
+CREATE INDEX IF NOT EXISTS idx_daily_rollup_date ON incident_daily_rollup(incident_date);
+
+-- ============================================
+-- 2. INCREMENTAL MAINTENANCE
+-- ============================================
+
+-- Adds (p_sign = 1) or removes (p_sign = -1) one incident from its day
+CREATE OR REPLACE FUNCTION apply_incident_to_rollup(
+    p_student_id UUID,
+    p_date DATE,
+    p_severity INTEGER,
+    p_is_critical BOOLEAN,
+    p_session TEXT,
+    p_sign INTEGER
+)
+RETURNS VOID AS $$
+BEGIN
+    INSERT INTO incident_daily_rollup AS r (
+        student_id, incident_date, incidents, severity_sum, critical_incidents,
+        morning_incidents, middle_incidents, afternoon_incidents, other_session_incidents
+    ) VALUES (
+        p_student_id,
+        p_date,
+        p_sign,
+        p_sign * COALESCE(p_severity, 0),
+        p_sign * (COALESCE(p_is_critical, FALSE))::int,
+        p_sign * (COALESCE(p_session, '') LIKE 'Morning%')::int,
+        p_sign * (COALESCE(p_session, '') LIKE 'Middle%')::int,
+        p_sign * (COALESCE(p_session, '') LIKE 'Afternoon%')::int,
+        p_sign * (NOT (COALESCE(p_session, '') ~ '^(Morning|Middle|Afternoon)'))::int
+    )
+    ON CONFLICT (student_id, incident_date) DO UPDATE SET
+        incidents = r.incidents + EXCLUDED.incidents,
+        severity_sum = r.severity_sum + EXCLUDED.severity_sum,
+        critical_incidents = r.critical_incidents + EXCLUDED.critical_incidents,
+        morning_incidents = r.morning_incidents + EXCLUDED.morning_incidents,
+        middle_incidents = r.middle_incidents + EXCLUDED.middle_incidents,
+        afternoon_incidents = r.afternoon_incidents + EXCLUDED.afternoon_incidents,
+        other_session_incidents = r.other_session_incidents + EXCLUDED.other_session_incidents,
+        updated_at = NOW();
+
+    DELETE FROM incident_daily_rollup
+    WHERE student_id = p_student_id AND incident_date = p_date AND incidents <= 0;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+CREATE OR REPLACE FUNCTION maintain_incident_daily_rollup()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM apply_incident_to_rollup(OLD.student_id, OLD.incident_date, OLD.severity,
+                                         OLD.is_critical, OLD.session, -1);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM apply_incident_to_rollup(NEW.student_id, NEW.incident_date, NEW.severity,
+                                         NEW.is_critical, NEW.session, 1);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS maintain_incident_daily_rollup ON incidents;
+
+CREATE TRIGGER maintain_incident_daily_rollup AFTER INSERT OR UPDATE OR DELETE ON incidents
+    FOR EACH ROW EXECUTE FUNCTION maintain_incident_daily_rollup();
+
+-- ============================================
+-- 3. FULL REBUILD (initial backfill / scheduled repair)
+-- ============================================
+CREATE OR REPLACE FUNCTION refresh_incident_daily_rollup()
+RETURNS VOID AS $$
+BEGIN
+    DELETE FROM incident_daily_rollup;
+
+    INSERT INTO incident_daily_rollup (
+        student_id, incident_date, incidents, severity_sum, critical_incidents,
+        morning_incidents, middle_incidents, afternoon_incidents, other_session_incidents
+    )
+    SELECT
+        student_id,
+        incident_date,
+        COUNT(*),
+        COALESCE(SUM(severity), 0),
+        COUNT(*) FILTER (WHERE is_critical),
+        COUNT(*) FILTER (WHERE session LIKE 'Morning%'),
+        COUNT(*) FILTER (WHERE session LIKE 'Middle%'),
+        COUNT(*) FILTER (WHERE session LIKE 'Afternoon%'),
+        COUNT(*) FILTER (WHERE NOT (COALESCE(session, '') ~ '^(Morning|Middle|Afternoon)'))
+    FROM incidents
+    GROUP BY student_id, incident_date;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+-- Backfill from existing incidents
+SELECT refresh_incident_daily_rollup();
+
+-- Optional nightly repair if pg_cron is enabled:
+-- SELECT cron.schedule('refresh-daily-rollup', '0 3 * * *', 'SELECT refresh_incident_daily_rollup()');
+
+-- ============================================
+-- 4. ROW LEVEL SECURITY
+-- ============================================
+ALTER TABLE incident_daily_rollup ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "Allow read on incident_daily_rollup" ON incident_daily_rollup;
+
+-- Read-only for clients; rows are written by the SECURITY DEFINER functions above
+CREATE POLICY "Allow read on incident_daily_rollup" ON incident_daily_rollup FOR SELECT USING (true);
+
+-- ============================================
+-- VERIFICATION
+-- ============================================
+SELECT
+    (SELECT COUNT(*) FROM incidents) AS incidents,
+    (SELECT COALESCE(SUM(incidents), 0) FROM incident_daily_rollup) AS rolled_up_incidents,
+    (SELECT COUNT(*) FROM incident_daily_rollup) AS rollup_rows;
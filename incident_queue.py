@@ -0,0 +1,314 @@
+"""
+Incident Write-Ahead Queue for Behaviour Support App
+Accepts new incidents into a local SQLite file immediately and inserts them into
+Supabase from a background thread, in batches, retrying with backoff until they land
+(or setting aside rows the database keeps rejecting).
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+import uuid
+from time import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+try:
+    from httpx import TransportError
+    TRANSPORT_ERRORS: Tuple[type, ...] = (OSError, TransportError)
+except ImportError:
+    TRANSPORT_ERRORS = (OSError,)
+
+logger = logging.getLogger(__name__)
+
+QUEUE_BATCH_SIZE = 50
+QUEUE_FLUSH_INTERVAL_SECONDS = 2.0
+QUEUE_MAX_BACKOFF_SECONDS = 300
+# A row the database has rejected this many times is moved to dead_incidents
+QUEUE_MAX_ATTEMPTS = 8
+
+# HTTP statuses that say nothing about the rows themselves
+RETRYABLE_STATUSES = (401, 408, 429, 500, 502, 503, 504)
+# Postgres error classes that will fail the same way every time:
+# data exception, integrity constraint violation, syntax error or access rule violation
+PERMANENT_SQLSTATE_CLASSES = ('22', '23', '42')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pending_incidents (
+    key TEXT PRIMARY KEY,
+    payload TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt REAL NOT NULL,
+    last_error TEXT
+)
+"""
+
+_DEAD_SCHEMA = """
+CREATE TABLE IF NOT EXISTS dead_incidents (
+    key TEXT PRIMARY KEY,
+    payload TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    attempts INTEGER NOT NULL,
+    failed_at REAL NOT NULL,
+    error TEXT
+)
+"""
+
+
+def error_status(error: Exception) -> Optional[int]:
+    """HTTP status of a failed request, if the exception carries one."""
+    # postgrest's APIError puts the status in `code` when the body wasn't JSON
+    code = getattr(error, 'code', None)
+    if isinstance(code, int):
+        return code
+    status = getattr(error, 'status_code', None) or getattr(getattr(error, 'response', None), 'status_code', None)
+    return status if isinstance(status, int) else None
+
+
+def is_transient_error(error: Exception) -> bool:
+    """The request never reached the database (or it was briefly unavailable); not the rows' fault."""
+    return isinstance(error, TRANSPORT_ERRORS) or error_status(error) in RETRYABLE_STATUSES
+
+
+def is_permanent_error(error: Exception) -> bool:
+    """The database rejected the rows and would reject them again (4xx, constraint or type errors)."""
+    status = error_status(error)
+    if status is not None:
+        return 400 <= status < 500 and status not in RETRYABLE_STATUSES
+    code = str(getattr(error, 'code', None) or '')
+    return code[:2] in PERMANENT_SQLSTATE_CLASSES or code.startswith(('PGRST1', 'PGRST2'))
+
+
+class IncidentWriteQueue:
+    """
+    Durable outbox for incident inserts.
+
+    enqueue() gives each record its primary key up front (the idempotency key)
+    and commits it to SQLite before returning, so a slow or unreachable backend
+    never holds up the form and a restart never loses an entry. The flusher
+    thread passes due rows to insert_batch(rows); it must be idempotent on id
+    (e.g. upsert ... on_conflict='id', ignore_duplicates) so a batch whose
+    response was lost can safely be sent again.
+
+    When the backend can't be reached the whole batch is retried with
+    exponential backoff. When it rejects a batch, the batch is halved until the
+    rows at fault are isolated, so one bad row doesn't hold back the others. A
+    single row rejected with a permanent error (see is_permanent_error), or
+    rejected max_attempts times, is moved to the dead_incidents table and passed
+    to on_dead(rows); it stays there until requeue_dead() or discard_dead().
+    on_flushed(rows) runs after each successful insert.
+    """
+
+    def __init__(self, path: str, insert_batch: Callable[[List[Dict[str, Any]]], Any],
+                 on_flushed: Optional[Callable[[List[Dict[str, Any]]], None]] = None,
+                 on_dead: Optional[Callable[[List[Dict[str, Any]]], None]] = None,
+                 batch_size: int = QUEUE_BATCH_SIZE,
+                 flush_interval: float = QUEUE_FLUSH_INTERVAL_SECONDS,
+                 max_backoff: float = QUEUE_MAX_BACKOFF_SECONDS,
+                 max_attempts: int = QUEUE_MAX_ATTEMPTS):
+        self.path = path
+        self.insert_batch = insert_batch
+        self.on_flushed = on_flushed
+        self.on_dead = on_dead
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_backoff = max_backoff
+        self.max_attempts = max_attempts
+        self.flushed = 0
+        self.failures = 0
+        self.last_error: Optional[str] = None
+
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(_SCHEMA)
+        self._conn.execute(_DEAD_SCHEMA)
+
+    # --- producers ---
+
+    def enqueue(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        """Persists one incident and returns it with its id set. Does not touch the network."""
+        record = dict(record)
+        record.setdefault('id', str(uuid.uuid4()))
+        now = time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO pending_incidents (key, payload, created_at, next_attempt) VALUES (?, ?, ?, ?)",
+                (record['id'], json.dumps(record, default=str), now, now)
+            )
+        self._wake.set()
+        return record
+
+    def pending_count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM pending_incidents").fetchone()[0]
+
+    def pending_records(self) -> List[Dict[str, Any]]:
+        """Every record still waiting to be inserted, oldest first."""
+        with self._lock:
+            rows = self._conn.execute("SELECT payload FROM pending_incidents ORDER BY created_at").fetchall()
+        return [json.loads(payload) for payload, in rows]
+
+    def dead_count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM dead_incidents").fetchone()[0]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'pending': self.pending_count(),
+            'dead': self.dead_count(),
+            'flushed': self.flushed,
+            'failures': self.failures,
+            'last_error': self.last_error,
+        }
+
+    # --- dead letters ---
+
+    def dead_letters(self, limit: int = 100) -> List[Dict[str, Any]]:
+        """Rows set aside after being rejected, most recent first."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key, payload, attempts, failed_at, error FROM dead_incidents ORDER BY failed_at DESC LIMIT ?",
+                (limit,)
+            ).fetchall()
+        return [
+            {'key': key, 'record': json.loads(payload), 'attempts': attempts, 'failed_at': failed_at, 'error': error}
+            for key, payload, attempts, failed_at, error in rows
+        ]
+
+    def requeue_dead(self, keys: Optional[List[str]] = None) -> int:
+        """Moves dead rows (all of them by default) back to the queue with a fresh attempt count."""
+        where, params = ("", ()) if keys is None else (
+            f" WHERE key IN ({','.join('?' * len(keys))})", tuple(keys)
+        )
+        now = time()
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._conn.execute(
+                "INSERT OR IGNORE INTO pending_incidents (key, payload, created_at, next_attempt) "
+                f"SELECT key, payload, created_at, ? FROM dead_incidents{where}",
+                (now,) + params
+            )
+            moved = self._conn.execute(f"DELETE FROM dead_incidents{where}", params).rowcount
+            self._conn.execute("COMMIT")
+        self._wake.set()
+        return moved
+
+    def discard_dead(self, keys: List[str]) -> int:
+        with self._lock:
+            return self._conn.executemany("DELETE FROM dead_incidents WHERE key = ?", [(k,) for k in keys]).rowcount
+
+    # --- flusher ---
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='incident-queue-flusher', daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def flush_now(self):
+        """Wakes the flusher; due rows are sent without waiting for the interval."""
+        self._wake.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            # Keep draining while full batches succeed
+            while not self._stop.is_set() and self.flush_once() == self.batch_size:
+                pass
+
+    def flush_once(self) -> int:
+        """Sends one batch of due rows. Returns how many were flushed (0 on failure)."""
+        with self._lock:
+            due = self._conn.execute(
+                "SELECT key, payload, attempts FROM pending_incidents WHERE next_attempt <= ? "
+                "ORDER BY created_at LIMIT ?",
+                (time(), self.batch_size)
+            ).fetchall()
+        if not due:
+            return 0
+
+        flushed: List[Dict[str, Any]] = []
+        failures = self.failures
+        self._send(due, flushed)
+        if flushed and self.failures == failures:
+            self.last_error = None
+        if flushed:
+            logger.info(f"Incident queue flushed {len(flushed)} rows")
+        return len(flushed)
+
+    def _send(self, due: List[Tuple[str, str, int]], flushed: List[Dict[str, Any]]) -> bool:
+        """
+        Inserts due (key, payload, attempts) rows, halving a rejected batch until
+        the rows at fault are isolated. Returns False if the backend couldn't be reached.
+        """
+        rows = [json.loads(payload) for _, payload, _ in due]
+        try:
+            self.insert_batch(rows)
+        except Exception as e:
+            self.failures += 1
+            self.last_error = str(e)
+            transient = is_transient_error(e)
+            if len(due) > 1 and not transient:
+                logger.warning(f"Incident queue batch of {len(due)} rows rejected, splitting it: {e}")
+                middle = len(due) // 2
+                return self._send(due[:middle], flushed) and self._send(due[middle:], flushed)
+            self._failed(due, e, transient)
+            return not transient
+
+        with self._lock:
+            self._conn.executemany("DELETE FROM pending_incidents WHERE key = ?", [(key,) for key, _, _ in due])
+        self.flushed += len(rows)
+        flushed.extend(rows)
+        self._notify(self.on_flushed, rows, 'on_flushed')
+        return True
+
+    def _failed(self, due: List[Tuple[str, str, int]], error: Exception, transient: bool):
+        """Backs the rows off, or moves a row the database keeps rejecting to dead_incidents."""
+        now = time()
+        dead = [] if transient else [
+            (key, payload, attempts + 1) for key, payload, attempts in due
+            if is_permanent_error(error) or attempts + 1 >= self.max_attempts
+        ]
+        dead_keys = {key for key, _, _ in dead}
+        retry = [(key, attempts) for key, _, attempts in due if key not in dead_keys]
+        if retry:
+            logger.warning(f"Incident queue flush of {len(due)} rows failed: {error}")
+        with self._lock:
+            self._conn.executemany(
+                "UPDATE pending_incidents SET attempts = ?, next_attempt = ?, last_error = ? WHERE key = ?",
+                [(attempts + 1, now + min(self.max_backoff, self.flush_interval * 2 ** attempts), str(error), key)
+                 for key, attempts in retry]
+            )
+            if dead:
+                self._conn.execute("BEGIN")
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO dead_incidents (key, payload, created_at, attempts, failed_at, error) "
+                    "SELECT key, payload, created_at, ?, ?, ? FROM pending_incidents WHERE key = ?",
+                    [(attempts, now, str(error), key) for key, _, attempts in dead]
+                )
+                self._conn.executemany("DELETE FROM pending_incidents WHERE key = ?", [(key,) for key in dead_keys])
+                self._conn.execute("COMMIT")
+        if dead:
+            logger.error(f"Incident queue gave up on {len(dead)} rows after {dead[0][2]} attempts: {error}")
+            self._notify(self.on_dead, [json.loads(payload) for _, payload, _ in dead], 'on_dead')
+
+    def _notify(self, callback: Optional[Callable[[List[Dict[str, Any]]], None]], rows: List[Dict[str, Any]],
+                name: str):
+        if callback:
+            try:
+                callback(rows)
+            except Exception as e:
+                logger.error(f"Incident queue {name} callback failed: {e}")
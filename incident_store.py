@@ -0,0 +1,216 @@
+"""
+Columnar Incident Store for Behaviour Support App
+Holds incidents as one pandas DataFrame with categorical columns instead of
+a list of dicts, so analytics pages slice it instead of rebuilding frames.
+"""
+
+import threading
+from typing import Any, Dict, Iterable, List, Optional
+
+import pandas as pd
+
+# Low-cardinality text columns stored as pandas categoricals
+CATEGORICAL_COLUMNS = [
+    'student_id', 'behaviour_type', 'location', 'antecedent', 'intervention',
+    'support_type', 'session', 'day', 'time', 'reported_by_role',
+]
+
+# Database column -> store column (the app has always used the short names)
+COLUMN_ALIASES = {
+    'incident_date': 'date',
+    'incident_time': 'time',
+    'day_of_week': 'day',
+}
+
+STORE_COLUMNS = [
+    'id', 'student_id', 'date_parsed', 'time', 'hour', 'day', 'session', 'location',
+    'reported_by_name', 'reported_by_role', 'behaviour_type', 'antecedent',
+    'intervention', 'support_type', 'severity', 'is_critical', 'updated_at',
+]
+
+
+def records_to_frame(records: List[Dict[str, Any]]) -> pd.DataFrame:
+    """Converts incident dicts (DB or legacy field names) into the store's column layout."""
+    df = pd.DataFrame.from_records(records)
+    df = df.rename(columns={db: short for db, short in COLUMN_ALIASES.items() if db in df.columns})
+    # Rows carrying both names keep the DB value
+    df = df.loc[:, ~df.columns.duplicated()]
+
+    for col in STORE_COLUMNS + ['date']:
+        if col not in df.columns and col not in ('date_parsed', 'hour'):
+            df[col] = None
+
+    df['date_parsed'] = pd.to_datetime(df['date'], errors='coerce')
+    df['hour'] = pd.to_datetime(df['time'], format='%H:%M:%S', errors='coerce').dt.hour.astype('Int8')
+    df['severity'] = pd.to_numeric(df['severity'], errors='coerce').fillna(0).astype('int8')
+    df['is_critical'] = df['is_critical'].fillna(False).astype(bool)
+    for col in CATEGORICAL_COLUMNS:
+        df[col] = df[col].astype('category')
+
+    return df[STORE_COLUMNS]
+
+
+def concat_frames(frames: List[pd.DataFrame]) -> pd.DataFrame:
+    """Concatenates store frames, merging categories so categorical dtypes survive."""
+    frames = [f.copy(deep=False) for f in frames if len(f)]
+    if not frames:
+        return records_to_frame([])
+    if len(frames) == 1:
+        return frames[0]
+
+    for col in CATEGORICAL_COLUMNS:
+        categories = pd.Index(pd.unique(pd.concat(
+            [f[col].cat.categories.to_series().astype(object) for f in frames]
+        )))
+        for f in frames:
+            f[col] = f[col].cat.set_categories(categories)
+    return pd.concat(frames, ignore_index=True)
+
+
+def trim_categories(frame: pd.DataFrame) -> pd.DataFrame:
+    """Drops categories a slice doesn't use, so value_counts() only reports what is there."""
+    return frame.assign(**{col: frame[col].cat.remove_unused_categories() for col in CATEGORICAL_COLUMNS})
+
+
+class IncidentStore:
+    """
+    In-memory incident table shared by the app's pages.
+    Single-row appends are buffered and folded into the frame on the next read,
+    and per-student row positions are cached so student views are cheap.
+    One store is shared by every session thread and the background refresher,
+    so changes to the frame and its caches happen under a lock.
+    """
+
+    def __init__(self, frame: Optional[pd.DataFrame] = None):
+        self._frame = frame if frame is not None else records_to_frame([])
+        self._pending: List[Dict[str, Any]] = []
+        self._student_rows: Optional[Dict[Any, Any]] = None
+        self._id_index: Optional[pd.Index] = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_records(cls, records: List[Dict[str, Any]]) -> 'IncidentStore':
+        return cls(records_to_frame(records))
+
+    @classmethod
+    def from_batches(cls, batches: Iterable[List[Dict[str, Any]]]) -> 'IncidentStore':
+        """Builds the store from paged results without holding every dict at once."""
+        return cls(concat_frames([records_to_frame(batch) for batch in batches]))
+
+    # --- reads ---
+
+    @property
+    def frame(self) -> pd.DataFrame:
+        """The whole table. Treat as read-only; use append/upsert to change it."""
+        with self._lock:
+            return self._folded_frame()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._frame) + len(self._pending)
+
+    def for_student(self, student_id: str) -> pd.DataFrame:
+        return self.for_students([student_id])
+
+    def for_students(self, student_ids: Iterable[str]) -> pd.DataFrame:
+        """Rows for the given students, in store order."""
+        with self._lock:
+            frame = self._folded_frame()
+            if self._student_rows is None:
+                self._student_rows = frame.groupby('student_id', observed=True, sort=False).indices
+            student_rows = self._student_rows
+        positions = [student_rows[sid] for sid in student_ids if sid in student_rows]
+        if not positions:
+            return trim_categories(frame.iloc[0:0])
+        rows = positions[0] if len(positions) == 1 else sorted(p for arr in positions for p in arr)
+        return trim_categories(frame.iloc[rows])
+
+    def where(self, **filters) -> pd.DataFrame:
+        """Rows where every given column equals the given value (or is in the given list)."""
+        frame = self.frame
+        mask = pd.Series(True, index=frame.index)
+        for col, value in filters.items():
+            if isinstance(value, (list, tuple, set)):
+                mask &= frame[col].isin(list(value))
+            else:
+                mask &= frame[col] == value
+        return trim_categories(frame[mask])
+
+    def to_records(self, frame: Optional[pd.DataFrame] = None) -> List[Dict[str, Any]]:
+        """Converts rows back to the legacy dict layout (date/time/day strings)."""
+        frame = self.frame if frame is None else frame
+        out = frame.drop(columns=['date_parsed', 'hour']).astype(object)
+        out.insert(2, 'date', frame['date_parsed'].dt.strftime('%Y-%m-%d'))
+        return out.where(out.notna(), None).to_dict('records')
+
+    def memory_bytes(self) -> int:
+        return int(self.frame.memory_usage(deep=True).sum())
+
+    # --- writes ---
+
+    def append(self, records: List[Dict[str, Any]]):
+        """Adds new incidents. They are folded into the frame on the next read."""
+        with self._lock:
+            self._pending.extend(records)
+
+    def remove(self, ids: Iterable[str]) -> int:
+        """Drops rows with the given ids. Returns the number of rows removed."""
+        ids = list(ids)
+        with self._lock:
+            frame = self._folded_frame()
+            mask = frame['id'].isin(ids).to_numpy()
+            if mask.any():
+                self._replace(frame[~mask])
+            return int(mask.sum())
+
+    def upsert(self, records: List[Dict[str, Any]]) -> int:
+        """
+        Replaces rows with matching ids and appends the rest.
+        Rows whose updated_at is unchanged are ignored, and when an id appears more
+        than once (in the batch or the table) the last row wins. Returns the number
+        of rows changed.
+        """
+        if not records:
+            return 0
+        incoming = records_to_frame(records)
+        incoming = incoming[~incoming['id'].duplicated(keep='last').to_numpy()]
+        with self._lock:
+            return self._upsert_frame(incoming)
+
+    # --- internals (call with the lock held) ---
+
+    def _upsert_frame(self, incoming: pd.DataFrame) -> int:
+        frame = self._folded_frame()
+        if self._id_index is None:
+            # get_indexer needs unique ids; an optimistic copy appended next to the
+            # database row (or a re-imported row) would otherwise make it raise
+            duplicated = frame['id'].duplicated(keep='last').to_numpy()
+            if duplicated.any():
+                self._replace(frame[~duplicated])
+                frame = self._frame
+            self._id_index = pd.Index(frame['id'])
+
+        positions = self._id_index.get_indexer(incoming['id'])
+        known = positions >= 0
+        unchanged = known.copy()
+        unchanged[known] = (
+            frame['updated_at'].to_numpy()[positions[known]] == incoming['updated_at'].to_numpy()[known]
+        )
+        incoming = incoming[~unchanged]
+        if incoming.empty:
+            return 0
+
+        keep = frame.drop(index=frame.index[positions[known & ~unchanged]])
+        self._replace(concat_frames([keep, incoming]))
+        return len(incoming)
+
+    def _folded_frame(self) -> pd.DataFrame:
+        if self._pending:
+            pending, self._pending = self._pending, []
+            self._replace(concat_frames([self._frame, records_to_frame(pending)]))
+        return self._frame
+
+    def _replace(self, frame: pd.DataFrame):
+        self._frame = frame.reset_index(drop=True)
+        self._student_rows = None
+        self._id_index = None
@@ -0,0 +1,72 @@
+"""
+Lazy Imports for Behaviour Support App
+Defers heavy chart, statistics and document libraries until a page first uses them,
+so the login page and other light pages don't pay their import cost.
+"""
+
+import importlib
+import os
+import threading
+import types
+from typing import Any, Callable
+
+# Set to 1 to import everything up front (used by benchmark_startup.py for comparison)
+EAGER_IMPORTS = os.environ.get('BEHAVIOUR_APP_EAGER_IMPORTS', '0') == '1'
+
+_import_lock = threading.Lock()
+
+
+class LazyModule(types.ModuleType):
+    """
+    Stand-in for a module that is imported on first attribute access.
+    `go = lazy_module('plotly.graph_objects')` then `go.Figure()` works as usual.
+    """
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.__dict__['_lazy_target'] = None
+
+    def _load(self) -> types.ModuleType:
+        target = self.__dict__['_lazy_target']
+        if target is None:
+            with _import_lock:
+                target = self.__dict__['_lazy_target']
+                if target is None:
+                    target = importlib.import_module(self.__name__)
+                    self.__dict__['_lazy_target'] = target
+        return target
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self) -> str:
+        state = 'loaded' if self.__dict__['_lazy_target'] is not None else 'not loaded'
+        return f"<lazy module '{self.__name__}' ({state})>"
+
+
+def lazy_module(name: str) -> types.ModuleType:
+    """Module proxy that imports `name` on first use (immediately when EAGER_IMPORTS)."""
+    module = LazyModule(name)
+    if EAGER_IMPORTS:
+        module._load()
+    return module
+
+
+def lazy_function(module_name: str, name: str) -> Callable:
+    """Callable that imports `module_name` and calls its `name` on first use."""
+    module = lazy_module(module_name)
+
+    def call(*args, **kwargs):
+        return getattr(module, name)(*args, **kwargs)
+
+    call.__name__ = call.__qualname__ = name
+    call.__doc__ = f"Lazily imported {module_name}.{name}."
+    return call
+
+
+def is_loaded(module: types.ModuleType) -> bool:
+    """True once a lazy module has been imported (always True for real modules)."""
+    return not isinstance(module, LazyModule) or module.__dict__['_lazy_target'] is not None
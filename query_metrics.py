@@ -0,0 +1,250 @@
+"""
+Query Metrics for Behaviour Support App
+Wraps the Supabase client so every query is timed and counted per query shape
+(table, operation and filter columns, without values), and periodically writes
+p50/p95/p99 per shape to the log and to a JSON file.
+"""
+
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+from collections import deque
+from time import perf_counter, time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from render_metrics import record_db_call
+
+logger = logging.getLogger(__name__)
+
+QUERY_METRICS_WINDOW = 1000
+QUERY_METRICS_EXPORT_SECONDS = 60
+QUERY_METRICS_PATH = os.environ.get('QUERY_METRICS_PATH', 'query_metrics.json')
+# Individual queries slower than this are logged as they happen
+SLOW_QUERY_SECONDS = 1.0
+# Responses up to this many rows are measured exactly; larger ones are estimated from a sample
+PAYLOAD_SAMPLE_ROWS = 50
+
+# Builder methods that only change the operation, or take no column worth keeping in the shape
+_OPERATIONS = {'select', 'insert', 'upsert', 'update', 'delete'}
+_BARE_METHODS = {'limit', 'range', 'single', 'maybe_single', 'csv', 'explain'}
+# col.op.value -> col.op.? inside or_()/filter expressions
+_FILTER_VALUE = re.compile(r'\.(eq|neq|gt|gte|lt|lte|like|ilike|is|in|cs|cd|fts)\.(\([^)]*\)|[^,()]*)')
+
+
+def payload_bytes(data: Any) -> int:
+    """Approximate JSON size of a response body."""
+    if not data:
+        return 0
+    if isinstance(data, list) and len(data) > PAYLOAD_SAMPLE_ROWS:
+        sample = json.dumps(data[:PAYLOAD_SAMPLE_ROWS], default=str, separators=(',', ':'))
+        return int(len(sample) * len(data) / PAYLOAD_SAMPLE_ROWS)
+    return len(json.dumps(data, default=str, separators=(',', ':')))
+
+
+def describe_call(method: str, args: Tuple) -> Tuple[Optional[str], Optional[str]]:
+    """(operation, shape part) for one builder call; values are left out of the shape."""
+    if method in _OPERATIONS:
+        if method == 'select':
+            columns = args[0] if args else '*'
+            return 'select', '*' if columns == '*' else f"{len(columns.split(','))} cols"
+        return method, None
+    if method in _BARE_METHODS:
+        return None, method
+    if method in ('or_', 'filter') and args:
+        expression = _FILTER_VALUE.sub(r'.\1.?', str(args[-1]))
+        return None, f"{method.rstrip('_')}({expression})"
+    if args and isinstance(args[0], str):
+        return None, f"{method.rstrip('_')}({args[0]})"
+    return None, method.rstrip('_')
+
+
+# --- METRICS STORE ---
+
+class QueryMetrics:
+    """
+    Per-shape rolling window of query durations plus running totals of calls,
+    rows, payload bytes and errors, shared by every session in the process.
+    """
+
+    def __init__(self, window: int = QUERY_METRICS_WINDOW, export_path: Optional[str] = QUERY_METRICS_PATH,
+                 export_seconds: float = QUERY_METRICS_EXPORT_SECONDS):
+        self.window = window
+        self.export_path = export_path
+        self.export_seconds = export_seconds
+        self._shapes: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._last_export = time()
+        self._exporting = False
+
+    def record(self, shape: str, seconds: float, rows: int, nbytes: int, error: Optional[str] = None):
+        with self._lock:
+            entry = self._shapes.get(shape)
+            if entry is None:
+                entry = self._shapes[shape] = {
+                    'durations': deque(maxlen=self.window), 'calls': 0, 'rows': 0,
+                    'max_rows': 0, 'bytes': 0, 'errors': 0,
+                }
+            entry['durations'].append(seconds)
+            entry['calls'] += 1
+            entry['rows'] += rows
+            entry['max_rows'] = max(entry['max_rows'], rows)
+            entry['bytes'] += nbytes
+            entry['errors'] += error is not None
+            due = not self._exporting and time() - self._last_export >= self.export_seconds
+            if due:
+                self._exporting = True
+
+        if seconds >= SLOW_QUERY_SECONDS:
+            logger.warning(f"Slow query ({seconds * 1000:.0f} ms, {rows} rows, {nbytes / 1024:.0f} KB): {shape}")
+        if due:
+            try:
+                self.export()
+            finally:
+                with self._lock:
+                    self._exporting = False
+                    self._last_export = time()
+
+    def summary(self) -> pd.DataFrame:
+        """One row per query shape, slowest p95 first."""
+        with self._lock:
+            snapshot: List[Tuple[str, Dict[str, Any], np.ndarray]] = [
+                (shape, dict(entry), np.array(entry['durations'])) for shape, entry in self._shapes.items()
+            ]
+        rows = []
+        for shape, entry, durations in snapshot:
+            p50, p95, p99 = np.percentile(durations, [50, 95, 99]) * 1000
+            rows.append({
+                'shape': shape,
+                'calls': entry['calls'],
+                'p50_ms': p50,
+                'p95_ms': p95,
+                'p99_ms': p99,
+                'max_ms': durations.max() * 1000,
+                'avg_rows': entry['rows'] / entry['calls'],
+                'max_rows': entry['max_rows'],
+                'avg_kb': entry['bytes'] / entry['calls'] / 1024,
+                'total_mb': entry['bytes'] / 2 ** 20,
+                'errors': entry['errors'],
+            })
+        if not rows:
+            return pd.DataFrame()
+        return pd.DataFrame(rows).sort_values('p95_ms', ascending=False).round(2).reset_index(drop=True)
+
+    def export(self, path: Optional[str] = None, log_top: int = 10):
+        """Logs the slowest shapes and writes the full summary as JSON (atomically)."""
+        summary = self.summary()
+        if summary.empty:
+            return
+        for row in summary.head(log_top).itertuples():
+            logger.info(
+                f"Query p50={row.p50_ms:.0f}ms p95={row.p95_ms:.0f}ms p99={row.p99_ms:.0f}ms "
+                f"calls={row.calls} avg_rows={row.avg_rows:.0f} avg_kb={row.avg_kb:.1f}: {row.shape}"
+            )
+        path = path or self.export_path
+        if not path:
+            return
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump({'generated_at': time(), 'window': self.window,
+                           'shapes': summary.to_dict('records')}, f, indent=2)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not write query metrics to {path}: {e}")
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def clear(self):
+        with self._lock:
+            self._shapes.clear()
+
+
+_metrics = QueryMetrics()
+
+
+def get_query_metrics() -> QueryMetrics:
+    return _metrics
+
+
+# --- CLIENT WRAPPER ---
+
+class InstrumentedQuery:
+    """A query builder that remembers its shape and times execute()."""
+
+    def __init__(self, builder: Any, table: str, operation: str, parts: Tuple[str, ...] = (),
+                 metrics: Optional[QueryMetrics] = None):
+        self._builder = builder
+        self._table = table
+        self._operation = operation
+        self._parts = parts
+        self._metrics = metrics or _metrics
+
+    @property
+    def shape(self) -> str:
+        return ' '.join((f"{self._table}.{self._operation}",) + self._parts)
+
+    def _wrap(self, result: Any, operation: Optional[str], part: Optional[str]) -> Any:
+        if not (hasattr(result, 'execute') or hasattr(result, 'select')):
+            return result
+        parts = self._parts + (part,) if part else self._parts
+        return InstrumentedQuery(result, self._table, operation or self._operation, parts, self._metrics)
+
+    def execute(self, *args, **kwargs):
+        started = perf_counter()
+        response, error = None, None
+        try:
+            response = self._builder.execute(*args, **kwargs)
+            return response
+        except Exception as e:
+            error = type(e).__name__
+            raise
+        finally:
+            seconds = perf_counter() - started
+            record_db_call(seconds)
+            data = getattr(response, 'data', None)
+            rows = len(data) if isinstance(data, list) else int(data is not None)
+            self._metrics.record(self.shape, seconds, rows, payload_bytes(data), error)
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._builder, name)
+        if not callable(attr):
+            # Properties such as .not_ return a builder too
+            return self._wrap(attr, None, name.rstrip('_'))
+
+        def call(*args, **kwargs):
+            operation, part = describe_call(name, args)
+            return self._wrap(attr(*args, **kwargs), operation, part)
+        return call
+
+
+class InstrumentedClient:
+    """
+    Drop-in wrapper for the Supabase client: table()/from_()/rpc() return
+    instrumented builders; everything else (auth, storage) passes through.
+    """
+
+    def __init__(self, client: Any, metrics: Optional[QueryMetrics] = None):
+        self._client = client
+        self._metrics = metrics or _metrics
+
+    def table(self, name: str) -> InstrumentedQuery:
+        return InstrumentedQuery(self._client.table(name), name, 'select', metrics=self._metrics)
+
+    from_ = table
+
+    def rpc(self, fn: str, params: Optional[Dict[str, Any]] = None, *args, **kwargs) -> InstrumentedQuery:
+        params = params or {}
+        part = f"({','.join(params)})"
+        return InstrumentedQuery(self._client.rpc(fn, params, *args, **kwargs), fn, 'rpc', (part,),
+                                 metrics=self._metrics)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._client, name)
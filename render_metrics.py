@@ -0,0 +1,158 @@
+"""
+Render Metrics for Behaviour Support App
+Times each page render and counts the Supabase calls and DataFrames behind it,
+keeping a rolling window per page in process memory for the admin performance tab.
+"""
+
+import threading
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from time import perf_counter, time
+from typing import Any, Deque, Dict, Iterator, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+RENDER_METRICS_WINDOW = 500
+# Upper bounds of the render-time histogram buckets, in milliseconds
+RENDER_TIME_BUCKETS_MS = [50, 100, 250, 500, 1000, 2500, 5000, 10000]
+
+SAMPLE_COLUMNS = ['page', 'user', 'started_at', 'ms', 'db_calls', 'db_ms', 'frames', 'rows', 'error']
+
+
+class RenderTrace:
+    """
+    Counters for one render. A render that calls another decorated renderer
+    (the admin portal's tabs, for example) also adds the inner counts to its own.
+    """
+
+    def __init__(self, page: str, user: str, parent: Optional['RenderTrace'] = None):
+        self.page = page
+        self.user = user
+        self.parent = parent
+        self.started_at = time()
+        self.seconds = 0.0
+        self.db_calls = 0
+        self.db_seconds = 0.0
+        self.frames = 0
+        self.rows = 0
+        self.error: Optional[str] = None
+
+    def chain(self) -> Iterator['RenderTrace']:
+        trace = self
+        while trace is not None:
+            yield trace
+            trace = trace.parent
+
+    def as_row(self) -> Dict[str, Any]:
+        return {
+            'page': self.page, 'user': self.user, 'started_at': self.started_at,
+            'ms': self.seconds * 1000, 'db_calls': self.db_calls, 'db_ms': self.db_seconds * 1000,
+            'frames': self.frames, 'rows': self.rows, 'error': self.error,
+        }
+
+
+# Streamlit runs each session's script on its own thread, so this is per session
+_current_trace: ContextVar[Optional[RenderTrace]] = ContextVar('current_render_trace', default=None)
+
+
+def current_trace() -> Optional[RenderTrace]:
+    return _current_trace.get()
+
+
+def record_db_call(seconds: float):
+    """Adds one Supabase round trip to the render in progress (no-op outside a render)."""
+    trace = _current_trace.get()
+    if trace is not None:
+        for t in trace.chain():
+            t.db_calls += 1
+            t.db_seconds += seconds
+
+
+def record_frame(frame: pd.DataFrame) -> pd.DataFrame:
+    """Counts a DataFrame built during the render in progress and returns it unchanged."""
+    trace = _current_trace.get()
+    if trace is not None:
+        for t in trace.chain():
+            t.frames += 1
+            t.rows += len(frame)
+    return frame
+
+
+# --- ROLLING STORE ---
+
+class RenderMetrics:
+    """The most recent `window` renders of each page, shared by every session in the process."""
+
+    def __init__(self, window: int = RENDER_METRICS_WINDOW):
+        self.window = window
+        self._samples: Dict[str, Deque[Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, trace: RenderTrace):
+        with self._lock:
+            self._samples.setdefault(trace.page, deque(maxlen=self.window)).append(trace.as_row())
+
+    def clear(self):
+        with self._lock:
+            self._samples.clear()
+
+    def samples(self, page: Optional[str] = None) -> pd.DataFrame:
+        with self._lock:
+            rows = list(self._samples.get(page, [])) if page else [r for d in self._samples.values() for r in d]
+        frame = pd.DataFrame(rows, columns=SAMPLE_COLUMNS)
+        frame['started_at'] = pd.to_datetime(frame['started_at'], unit='s')
+        return frame
+
+    def summary(self, by: Union[str, List[str]] = 'page') -> pd.DataFrame:
+        """Renders, p50/p95/max time and average counters per group, slowest p95 first."""
+        samples = self.samples()
+        if samples.empty:
+            return pd.DataFrame()
+        grouped = samples.groupby(by)
+        summary = grouped.agg(
+            renders=('ms', 'size'),
+            p50_ms=('ms', 'median'),
+            p95_ms=('ms', lambda ms: np.percentile(ms, 95)),
+            max_ms=('ms', 'max'),
+            avg_db_calls=('db_calls', 'mean'),
+            avg_db_ms=('db_ms', 'mean'),
+            avg_frames=('frames', 'mean'),
+            avg_rows=('rows', 'mean'),
+            errors=('error', 'count'),
+        )
+        return summary.sort_values('p95_ms', ascending=False).round(1).reset_index()
+
+    def histogram(self, page: Optional[str] = None) -> pd.DataFrame:
+        """Render-time counts per bucket (RENDER_TIME_BUCKETS_MS) over the current window."""
+        ms = self.samples(page)['ms'].to_numpy()
+        edges = [0] + RENDER_TIME_BUCKETS_MS + [np.inf]
+        counts, _ = np.histogram(ms, bins=edges)
+        labels = [f"≤{b:,} ms" for b in RENDER_TIME_BUCKETS_MS] + [f">{RENDER_TIME_BUCKETS_MS[-1]:,} ms"]
+        return pd.DataFrame({'bucket': labels, 'renders': counts})
+
+
+_metrics = RenderMetrics()
+
+
+def get_render_metrics() -> RenderMetrics:
+    return _metrics
+
+
+@contextmanager
+def track_render(page: str, user: str) -> Iterator[RenderTrace]:
+    """
+    Times the block as one render of `page` by `user` and records it when the
+    block exits, including via st.rerun()/st.stop(), which raise through it.
+    """
+    trace = RenderTrace(page, user, parent=_current_trace.get())
+    token = _current_trace.set(trace)
+    started = perf_counter()
+    try:
+        yield trace
+    finally:
+        trace.seconds = perf_counter() - started
+        _current_trace.reset(token)
+        _metrics.record(trace)
+
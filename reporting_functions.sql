@@ -0,0 +1,135 @@
+-- Behaviour Support App - Reporting Functions
+-- Run these commands in your Supabase SQL editor (after supabase_schema_CLEAN)
+--
+-- Dashboards call these through supabase.rpc() and receive pre-aggregated
+-- counts instead of downloading the whole incidents table.
+-- Every function takes the same optional filters:
+--   p_from / p_to  - inclusive incident_date range (NULL = open ended)
+--   p_program      - 'JP', 'PY' or 'SY' (NULL = all programs)
+-- Note: the app writes behaviour_type; rename to behavior_type if your table
+-- was created from the original schema column name.
+
+-- ============================================
+-- 1. INDEX FOR DATE-RANGED AGGREGATES
+-- ============================================
+CREATE INDEX IF NOT EXISTS idx_incidents_date_student ON incidents(incident_date, student_id);
+
+-- ============================================
+-- 2. TOTALS BY PROGRAM
+-- ============================================
+CREATE OR REPLACE FUNCTION incident_counts_by_program(
+    p_from DATE DEFAULT NULL,
+    p_to DATE DEFAULT NULL,
+    p_program TEXT DEFAULT NULL
+)
+RETURNS TABLE (
+    program TEXT,
+    incidents BIGINT,
+    critical_incidents BIGINT,
+    severity_sum BIGINT
+) AS $$
+    SELECT
+        s.program,
+        COUNT(*) AS incidents,
+        COUNT(*) FILTER (WHERE i.is_critical) AS critical_incidents,
+        SUM(i.severity) AS severity_sum
+    FROM incidents i
+    JOIN students s ON s.id = i.student_id
+    WHERE (p_from IS NULL OR i.incident_date >= p_from)
+      AND (p_to IS NULL OR i.incident_date <= p_to)
+      AND (p_program IS NULL OR s.program = p_program)
+    GROUP BY s.program
+    ORDER BY s.program;
+$$ LANGUAGE sql STABLE;
+
+-- ============================================
+-- 3. BEHAVIOUR TYPES BY PROGRAM
+-- ============================================
+CREATE OR REPLACE FUNCTION incident_counts_by_program_behaviour(
+    p_from DATE DEFAULT NULL,
+    p_to DATE DEFAULT NULL,
+    p_program TEXT DEFAULT NULL
+)
+RETURNS TABLE (
+    program TEXT,
+    behaviour_type TEXT,
+    incidents BIGINT
+) AS $$
+    SELECT
+        s.program,
+        i.behaviour_type,
+        COUNT(*) AS incidents
+    FROM incidents i
+    JOIN students s ON s.id = i.student_id
+    WHERE (p_from IS NULL OR i.incident_date >= p_from)
+      AND (p_to IS NULL OR i.incident_date <= p_to)
+      AND (p_program IS NULL OR s.program = p_program)
+    GROUP BY s.program, i.behaviour_type
+    ORDER BY s.program, COUNT(*) DESC;
+$$ LANGUAGE sql STABLE;
+
+-- ============================================
+-- 4. WEEKLY TREND BY PROGRAM
+-- ============================================
+CREATE OR REPLACE FUNCTION incident_counts_by_program_week(
+    p_from DATE DEFAULT NULL,
+    p_to DATE DEFAULT NULL,
+    p_program TEXT DEFAULT NULL
+)
+RETURNS TABLE (
+    program TEXT,
+    week_start DATE,
+    incidents BIGINT
+) AS $$
+    SELECT
+        s.program,
+        date_trunc('week', i.incident_date)::date AS week_start,
+        COUNT(*) AS incidents
+    FROM incidents i
+    JOIN students s ON s.id = i.student_id
+    WHERE (p_from IS NULL OR i.incident_date >= p_from)
+      AND (p_to IS NULL OR i.incident_date <= p_to)
+      AND (p_program IS NULL OR s.program = p_program)
+    GROUP BY s.program, date_trunc('week', i.incident_date)
+    ORDER BY 2, 1;
+$$ LANGUAGE sql STABLE;
+
+-- ============================================
+-- 5. LOCATION HOTSPOTS
+-- ============================================
+CREATE OR REPLACE FUNCTION incident_counts_by_location(
+    p_from DATE DEFAULT NULL,
+    p_to DATE DEFAULT NULL,
+    p_program TEXT DEFAULT NULL
+)
+RETURNS TABLE (
+    program TEXT,
+    location TEXT,
+    incidents BIGINT
+) AS $$
+    SELECT
+        s.program,
+        i.location,
+        COUNT(*) AS incidents
+    FROM incidents i
+    JOIN students s ON s.id = i.student_id
+    WHERE (p_from IS NULL OR i.incident_date >= p_from)
+      AND (p_to IS NULL OR i.incident_date <= p_to)
+      AND (p_program IS NULL OR s.program = p_program)
+    GROUP BY s.program, i.location
+    ORDER BY COUNT(*) DESC;
+$$ LANGUAGE sql STABLE;
+
+-- ============================================
+-- 6. PERMISSIONS
+-- ============================================
+GRANT EXECUTE ON FUNCTION incident_counts_by_program(DATE, DATE, TEXT) TO anon, authenticated;
+GRANT EXECUTE ON FUNCTION incident_counts_by_program_behaviour(DATE, DATE, TEXT) TO anon, authenticated;
+GRANT EXECUTE ON FUNCTION incident_counts_by_program_week(DATE, DATE, TEXT) TO anon, authenticated;
+GRANT EXECUTE ON FUNCTION incident_counts_by_location(DATE, DATE, TEXT) TO anon, authenticated;
+
+-- ============================================
+-- VERIFICATION
+-- ============================================
+SELECT * FROM incident_counts_by_program();
+SELECT * FROM incident_counts_by_program_week(CURRENT_DATE - 90, CURRENT_DATE);
@@ -3,6 +3,12 @@ Modern Styling Options for Behaviour Support App
 Choose your preferred theme and add to your app!
 """
 
+import json
+import os
+import re
+from functools import lru_cache
+from typing import Tuple
+
 # ============================================
 # THEME 1: PROFESSIONAL BLUE (Recommended)
 # Clean, trustworthy, educational
@@ -529,3 +535,833 @@ section[data-testid="stSidebar"] * {
 }
 </style>
 """
+
+# ============================================
+# THEME 6: BOLD MODERN (Production app)
+# Deep blue gradient, high-contrast cards
+# ============================================
+
+THEME_6_BOLD_MODERN = """
+<style>
+@import url('https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700;800&family=Poppins:wght@400;500;600;700;800&display=swap');
+
+/* ========== GLOBAL STYLES ========== */
+.main {
+    font-family: 'Inter', -apple-system, BlinkMacSystemFont, sans-serif;
+    background: linear-gradient(135deg, #1e3a8a 0%, #3730a3 100%);
+    background-attachment: fixed;
+    padding: 2rem;
+}
+
+.block-container {
+    padding-top: 3rem;
+    padding-bottom: 3rem;
+    max-width: 1400px;
+}
+
+/* ========== TYPOGRAPHY ========== */
+h1 {
+    font-family: 'Poppins', sans-serif;
+    font-size: 3.5rem !important;
+    font-weight: 800 !important;
+    background: linear-gradient(135deg, #ffffff 0%, #fbbf24 100%);
+    -webkit-background-clip: text;
+    -webkit-text-fill-color: transparent;
+    background-clip: text;
+    margin-bottom: 2rem !important;
+    text-shadow: 0 4px 6px rgba(0, 0, 0, 0.3);
+    letter-spacing: -0.02em;
+}
+
+h2 {
+    font-family: 'Poppins', sans-serif;
+    font-size: 2rem !important;
+    font-weight: 700 !important;
+    color: #ffffff !important;
+    margin-top: 2rem !important;
+    margin-bottom: 1rem !important;
+}
+
+h3 {
+    font-family: 'Poppins', sans-serif;
+    font-size: 1.5rem !important;
+    font-weight: 600 !important;
+    color: #f3f4f6 !important;
+    margin-bottom: 1rem !important;
+}
+
+h4 {
+    font-family: 'Poppins', sans-serif;
+    font-size: 1.25rem !important;
+    font-weight: 600 !important;
+    color: #e5e7eb !important;
+}
+
+p, label, span, div {
+    font-family: 'Inter', sans-serif;
+    color: #f3f4f6 !important;
+    font-size: 1rem;
+    line-height: 1.6;
+}
+
+/* Make captions more visible on dark background */
+.caption, [data-testid="stCaptionContainer"] {
+    color: #d1d5db !important;
+    font-size: 0.9rem !important;
+}
+
+/* ========== CARDS & CONTAINERS ========== */
+div[data-testid="stVerticalBlock"] > div[style*="border"] {
+    background: rgba(255, 255, 255, 0.98) !important;
+    -webkit-backdrop-filter: blur(20px) !important;
+    backdrop-filter: blur(20px) !important;
+    border-radius: 24px !important;
+    box-shadow: 
+        0 20px 25px -5px rgba(0, 0, 0, 0.2),
+        0 10px 10px -5px rgba(0, 0, 0, 0.1),
+        inset 0 1px 0 0 rgba(255, 255, 255, 0.1) !important;
+    padding: 2rem !important;
+    border: 1px solid rgba(255, 255, 255, 0.5) !important;
+    transition: all 0.4s cubic-bezier(0.4, 0, 0.2, 1) !important;
+}
+
+/* Make text INSIDE white cards dark and readable */
+div[data-testid="stVerticalBlock"] > div[style*="border"] p,
+div[data-testid="stVerticalBlock"] > div[style*="border"] label,
+div[data-testid="stVerticalBlock"] > div[style*="border"] span,
+div[data-testid="stVerticalBlock"] > div[style*="border"] div,
+div[data-testid="stVerticalBlock"] > div[style*="border"] h2,
+div[data-testid="stVerticalBlock"] > div[style*="border"] h3,
+div[data-testid="stVerticalBlock"] > div[style*="border"] h4,
+div[data-testid="stVerticalBlock"] > div[style*="border"] * {
+    color: #1f2937 !important;
+}
+
+div[data-testid="stVerticalBlock"] > div[style*="border"] .caption,
+div[data-testid="stVerticalBlock"] > div[style*="border"] [data-testid="stCaptionContainer"] {
+    color: #4b5563 !important;
+}
+
+/* Ensure form elements inside containers are visible */
+div[data-testid="stVerticalBlock"] > div[style*="border"] .stTextInput label,
+div[data-testid="stVerticalBlock"] > div[style*="border"] .stSelectbox label,
+div[data-testid="stVerticalBlock"] > div[style*="border"] .stTextArea label,
+div[data-testid="stVerticalBlock"] > div[style*="border"] .stDateInput label,
+div[data-testid="stVerticalBlock"] > div[style*="border"] .stTimeInput label,
+div[data-testid="stVerticalBlock"] > div[style*="border"] .stNumberInput label,
+div[data-testid="stVerticalBlock"] > div[style*="border"] .stSlider label {
+    color: #1f2937 !important;
+}
+
+div[data-testid="stVerticalBlock"] > div[style*="border"]:hover {
+    transform: translateY(-8px) scale(1.02) !important;
+    box-shadow: 
+        0 25px 50px -12px rgba(0, 0, 0, 0.3),
+        inset 0 1px 0 0 rgba(255, 255, 255, 0.2) !important;
+    border-color: rgba(255, 255, 255, 0.7) !important;
+}
+
+/* ========== BUTTONS ========== */
+.stButton > button {
+    font-family: 'Inter', sans-serif !important;
+    font-weight: 600 !important;
+    font-size: 1rem !important;
+    border-radius: 16px !important;
+    padding: 1rem 2.5rem !important;
+    transition: all 0.3s cubic-bezier(0.4, 0, 0.2, 1) !important;
+    border: none !important;
+    text-transform: none !important;
+    letter-spacing: 0.02em !important;
+    position: relative !important;
+    overflow: hidden !important;
+}
+
+.stButton > button::before {
+    content: '' !important;
+    position: absolute !important;
+    top: 0 !important;
+    left: -100% !important;
+    width: 100% !important;
+    height: 100% !important;
+    background: linear-gradient(90deg, transparent, rgba(255,255,255,0.3), transparent) !important;
+    transition: left 0.5s !important;
+}
+
+.stButton > button:hover::before {
+    left: 100% !important;
+}
+
+.stButton > button[kind="primary"] {
+    background: linear-gradient(135deg, #3b82f6 0%, #8b5cf6 100%) !important;
+    color: white !important;
+    box-shadow: 
+        0 10px 25px -5px rgba(59, 130, 246, 0.5),
+        0 4px 6px -2px rgba(59, 130, 246, 0.3) !important;
+}
+
+.stButton > button[kind="primary"]:hover {
+    background: linear-gradient(135deg, #2563eb 0%, #7c3aed 100%) !important;
+    box-shadow: 
+        0 20px 35px -5px rgba(59, 130, 246, 0.6),
+        0 8px 12px -2px rgba(59, 130, 246, 0.4) !important;
+    transform: translateY(-3px) !important;
+}
+
+.stButton > button[kind="secondary"] {
+    background: rgba(255, 255, 255, 0.95) !important;
+    color: #3b82f6 !important;
+    border: 3px solid #3b82f6 !important;
+    box-shadow: 0 4px 6px -1px rgba(0, 0, 0, 0.1) !important;
+}
+
+.stButton > button[kind="secondary"]:hover {
+    background: rgba(255, 255, 255, 1) !important;
+    border-color: #2563eb !important;
+    box-shadow: 0 10px 15px -3px rgba(59, 130, 246, 0.3) !important;
+    transform: translateY(-2px) !important;
+}
+
+/* ========== METRICS ========== */
+div[data-testid="stMetric"] {
+    background: linear-gradient(135deg, #ffffff 0%, #eff6ff 100%) !important;
+    padding: 2rem !important;
+    border-radius: 20px !important;
+    border-left: 6px solid #3b82f6 !important;
+    box-shadow: 
+        0 10px 15px -3px rgba(0, 0, 0, 0.1),
+        0 4px 6px -2px rgba(0, 0, 0, 0.05) !important;
+    transition: all 0.3s ease !important;
+}
+
+div[data-testid="stMetric"]:hover {
+    transform: scale(1.05) !important;
+    box-shadow: 0 20px 25px -5px rgba(59, 130, 246, 0.3) !important;
+}
+
+div[data-testid="stMetric"] label {
+    color: #1f2937 !important;
+    font-size: 0.875rem !important;
+    font-weight: 600 !important;
+    text-transform: uppercase !important;
+    letter-spacing: 0.05em !important;
+}
+
+div[data-testid="stMetric"] div[data-testid="stMetricValue"] {
+    color: #1e40af !important;
+    font-size: 3rem !important;
+    font-weight: 800 !important;
+    text-shadow: 0 2px 4px rgba(59, 130, 246, 0.2) !important;
+}
+
+/* ========== TABS ========== */
+.stTabs [data-baseweb="tab-list"] {
+    gap: 12px;
+    background: rgba(255, 255, 255, 0.95);
+    -webkit-backdrop-filter: blur(10px);
+    backdrop-filter: blur(10px);
+    padding: 1rem;
+    border-radius: 20px;
+    box-shadow: 0 4px 6px -1px rgba(0, 0, 0, 0.1);
+}
+
+.stTabs [data-baseweb="tab"] {
+    font-family: 'Inter', sans-serif;
+    font-weight: 600;
+    border-radius: 12px;
+    padding: 1rem 2rem;
+    color: #1f2937 !important;
+    background: transparent;
+    transition: all 0.3s ease;
+}
+
+.stTabs [data-baseweb="tab"]:hover {
+    background: rgba(59, 130, 246, 0.1);
+    color: #3b82f6 !important;
+}
+
+.stTabs [aria-selected="true"] {
+    background: linear-gradient(135deg, #3b82f6 0%, #8b5cf6 100%) !important;
+    color: white !important;
+    box-shadow: 0 4px 12px rgba(59, 130, 246, 0.4);
+}
+
+/* ========== INPUT FIELDS ========== */
+.stTextInput input, 
+.stSelectbox select, 
+.stTextArea textarea,
+.stDateInput input,
+.stTimeInput input,
+.stNumberInput input {
+    border-radius: 12px !important;
+    border: 2px solid #cbd5e1 !important;
+    font-family: 'Inter', sans-serif !important;
+    transition: all 0.3s ease !important;
+    padding: 0.75rem 1rem !important;
+    font-size: 1rem !important;
+    background: white !important;
+    color: #1f2937 !important;
+}
+
+.stTextInput input:focus, 
+.stSelectbox select:focus, 
+.stTextArea textarea:focus {
+    border-color: #3b82f6 !important;
+    box-shadow: 0 0 0 4px rgba(59, 130, 246, 0.1) !important;
+    outline: none !important;
+}
+
+/* Input labels - light on dark background */
+.stTextInput label, .stSelectbox label, .stTextArea label, .stDateInput label, .stTimeInput label, .stNumberInput label {
+    color: #f3f4f6 !important;
+    font-weight: 600 !important;
+}
+
+/* But dark text when inside white cards/forms */
+div[data-testid="stVerticalBlock"] > div[style*="border"] .stTextInput label,
+div[data-testid="stVerticalBlock"] > div[style*="border"] .stSelectbox label,
+div[data-testid="stVerticalBlock"] > div[style*="border"] .stTextArea label,
+div[data-testid="stVerticalBlock"] > div[style*="border"] .stDateInput label,
+div[data-testid="stVerticalBlock"] > div[style*="border"] .stTimeInput label,
+div[data-testid="stVerticalBlock"] > div[style*="border"] .stNumberInput label,
+[data-testid="stForm"] .stTextInput label,
+[data-testid="stForm"] .stSelectbox label,
+[data-testid="stForm"] .stTextArea label,
+[data-testid="stForm"] .stDateInput label,
+[data-testid="stForm"] .stTimeInput label,
+[data-testid="stForm"] .stNumberInput label {
+    color: #1f2937 !important;
+}
+
+/* Make ALL content inside forms dark and readable */
+[data-testid="stForm"],
+[data-testid="stForm"] * {
+    color: #1f2937 !important;
+}
+
+[data-testid="stForm"] h2,
+[data-testid="stForm"] h3,
+[data-testid="stForm"] h4 {
+    color: #111827 !important;
+}
+
+[data-testid="stForm"] .caption,
+[data-testid="stForm"] [data-testid="stCaptionContainer"] {
+    color: #4b5563 !important;
+}
+
+/* ========== EXPANDERS ========== */
+.streamlit-expanderHeader {
+    font-family: 'Inter', sans-serif !important;
+    font-weight: 700 !important;
+    font-size: 1.1rem !important;
+    color: #1e40af !important;
+    background: linear-gradient(135deg, #eff6ff 0%, #dbeafe 100%) !important;
+    border-radius: 12px !important;
+    padding: 1.25rem !important;
+    border: 2px solid #93c5fd !important;
+    transition: all 0.3s ease !important;
+}
+
+.streamlit-expanderHeader:hover {
+    background: linear-gradient(135deg, #dbeafe 0%, #bfdbfe 100%) !important;
+    border-color: #60a5fa !important;
+    transform: translateX(4px) !important;
+}
+
+/* Make sure expander content is readable */
+.streamlit-expanderContent {
+    background: rgba(255, 255, 255, 0.95) !important;
+    padding: 1rem !important;
+    border-radius: 0 0 12px 12px !important;
+}
+
+.streamlit-expanderContent p,
+.streamlit-expanderContent label,
+.streamlit-expanderContent span,
+.streamlit-expanderContent div,
+.streamlit-expanderContent h2,
+.streamlit-expanderContent h3,
+.streamlit-expanderContent h4,
+.streamlit-expanderContent * {
+    color: #1f2937 !important;
+}
+
+/* Make text inside expanders dark */
+.streamlit-expanderContent p,
+.streamlit-expanderContent label,
+.streamlit-expanderContent span,
+.streamlit-expanderContent div {
+    color: #1f2937 !important;
+}
+
+/* ========== TABLES ========== */
+.dataframe {
+    border-radius: 16px !important;
+    overflow: hidden !important;
+    box-shadow: 0 10px 15px -3px rgba(0, 0, 0, 0.1) !important;
+    border: none !important;
+}
+
+.dataframe thead tr {
+    background: linear-gradient(135deg, #3b82f6 0%, #8b5cf6 100%) !important;
+}
+
+.dataframe thead th {
+    color: white !important;
+    font-weight: 700 !important;
+    font-size: 0.95rem !important;
+    padding: 1.25rem !important;
+    text-transform: uppercase !important;
+    letter-spacing: 0.05em !important;
+}
+
+.dataframe tbody td {
+    color: #1f2937 !important;
+    padding: 1rem !important;
+    background: white !important;
+}
+
+.dataframe tbody tr {
+    transition: all 0.2s ease !important;
+    background: white !important;
+}
+
+.dataframe tbody tr:hover {
+    background: rgba(59, 130, 246, 0.05) !important;
+    transform: scale(1.01) !important;
+}
+
+/* ========== ALERTS ========== */
+.stSuccess {
+    background: linear-gradient(135deg, #d1fae5 0%, #a7f3d0 100%) !important;
+    color: #065f46 !important;
+    border-left: 6px solid #10b981 !important;
+    border-radius: 12px !important;
+    padding: 1.5rem !important;
+    font-family: 'Inter', sans-serif !important;
+    font-weight: 500 !important;
+    box-shadow: 0 4px 6px -1px rgba(16, 185, 129, 0.2) !important;
+}
+
+.stError {
+    background: linear-gradient(135deg, #fee2e2 0%, #fecaca 100%) !important;
+    color: #991b1b !important;
+    border-left: 6px solid #ef4444 !important;
+    border-radius: 12px !important;
+    padding: 1.5rem !important;
+    font-family: 'Inter', sans-serif !important;
+    font-weight: 500 !important;
+    box-shadow: 0 4px 6px -1px rgba(239, 68, 68, 0.2) !important;
+}
+
+.stWarning {
+    background: linear-gradient(135deg, #fef3c7 0%, #fde68a 100%) !important;
+    color: #92400e !important;
+    border-left: 6px solid #f59e0b !important;
+    border-radius: 12px !important;
+    padding: 1.5rem !important;
+    font-family: 'Inter', sans-serif !important;
+    font-weight: 500 !important;
+    box-shadow: 0 4px 6px -1px rgba(245, 158, 11, 0.2) !important;
+}
+
+.stInfo {
+    background: linear-gradient(135deg, #dbeafe 0%, #bfdbfe 100%) !important;
+    color: #1e40af !important;
+    border-left: 6px solid #3b82f6 !important;
+    border-radius: 12px !important;
+    padding: 1.5rem !important;
+    font-family: 'Inter', sans-serif !important;
+    font-weight: 500 !important;
+    box-shadow: 0 4px 6px -1px rgba(59, 130, 246, 0.2) !important;
+}
+
+/* ========== SLIDER ========== */
+.stSlider > div > div > div {
+    background: linear-gradient(135deg, #3b82f6 0%, #8b5cf6 100%) !important;
+}
+
+/* ========== PROGRESS BAR ========== */
+.stProgress > div > div > div {
+    background: linear-gradient(135deg, #3b82f6 0%, #8b5cf6 100%) !important;
+}
+
+/* ========== SPINNER ========== */
+.stSpinner > div {
+    border-top-color: #3b82f6 !important;
+}
+
+/* ========== SIDEBAR ========== */
+section[data-testid="stSidebar"] {
+    background: linear-gradient(180deg, #1e3a8a 0%, #1e40af 100%) !important;
+    backdrop-filter: blur(20px) !important;
+}
+
+section[data-testid="stSidebar"] * {
+    color: white !important;
+}
+
+/* ========== SCROLLBAR ========== */
+::-webkit-scrollbar {
+    width: 12px;
+    height: 12px;
+}
+
+::-webkit-scrollbar-track {
+    background: rgba(255, 255, 255, 0.1);
+    border-radius: 10px;
+}
+
+::-webkit-scrollbar-thumb {
+    background: linear-gradient(135deg, #3b82f6 0%, #8b5cf6 100%);
+    border-radius: 10px;
+    border: 2px solid rgba(255, 255, 255, 0.1);
+}
+
+::-webkit-scrollbar-thumb:hover {
+    background: linear-gradient(135deg, #2563eb 0%, #7c3aed 100%);
+}
+
+/* ========== ANIMATIONS ========== */
+@keyframes fadeIn {
+    from { opacity: 0; transform: translateY(20px); }
+    to { opacity: 1; transform: translateY(0); }
+}
+
+.main > div {
+    animation: fadeIn 0.6s ease-out;
+}
+
+/* ========== SPECIAL EFFECTS ========== */
+.stButton > button[kind="primary"]::after {
+    content: '→';
+    margin-left: 8px;
+    transition: margin-left 0.3s ease;
+}
+
+.stButton > button[kind="primary"]:hover::after {
+    margin-left: 12px;
+}
+
+/* ========== COMPREHENSIVE FIX FOR WHITE BACKGROUNDS ========== */
+/* Any element with a white or light background should have dark text */
+[style*="background: white"],
+[style*="background: #fff"],
+[style*="background: rgb(255, 255, 255)"],
+[style*="background-color: white"],
+[style*="background-color: #fff"],
+[style*="background-color: rgb(255, 255, 255)"],
+div[style*="background: rgba(255, 255, 255"],
+div[class*="stContainer"] {
+    color: #1f2937 !important;
+}
+
+[style*="background: white"] *,
+[style*="background: #fff"] *,
+[style*="background: rgb(255, 255, 255)"] *,
+[style*="background-color: white"] *,
+[style*="background-color: #fff"] *,
+[style*="background-color: rgb(255, 255, 255)"] *,
+div[style*="background: rgba(255, 255, 255"] *,
+div[class*="stContainer"] * {
+    color: #1f2937 !important;
+}
+
+/* Streamlit's default containers */
+.element-container {
+    color: #f3f4f6 !important;
+}
+
+/* Make markdown inside white areas dark */
+.stMarkdown {
+    color: inherit !important;
+}
+
+/* Specific override for columns and containers */
+.row-widget,
+.stColumn {
+    color: #f3f4f6 !important;
+}
+
+/* Force ALL st.container(border=True) to have dark text */
+[data-testid="stVerticalBlock"] [data-testid="stVerticalBlock"],
+[data-testid="column"] > div,
+.stContainer,
+.css-container {
+    color: #1f2937 !important;
+}
+
+[data-testid="stVerticalBlock"] [data-testid="stVerticalBlock"] *,
+[data-testid="column"] > div *,
+.stContainer *,
+.css-container * {
+    color: #1f2937 !important;
+}
+
+/* Make sure button text inside containers is visible */
+div[style*="border"] .stButton > button[kind="secondary"] {
+    color: #3b82f6 !important;
+}
+
+/* Ensure metric values are visible */
+[data-testid="stMetric"] [data-testid="stMetricLabel"],
+[data-testid="stMetric"] [data-testid="stMetricValue"] {
+    color: #1e40af !important;
+}
+
+/* Tab content should be dark */
+.stTabs [data-baseweb="tab-panel"] {
+    color: #1f2937 !important;
+}
+
+.stTabs [data-baseweb="tab-panel"] * {
+    color: #1f2937 !important;
+}
+
+/* ========== NUCLEAR OPTION - FORCE ALL TEXT TO BE VISIBLE ========== */
+/* Default: all text should be WHITE on the dark background */
+* {
+    color: #ffffff !important;
+}
+
+/* Override: text should be DARK inside white containers */
+[data-testid="stVerticalBlock"] > div[style*="border"] *,
+[data-testid="stForm"] *,
+.stTabs [data-baseweb="tab-panel"] *,
+.streamlit-expanderContent *,
+.dataframe *,
+div[data-testid="stMetric"] *,
+[style*="background: white"] *,
+[style*="background-color: white"] *,
+[style*="background: rgb(255"] *,
+div[class*="stMarkdown"] p,
+div[class*="stMarkdown"] span,
+div[class*="stMarkdown"] div {
+    color: #1f2937 !important;
+}
+
+/* Input fields - always dark text on white background */
+input, select, textarea {
+    color: #1f2937 !important;
+    background: white !important;
+}
+
+/* Labels should be WHITE by default, DARK in forms */
+label {
+    color: #ffffff !important;
+}
+
+[data-testid="stForm"] label,
+[data-testid="stVerticalBlock"] > div[style*="border"] label {
+    color: #1f2937 !important;
+}
+
+/* Button text should always be visible */
+button {
+    color: #ffffff !important;
+}
+
+button[kind="secondary"] {
+    color: #3b82f6 !important;
+}
+
+</style>
+"""
+
+# ============================================
+# HERO SECTION (login + landing pages)
+# Animated header shared by every theme
+# ============================================
+
+HERO_CSS = """
+<style>
+@keyframes gradient-shift {
+    0% { background-position: 0% 50%; }
+    50% { background-position: 100% 50%; }
+    100% { background-position: 0% 50%; }
+}
+
+@keyframes float {
+    0%, 100% { transform: translateY(0px); }
+    50% { transform: translateY(-20px); }
+}
+
+@keyframes pulse {
+    0%, 100% { transform: scale(1); }
+    50% { transform: scale(1.05); }
+}
+
+.hero-section {
+    text-align: center;
+    padding: 3rem 2rem;
+    margin-bottom: 3rem;
+    background: rgba(255, 255, 255, 0.15);
+    -webkit-backdrop-filter: blur(20px);
+    backdrop-filter: blur(20px);
+    border-radius: 30px;
+    border: 2px solid rgba(255, 255, 255, 0.3);
+    box-shadow: 
+        0 25px 50px -12px rgba(0, 0, 0, 0.25),
+        inset 0 1px 0 0 rgba(255, 255, 255, 0.2);
+}
+
+.hero-icon {
+    font-size: 5rem;
+    margin-bottom: 1rem;
+    animation: float 3s ease-in-out infinite;
+    display: inline-block;
+    filter: drop-shadow(0 10px 20px rgba(0, 0, 0, 0.3));
+}
+
+.hero-title {
+    font-family: 'Poppins', sans-serif;
+    font-size: 4rem;
+    font-weight: 900;
+    background: linear-gradient(135deg, #ffffff 0%, #a78bfa 50%, #ec4899 100%);
+    background-size: 200% 200%;
+    -webkit-background-clip: text;
+    -webkit-text-fill-color: transparent;
+    background-clip: text;
+    margin-bottom: 1rem;
+    animation: gradient-shift 5s ease infinite;
+    letter-spacing: -0.03em;
+    line-height: 1.2;
+    text-shadow: 0 0 40px rgba(167, 139, 250, 0.5);
+}
+
+.hero-subtitle {
+    font-family: 'Inter', sans-serif;
+    font-size: 1.5rem;
+    color: rgba(255, 255, 255, 0.95);
+    font-weight: 500;
+    margin-bottom: 0.5rem;
+    text-shadow: 0 2px 10px rgba(0, 0, 0, 0.3);
+    letter-spacing: 0.02em;
+}
+
+.hero-tagline {
+    font-family: 'Inter', sans-serif;
+    font-size: 1.1rem;
+    color: rgba(255, 255, 255, 0.8);
+    font-weight: 400;
+    max-width: 700px;
+    margin: 0 auto;
+    line-height: 1.6;
+    text-shadow: 0 2px 10px rgba(0, 0, 0, 0.2);
+}
+
+.feature-badge {
+    display: inline-block;
+    background: rgba(255, 255, 255, 0.2);
+    -webkit-backdrop-filter: blur(10px);
+    backdrop-filter: blur(10px);
+    border: 1px solid rgba(255, 255, 255, 0.3);
+    padding: 0.5rem 1.5rem;
+    border-radius: 50px;
+    margin: 0.5rem;
+    font-size: 0.9rem;
+    color: white;
+    font-weight: 600;
+    box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1);
+    transition: all 0.3s ease;
+}
+
+.feature-badge:hover {
+    background: rgba(255, 255, 255, 0.3);
+    transform: translateY(-2px);
+    box-shadow: 0 6px 12px rgba(0, 0, 0, 0.2);
+}
+
+.divider-line {
+    height: 2px;
+    background: linear-gradient(90deg, transparent, rgba(255, 255, 255, 0.5), transparent);
+    margin: 3rem 0;
+    border-radius: 2px;
+}
+</style>
+"""
+
+# ============================================
+# THEME ENGINE
+# Minify + bundle once per process, inject once per session
+# ============================================
+
+THEMES = {
+    'professional_blue': THEME_1_PROFESSIONAL_BLUE,
+    'modern_purple': THEME_2_MODERN_PURPLE,
+    'clean_teal': THEME_3_CLEAN_TEAL,
+    'dark_mode': THEME_4_DARK_MODE,
+    'minimal_grey': THEME_5_MINIMAL_GREY,
+    'bold_modern': THEME_6_BOLD_MODERN,
+}
+
+EXTRA_CSS = {
+    'hero': HERO_CSS,
+}
+
+# Web fonts the themes ask for. Installed copies are used via local(); drop
+# <Family>.woff2 files in static/fonts (with server.enableStaticServing) to self-host.
+WEB_FONTS = ('Inter', 'Poppins', 'Outfit', 'Plus Jakarta Sans')
+FONT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static', 'fonts')
+FONT_URL_PREFIX = 'app/static/fonts'
+
+_REMOTE_IMPORT = re.compile(r"@import\s+url\([^)]*\)\s*;")
+
+
+def minify_css(css: str) -> str:
+    """Strips <style> tags, comments and redundant whitespace."""
+    css = re.sub(r'</?style>', '', css)
+    css = re.sub(r'/\*.*?\*/', '', css, flags=re.S)
+    css = re.sub(r'\s+', ' ', css)
+    css = re.sub(r'\s*([{};,>])\s*', r'\1', css)
+    css = re.sub(r':\s+', ':', css)
+    return css.replace(';}', '}').strip()
+
+
+def _font_faces(css: str) -> str:
+    faces = []
+    for family in WEB_FONTS:
+        if f"'{family}'" not in css:
+            continue
+        sources = [f"local('{family}')"]
+        file_name = f"{family.replace(' ', '')}.woff2"
+        if os.path.exists(os.path.join(FONT_DIR, file_name)):
+            sources.append(f"url('{FONT_URL_PREFIX}/{file_name}') format('woff2')")
+        faces.append(f"@font-face{{font-family:'{family}';src:{','.join(sources)};"
+                     f"font-weight:300 800;font-display:swap}}")
+    return ''.join(faces)
+
+
+@lru_cache(maxsize=None)
+def build_theme_css(theme: str, extras: Tuple[str, ...] = ('hero',)) -> str:
+    """One minified stylesheet for the theme plus extras, with no remote font requests."""
+    css = _REMOTE_IMPORT.sub('', THEMES[theme] + ''.join(EXTRA_CSS[name] for name in extras))
+    return _font_faces(css) + minify_css(css)
+
+
+def inject_theme(theme: str = 'bold_modern', extras: Tuple[str, ...] = ('hero',)):
+    """
+    Adds the bundled theme to the page <head> on the first run of a session.
+    The <style> sits outside Streamlit's element tree, so later reruns keep it
+    without re-sending it; a new session (page load) injects it again.
+    """
+    import streamlit as st
+    import streamlit.components.v1 as components
+
+    signature = f"{theme}:{','.join(extras)}"
+    if st.session_state.get('_theme_injected') == signature:
+        return
+    css = json.dumps(build_theme_css(theme, tuple(extras))).replace('</', '<\\/')
+    components.html(f"""
+    <script>
+    const doc = window.parent.document;
+    let style = doc.getElementById('behaviour-support-theme');
+    if (!style) {{
+        style = doc.createElement('style');
+        style.id = 'behaviour-support-theme';
+        doc.head.appendChild(style);
+    }}
+    style.textContent = {css};
+    </script>
+    """, height=0)
+    st.session_state._theme_injected = signature
@@ -0,0 +1,277 @@
+"""
+Synthetic Incident Data for Behaviour Support App
+Vectorised NumPy generator for reproducible incident datasets, from the sandbox's
+70 mock rows up to millions of incidents across thousands of students.
+
+Usage: python synthetic_incidents.py --incidents 1000000 --students 2000 --out incidents.parquet
+"""
+
+import argparse
+from datetime import date, timedelta
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+# --- DEFAULT VOCABULARY (matches the sandbox apps) ---
+
+PROGRAMS = ['JP', 'PY', 'SY']
+PROGRAM_GRADES = {
+    'JP': ['R', 'Y1', 'Y2'],
+    'PY': ['Y3', 'Y4', 'Y5', 'Y6'],
+    'SY': ['Y7', 'Y8', 'Y9', 'Y10', 'Y11', 'Y12'],
+}
+BEHAVIOUR_TYPES = ['Verbal Refusal', 'Elopement', 'Property Destruction', 'Aggression (Peer)',
+                   'Aggression (Adult)', 'Self-Harm', 'Verbal Aggression', 'Other']
+ANTECEDENTS = ['Requested to transition', 'Given instruction/demand', 'Peer conflict', 'Staff attention shifted',
+               'Unstructured time', 'Sensory overload', 'Access denied', 'Change in routine', 'Difficult task']
+INTERVENTIONS = ['CPI Supportive stance', 'Offered break', 'Reduced demand', 'Provided choices', 'Removed audience',
+                 'Visual supports', 'Co-regulation', 'Prompted coping skill', 'Redirection']
+SUPPORT_TYPES = ['1:1 Individual Support', 'Independent', 'Small Group', 'Large Group']
+LOCATIONS = ['JP Classroom', 'PY Classroom', 'SY Classroom', 'Playground', 'Library', 'Admin', 'Gate', 'Toilets']
+STAFF_NAMES = ['Emily Jones', 'Daniel Lee', 'Sarah Chen']
+
+# --- DEFAULT DISTRIBUTIONS ---
+
+SEVERITY_WEIGHTS = {1: 20, 2: 35, 3: 25, 4: 15, 5: 5}
+HOUR_WEIGHTS = {9: 10, 10: 15, 11: 12, 12: 8, 13: 12, 14: 18, 15: 10}
+# Monday first; weekends almost empty
+WEEKDAY_WEIGHTS = [1.1, 1.0, 1.0, 1.0, 1.2, 0.02, 0.02]
+# January first; quieter in school holidays (Jan, Jul, Dec)
+MONTH_WEIGHTS = [0.2, 1.0, 1.1, 0.9, 1.0, 1.0, 0.4, 1.0, 1.1, 0.9, 1.0, 0.5]
+
+
+def _probabilities(weights: Sequence[float]) -> np.ndarray:
+    p = np.asarray(weights, dtype=float)
+    return p / p.sum()
+
+
+_HEX_PAIRS = np.array([f"{i:02x}" for i in range(256)], dtype='S2')
+# Positions of the 32 hex digits within the 36-character UUID text
+_UUID_HEX_POSITIONS = [i for i in range(36) if i not in (8, 13, 18, 23)]
+
+
+def _uuids(rng: np.random.Generator, n: int) -> np.ndarray:
+    """n version-4 UUID strings drawn from rng (reproducible for a seed), formatted without a Python loop."""
+    raw = rng.integers(0, 256, size=(n, 16), dtype=np.uint8)
+    raw[:, 6] = (raw[:, 6] & 0x0F) | 0x40  # version 4
+    raw[:, 8] = (raw[:, 8] & 0x3F) | 0x80  # RFC 4122 variant
+    digits = _HEX_PAIRS[raw].view('S1').reshape(n, 32)
+    text = np.full((n, 36), b'-', dtype='S1')
+    text[:, _UUID_HEX_POSITIONS] = digits
+    return text.view('S36').ravel().astype('U36').astype(object)
+
+
+def synthetic_students(n: int, programs: Sequence[str] = PROGRAMS, seed: Optional[int] = None) -> List[Dict[str, Any]]:
+    """n students with stable ids, names, programs, grades and EDIDs."""
+    rng = np.random.default_rng(seed)
+    program = rng.choice(list(programs), size=n)
+    ids = _uuids(rng, n)
+    return [
+        {
+            'id': str(ids[i]),
+            'name': f"Student {i + 1:05d}",
+            'grade': str(rng.choice(PROGRAM_GRADES.get(program[i], ['Y1']))),
+            'dob': (date(2008, 1, 1) + timedelta(days=int(rng.integers(0, 365 * 12)))).isoformat(),
+            'edid': f"SYN{i + 1:07d}",
+            'program': str(program[i]),
+        }
+        for i in range(n)
+    ]
+
+
+def generate_incident_frame(n: int, students: Optional[List[Dict[str, Any]]] = None, n_students: int = 1000,
+                            student_weights: Optional[Dict[str, float]] = None, student_skew: float = 1.1,
+                            start: Optional[date] = None, end: Optional[date] = None, days: int = 90,
+                            severity_weights: Dict[int, float] = SEVERITY_WEIGHTS,
+                            hour_weights: Dict[int, float] = HOUR_WEIGHTS,
+                            weekday_weights: Sequence[float] = WEEKDAY_WEIGHTS,
+                            month_weights: Sequence[float] = MONTH_WEIGHTS,
+                            behaviour_focus: float = 0.5,
+                            behaviours: Sequence[str] = BEHAVIOUR_TYPES, antecedents: Sequence[str] = ANTECEDENTS,
+                            interventions: Sequence[str] = INTERVENTIONS, support_types: Sequence[str] = SUPPORT_TYPES,
+                            locations: Sequence[str] = LOCATIONS, staff: Sequence[str] = STAFF_NAMES,
+                            seed: Optional[int] = None) -> pd.DataFrame:
+    """
+    n incidents as one DataFrame (categorical text columns), built with whole-array draws.
+
+    Students come from `students` (or n_students synthetic ones); their incident share
+    follows student_weights by id, else a Zipf-like curve with exponent student_skew.
+    Dates fall between start and end (default: the `days` before today) with
+    weekday x month seasonality; hours follow hour_weights. Each student has a
+    primary behaviour used for behaviour_focus of their incidents, so per-student
+    patterns exist for the analytics to find. The same seed gives the same data.
+    """
+    rng = np.random.default_rng(seed)
+    if students is None:
+        students = synthetic_students(n_students, seed=seed)
+    student_ids = np.array([s['id'] for s in students])
+    student_names = np.array([s.get('name', '') for s in students])
+
+    # Students
+    if student_weights:
+        weights = np.array([student_weights.get(s, 5) for s in student_ids], dtype=float)
+    else:
+        weights = 1.0 / np.arange(1, len(students) + 1) ** student_skew
+        rng.shuffle(weights)
+    student_idx = rng.choice(len(students), size=n, p=_probabilities(weights))
+
+    # Dates: weight every calendar day, then draw
+    end = end or date.today()
+    start = start or end - timedelta(days=days)
+    calendar = pd.date_range(start, end, freq='D')
+    day_weights = np.asarray(weekday_weights)[calendar.dayofweek] * np.asarray(month_weights)[calendar.month - 1]
+    dates = calendar.values[rng.choice(len(calendar), size=n, p=_probabilities(day_weights))]
+
+    hours = np.array(list(hour_weights))[rng.choice(len(hour_weights), size=n, p=_probabilities(list(hour_weights.values())))]
+    minutes = rng.integers(0, 60, size=n)
+    severity = np.array(list(severity_weights))[
+        rng.choice(len(severity_weights), size=n, p=_probabilities(list(severity_weights.values())))
+    ].astype('int8')
+
+    # Behaviour: the student's primary behaviour or a uniform draw
+    primary = rng.integers(0, len(behaviours), size=len(students))
+    behaviour_idx = np.where(rng.random(n) < behaviour_focus, primary[student_idx],
+                             rng.integers(0, len(behaviours), size=n))
+
+    def pick(values: Sequence[str]) -> pd.Categorical:
+        return pd.Categorical.from_codes(rng.integers(0, len(values), size=n), categories=list(values))
+
+    frame = pd.DataFrame({
+        'id': _uuids(rng, n),
+        'student_id': pd.Categorical.from_codes(student_idx, categories=pd.Index(student_ids)),
+        'student_name': pd.Categorical.from_codes(student_idx, categories=student_names)
+        if len(set(student_names)) == len(student_names) else student_names[student_idx],
+        'date_parsed': pd.DatetimeIndex(dates),
+        'hour': hours.astype('int8'),
+        'minute': minutes.astype('int8'),
+        'session': pd.Categorical(np.select([hours < 11, hours < 13], ['Morning', 'Middle'], 'Afternoon'),
+                                  categories=['Morning', 'Middle', 'Afternoon']),
+        'location': pick(locations),
+        'behaviour_type': pd.Categorical.from_codes(behaviour_idx, categories=list(behaviours)),
+        'antecedent': pick(antecedents),
+        'intervention': pick(interventions),
+        'support_type': pick(support_types),
+        'severity': severity,
+        'is_critical': severity >= 4,
+        'reported_by': pick(staff),
+        'duration_minutes': rng.integers(2, 26, size=n).astype('int8'),
+    })
+    return frame.sort_values(['date_parsed', 'hour', 'minute'], kind='stable').reset_index(drop=True)
+
+
+# --- OUTPUT ---
+
+# Production session windows (see get_session_window in app_fixed_visibility.py)
+SESSION_WINDOWS = [
+    (9 * 60, 11 * 60, 'Morning (9:00am - 11:00am)'),
+    (11 * 60 + 1, 13 * 60, 'Middle (11:01am - 1:00pm)'),
+    (13 * 60 + 1, 14 * 60 + 45, 'Afternoon (1:01pm - 2:45pm)'),
+]
+
+
+def incident_table(frame: pd.DataFrame, schema: str = 'db') -> pd.DataFrame:
+    """
+    The frame with string columns in the shape a consumer expects:
+    'db' = the incidents table, 'app' = the sandbox apps' session-state dicts.
+    """
+    minute_of_day = frame['hour'].astype(int).to_numpy() * 60 + frame['minute'].astype(int).to_numpy()
+    # 1,440 possible times: format each once and index
+    time_labels = np.array([f"{m // 60:02d}:{m % 60:02d}:00" for m in range(24 * 60)])
+    times = time_labels[minute_of_day]
+    # Likewise dates: format each distinct day once
+    date_codes, unique_dates = pd.factorize(frame['date_parsed'])
+    dates = pd.Categorical.from_codes(date_codes, categories=pd.Index(unique_dates.strftime('%Y-%m-%d')))
+    days = np.asarray(unique_dates.day_name(), dtype=object)[date_codes]
+
+    if schema == 'app':
+        return pd.DataFrame({
+            'id': frame['id'], 'student_id': frame['student_id'],
+            'student_name': frame['student_name'],
+            'date': dates, 'time': times, 'day': days, 'session': frame['session'],
+            'location': frame['location'], 'behaviour_type': frame['behaviour_type'],
+            'antecedent': frame['antecedent'], 'support_type': frame['support_type'],
+            'intervention': frame['intervention'], 'severity': frame['severity'].astype(int),
+            'reported_by': frame['reported_by'], 'description': 'Synthetic incident',
+            'is_critical': frame['is_critical'], 'duration_minutes': frame['duration_minutes'].astype(int),
+        })
+
+    session = np.full(len(frame), 'Outside School Hours (N/A)', dtype=object)
+    for low, high, label in SESSION_WINDOWS:
+        session[(minute_of_day >= low) & (minute_of_day <= high)] = label
+    return pd.DataFrame({
+        'id': frame['id'], 'student_id': frame['student_id'],
+        'incident_date': dates, 'incident_time': times, 'day_of_week': days, 'session': session,
+        'location': frame['location'], 'reported_by_name': frame['reported_by'],
+        'reported_by_role': 'Synthetic', 'is_special_staff': False,
+        'behaviour_type': frame['behaviour_type'], 'antecedent': frame['antecedent'],
+        'intervention': frame['intervention'], 'support_type': frame['support_type'],
+        'severity': frame['severity'].astype(int), 'description': 'Synthetic incident',
+        'is_critical': frame['is_critical'],
+    })
+
+
+def to_records(frame: pd.DataFrame, schema: str = 'app') -> List[Dict[str, Any]]:
+    return incident_table(frame, schema).to_dict('records')
+
+
+def iter_insert_batches(frame: pd.DataFrame, batch_size: int = 1000, schema: str = 'db') -> Iterator[List[Dict[str, Any]]]:
+    """Record lists ready for supabase.table('incidents').insert(batch)."""
+    table = incident_table(frame, schema)
+    for start in range(0, len(table), batch_size):
+        yield table.iloc[start:start + batch_size].to_dict('records')
+
+
+def _sql_literal(value: Any) -> str:
+    if value is None:
+        return 'NULL'
+    if isinstance(value, (bool, np.bool_)):
+        return 'TRUE' if value else 'FALSE'
+    if isinstance(value, (int, float, np.integer, np.floating)):
+        return str(value)
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def iter_sql_batches(records: pd.DataFrame, table: str = 'incidents', batch_size: int = 1000) -> Iterator[str]:
+    """Multi-row INSERT statements, batch_size rows each, for psql or the Supabase SQL editor."""
+    columns = ', '.join(records.columns)
+    for start in range(0, len(records), batch_size):
+        rows = records.iloc[start:start + batch_size].itertuples(index=False, name=None)
+        values = ',\n'.join('(' + ', '.join(_sql_literal(v) for v in row) + ')' for row in rows)
+        yield f"INSERT INTO {table} ({columns}) VALUES\n{values};\n"
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate a synthetic incident dataset.')
+    parser.add_argument('--incidents', type=int, default=100_000)
+    parser.add_argument('--students', type=int, default=1000)
+    parser.add_argument('--days', type=int, default=365)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--schema', choices=['db', 'app'], default='db')
+    parser.add_argument('--out', default='synthetic_incidents.parquet',
+                        help='.parquet, .csv or .sql (the .sql file also inserts the students)')
+    parser.add_argument('--batch-size', type=int, default=1000)
+    args = parser.parse_args()
+
+    students = synthetic_students(args.students, seed=args.seed)
+    frame = generate_incident_frame(args.incidents, students=students, days=args.days, seed=args.seed)
+    table = incident_table(frame, args.schema)
+
+    if args.out.endswith('.parquet'):
+        table.to_parquet(args.out, index=False)
+    elif args.out.endswith('.csv'):
+        table.to_csv(args.out, index=False)
+    elif args.out.endswith('.sql'):
+        with open(args.out, 'w') as f:
+            student_rows = pd.DataFrame(students).assign(profile_status='Complete', archived=False)
+            for statement in iter_sql_batches(student_rows, 'students', args.batch_size):
+                f.write(statement)
+            for statement in iter_sql_batches(table, 'incidents', args.batch_size):
+                f.write(statement)
+    else:
+        parser.error('--out must end in .parquet, .csv or .sql')
+    print(f"Wrote {len(table):,} incidents for {len(students):,} students to {args.out}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""
+Tests for the buffered audit_log writer
+Run with: python -m pytest test_audit_log.py
+"""
+
+import uuid
+
+from audit_log import AuditLogWriter, audit_diff
+
+RECORD_ID = str(uuid.uuid4())
+USER_ID = str(uuid.uuid4())
+
+
+class FlakyInsert:
+    """insert_batch that fails the first `failures` calls."""
+
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.batches = []
+
+    def __call__(self, rows):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError('database unreachable')
+        self.batches.append(list(rows))
+
+    @property
+    def rows(self):
+        return [row for batch in self.batches for row in batch]
+
+
+def test_update_records_only_changed_fields():
+    assert audit_diff({'a': 1, 'b': 2}, {'a': 1, 'b': 3}) == ({'b': 2}, {'b': 3})
+    insert = FlakyInsert()
+    writer = AuditLogWriter(insert)
+    assert writer.record('staff', RECORD_ID, 'UPDATE', old={'a': 1}, new={'a': 2}, changed_by=USER_ID)
+    assert not writer.record('staff', RECORD_ID, 'UPDATE', old={'a': 1}, new={'a': 1})
+    assert not writer.record('staff', 'not-a-uuid', 'INSERT', new={'a': 1})
+    assert writer.flush_once()
+    assert [(r['old_data'], r['new_data'], r['changed_by']) for r in insert.rows] == [({'a': 1}, {'a': 2}, USER_ID)]
+
+
+def test_failed_batch_is_retried_then_dropped():
+    insert = FlakyInsert(failures=2)
+    writer = AuditLogWriter(insert, max_attempts=3)
+    writer.record('staff', RECORD_ID, 'INSERT', new={'a': 1})
+    assert not writer.flush_once()
+    assert writer.pending_count() == 1
+    assert not writer.flush_once()
+    assert writer.flush_once()
+    assert len(insert.rows) == 1 and writer.stats()['written'] == 1
+
+    insert.failures = 3
+    writer.record('staff', RECORD_ID, 'DELETE', old={'a': 1})
+    for _ in range(3):
+        assert not writer.flush_once()
+    assert writer.pending_count() == 0
+    assert writer.stats()['dropped'] == 1
+
+
+def test_full_queue_drops_instead_of_blocking():
+    writer = AuditLogWriter(FlakyInsert(), max_queue=2)
+    accepted = [writer.record('staff', RECORD_ID, 'INSERT', new={'n': n}) for n in range(3)]
+    assert accepted == [True, True, False]
+    assert writer.stats()['dropped'] == 1
+
+
+def test_record_many_writes_directly_and_queues_on_failure():
+    records = [{'id': str(uuid.uuid4()), 'n': n} for n in range(450)]
+    insert = FlakyInsert()
+    writer = AuditLogWriter(insert, max_queue=10, batch_size=200)
+    assert writer.record_many('incidents', 'INSERT', records, changed_by=USER_ID) == 450
+    assert [len(batch) for batch in insert.batches] == [200, 200, 50]
+    assert [row['record_id'] for row in insert.rows] == [r['id'] for r in records]
+    assert writer.pending_count() == 0
+
+    insert.failures = 1
+    assert writer.record_many('incidents', 'DELETE', records[:5]) == 5
+    assert writer.pending_count() == 5
+    assert writer.flush_once()
+    assert insert.rows[-1]['old_data'] == records[4] and insert.rows[-1]['new_data'] is None
@@ -0,0 +1,47 @@
+"""
+Tests for the shared summary statistics behind reports and behaviour plans
+Run with: python -m pytest test_behaviour_analytics.py
+"""
+
+import pandas as pd
+
+from behaviour_analytics import summary_statistics
+from behaviour_plan_report import plan_findings, plan_statistics, prepare_plan_frame
+
+
+def quick_incident(severity, date, behaviour='Verbal Refusal'):
+    return {
+        'student_id': 's1', 'date': date, 'time': '10:00', 'location': 'Classroom',
+        'behaviour_type': behaviour, 'antecedent': 'Transition', 'session': 'Morning (9:01-11:00)',
+        'severity': severity, 'is_critical': severity >= 4,
+    }
+
+
+def test_plan_frame_counts_only_critical_reports():
+    # One quick incident is severity 4 (is_critical) but only the ABCH report is a critical incident
+    incidents = [quick_incident(2, '2024-03-01'), quick_incident(4, '2024-03-02'), quick_incident(3, '2024-03-03')]
+    critical = [{
+        'student_id': 's1', 'created_at': '2024-03-04T11:00:00',
+        'ABCH_primary': {'A': 'Transition', 'B': 'Physical Aggression'},
+        'location': 'Playground', 'session': 'Middle (11:31-13:10)',
+    }]
+    full_df = prepare_plan_frame('s1', incidents, critical)
+
+    stats = plan_statistics(full_df)
+    assert stats['total'] == 4
+    assert stats['critical_count'] == 1
+    assert stats['critical_rate'] == 25.0
+    assert plan_findings(full_df, stats)['risk_score'] == int(4 / 7 * 10 + 3.5 * 8 + 25.0 / 2)
+
+
+def test_is_critical_used_without_incident_type():
+    frame = pd.DataFrame({'severity': [2, 4, 5], 'is_critical': [False, True, None]})
+    assert summary_statistics(frame)['critical_count'] == 1
+
+
+def test_top_values_tie_break_alphabetically():
+    frame = pd.DataFrame({'location': pd.Categorical(['Zeta', 'Alpha', 'Zeta', 'Alpha', 'Beta'],
+                                                     categories=['Zeta', 'Beta', 'Alpha'])})
+    counts = summary_statistics(frame, columns=['location'])['counts']['location']
+    assert list(counts.index) == ['Alpha', 'Zeta', 'Beta']
+    assert summary_statistics(frame, columns=['location'])['top']['location'] == 'Alpha'
@@ -0,0 +1,132 @@
+"""
+Tests for the admin bulk incident import (parsing and validation)
+Run with: python -m pytest test_incident_import.py
+"""
+
+import io
+import sys
+import uuid
+
+import pandas as pd
+import pytest
+
+import benchmark_hot_paths
+from audit_log import AuditLogWriter
+from incident_store import IncidentStore
+
+STUDENT_ID = '9b0f6f5e-3f0a-4c41-9d8e-2f7f1d0c8a11'
+HEADER = 'EDID,Date,Time,Location,Behaviour,Antecedent,Intervention,Support Type,Severity,Reported By\n'
+
+
+@pytest.fixture(scope='module')
+def app(tmp_path_factory):
+    """The production app loaded against the Streamlit stub, with one student to match."""
+    saved = {name: module for name, module in sys.modules.items() if name.startswith('streamlit')}
+    with pytest.MonkeyPatch.context() as mp:
+        # The app opens app_errors.log in the working directory when it is imported
+        mp.chdir(tmp_path_factory.mktemp('app'))
+        st = benchmark_hot_paths.install_streamlit_stub()
+        try:
+            module = benchmark_hot_paths.load_app('app_fixed_visibility.py', 'app_under_test')
+        finally:
+            for name in [name for name in sys.modules if name.startswith('streamlit')]:
+                del sys.modules[name]
+            sys.modules.update(saved)
+    st.session_state.update({'students_list': [{'id': STUDENT_ID, 'edid': 'AB123', 'name': 'Sam'}], 'staff_list': []})
+    module.rebuild_session_index('students_list')
+    module.rebuild_session_index('staff_list')
+    return module
+
+
+def prepare(app, rows, seen_ids=None):
+    return app.prepare_incident_import(pd.read_csv(io.StringIO(HEADER + rows), dtype=str), 0, seen_ids)
+
+
+def test_iso_and_day_first_dates(app):
+    records, errors = prepare(app, (
+        'AB123,2024-03-05,10:15,JP Classroom,Verbal Refusal,Transition,Redirection,1:1,3,Jo\n'
+        'AB123,2024-03-25,10:15,JP Classroom,Verbal Refusal,Transition,Redirection,1:1,3,Jo\n'
+        'AB123,05/03/2024,11:15,JP Classroom,Verbal Refusal,Transition,Redirection,1:1,3,Jo\n'
+        'AB123,25/03/2024,11:15,JP Classroom,Verbal Refusal,Transition,Redirection,1:1,3,Jo\n'
+        'AB123,2024-03-26 00:00:00,10:15,JP Classroom,Verbal Refusal,Transition,Redirection,1:1,3,Jo\n'
+        'AB123,March 5th,10:15,JP Classroom,Verbal Refusal,Transition,Redirection,1:1,3,Jo\n'
+    ))
+    assert [r['incident_date'] for r in records] == ['2024-03-05', '2024-03-25', '2024-03-05', '2024-03-25', '2024-03-26']
+    assert [e['row'] for e in errors] == [7]
+
+
+def test_rejects_fractional_severity_and_missing_fields(app):
+    records, errors = prepare(app, (
+        'AB123,2024-03-05,10:15,JP Classroom,Verbal Refusal,Transition,Redirection,1:1,3.7,Jo\n'
+        'AB123,2024-03-05,10:15,JP Classroom,Verbal Refusal,,Redirection,,2,Jo\n'
+        'XX999,2024-03-05,10:15,JP Classroom,Verbal Refusal,Transition,Redirection,1:1,2,Jo\n'
+        'AB123,2024-03-05,10:15,JP Classroom,Verbal Refusal,Transition,Redirection,1:1,4.0,Jo\n'
+    ))
+    assert [(r['severity'], r['is_critical']) for r in records] == [(4, True)]
+    assert [e['row'] for e in errors] == [2, 3, 4]
+    assert 'whole number' in errors[0]['error']
+    assert errors[1]['error'] == 'Missing antecedent, support_type'
+
+
+def test_ids_are_stable_across_uploads_and_formats(app):
+    row = 'ab123,{date},10:15,JP Classroom,Verbal Refusal,Transition,Redirection,1:1,3,Jo\n'
+    first, _ = prepare(app, row.format(date='2024-03-05'))
+    again, _ = prepare(app, row.format(date='05/03/2024'))
+    assert first[0]['id'] == again[0]['id']
+    assert first[0]['student_id'] == STUDENT_ID
+
+    seen_ids = {}
+    records, errors = prepare(app, row.format(date='2024-03-05') * 2, seen_ids)
+    assert len(records) == 1
+    assert errors == [{'row': 3, 'edid': 'ab123', 'error': 'Duplicate of row 2'}]
+
+
+class FakeIncidentTable:
+    """Just enough of the Supabase client for insert_incident_batch: upsert ignoring known ids."""
+
+    def __init__(self):
+        self.ids = set()
+        self._new = []
+
+    def table(self, name):
+        return self
+
+    def upsert(self, rows, on_conflict=None, ignore_duplicates=False):
+        self._new = [row for row in rows if row['id'] not in self.ids]
+        return self
+
+    def execute(self):
+        self.ids.update(row['id'] for row in self._new)
+        return type('Response', (), {'data': [{'id': row['id']} for row in self._new]})()
+
+
+def test_import_audits_each_inserted_incident_once(app, monkeypatch):
+    written = []
+    client = FakeIncidentTable()
+    monkeypatch.setattr(app, 'get_supabase_client', lambda: client)
+    monkeypatch.setattr(app, 'get_audit_log', lambda: AuditLogWriter(written.extend))
+    monkeypatch.setattr(app, 'invalidate_shared_data', lambda table: None)
+    app.st.session_state.update({'incident_store': IncidentStore(), 'current_user': {'id': STUDENT_ID}})
+
+    records, _ = prepare(app, ''.join(
+        f'AB123,2024-03-{day:02d},10:15,JP Classroom,Verbal Refusal,Transition,Redirection,1:1,3,Jo\n'
+        for day in range(1, 21)
+    ))
+    app.import_incidents(records[:5])
+    assert app.import_incidents(records) == 20
+    assert sorted(row['record_id'] for row in written) == sorted(r['id'] for r in records)
+    assert {row['action'] for row in written} == {'INSERT'}
+    assert len(app.st.session_state.incident_store) == 20
+
+
+def test_resent_queue_batch_is_audited_once(app, monkeypatch):
+    writer = AuditLogWriter(lambda rows: None)
+    client = FakeIncidentTable()
+    monkeypatch.setattr(app, 'get_supabase_client', lambda: client)
+    monkeypatch.setattr(app, 'get_audit_log', lambda: writer)
+    rows = [{'id': str(uuid.uuid4()), 'student_id': STUDENT_ID} for _ in range(3)]
+
+    app.insert_queued_incidents(rows[:2])
+    # The first response was lost, so the queue sends the rows again with a new one
+    app.insert_queued_incidents(rows)
+    assert writer.pending_count() == 3
@@ -0,0 +1,127 @@
+"""
+Tests for the incident write-ahead queue (batching, splitting, backoff, dead letters)
+Run with: python -m pytest test_incident_queue.py
+"""
+
+import pytest
+
+from incident_queue import IncidentWriteQueue, is_permanent_error, is_transient_error
+
+
+class APIError(Exception):
+    """Shaped like postgrest's APIError: `code` is a SQLSTATE, or the HTTP status."""
+
+    def __init__(self, code):
+        super().__init__(f"error {code}")
+        self.code = code
+
+
+class FakeBackend:
+    """insert_batch that rejects 'bad'/'flaky' rows, or every call while down."""
+
+    def __init__(self):
+        self.down = False
+        self.calls = []
+        self.inserted = []
+
+    def __call__(self, rows):
+        self.calls.append(len(rows))
+        if self.down:
+            raise ConnectionError('unreachable')
+        if any(row.get('bad') for row in rows):
+            raise APIError('23502')
+        if any(row.get('flaky') for row in rows):
+            raise APIError('XX000')
+        self.inserted.extend(rows)
+
+
+@pytest.fixture
+def backend():
+    return FakeBackend()
+
+
+@pytest.fixture
+def make_queue(tmp_path, backend):
+    dead = []
+
+    def make(flush_interval=0.0, **kwargs):
+        queue = IncidentWriteQueue(str(tmp_path / 'queue.sqlite3'), backend, on_dead=dead.extend,
+                                   flush_interval=flush_interval, **kwargs)
+        queue.dead = dead
+        return queue
+    return make
+
+
+def test_error_classification():
+    assert is_transient_error(ConnectionError()) and not is_permanent_error(ConnectionError())
+    assert is_transient_error(APIError(503)) and not is_permanent_error(APIError(503))
+    assert is_permanent_error(APIError(400)) and is_permanent_error(APIError('23505'))
+    assert is_permanent_error(APIError('PGRST204'))
+    assert not is_permanent_error(APIError('XX000')) and not is_transient_error(APIError('XX000'))
+
+
+def test_enqueue_assigns_id_and_flushes_in_batches(make_queue, backend):
+    queue = make_queue(batch_size=2)
+    records = [queue.enqueue({'n': n}) for n in range(3)]
+    assert all(record['id'] for record in records)
+    assert queue.flush_once() == 2
+    assert queue.flush_once() == 1
+    assert [row['id'] for row in backend.inserted] == [record['id'] for record in records]
+    assert queue.stats()['pending'] == 0
+
+
+def test_unreachable_backend_backs_off_whole_batch(make_queue, backend):
+    queue = make_queue(max_attempts=1)
+    for n in range(4):
+        queue.enqueue({'n': n})
+    backend.down = True
+    assert queue.flush_once() == 0
+    # Not split and never dead-lettered, however often it fails
+    assert backend.calls == [4]
+    assert queue.stats()['pending'] == 4 and queue.stats()['dead'] == 0
+
+
+def test_failed_rows_wait_for_their_backoff(make_queue, backend):
+    queue = make_queue(flush_interval=60)
+    queue.enqueue({'n': 0})
+    backend.down = True
+    assert queue.flush_once() == 0
+    backend.down = False
+    # Not due again for flush_interval seconds
+    assert queue.flush_once() == 0
+    assert backend.calls == [1] and queue.stats()['pending'] == 1
+
+
+def test_rejected_row_is_isolated_and_dead_lettered(make_queue, backend):
+    queue = make_queue()
+    records = [queue.enqueue({'n': n, 'bad': n == 5}) for n in range(8)]
+    assert queue.flush_once() == 7
+    assert sorted(row['n'] for row in backend.inserted) == [0, 1, 2, 3, 4, 6, 7]
+    assert [row['id'] for row in queue.dead] == [records[5]['id']]
+    assert queue.stats()['pending'] == 0 and queue.stats()['dead'] == 1
+    assert queue.dead_letters()[0]['record']['n'] == 5
+
+
+def test_row_rejected_with_retryable_error_dies_after_max_attempts(make_queue, backend):
+    queue = make_queue(max_attempts=3)
+    queue.enqueue({'n': 0, 'flaky': True})
+    for _ in range(2):
+        assert queue.flush_once() == 0
+        assert queue.stats()['pending'] == 1
+    assert queue.flush_once() == 0
+    assert queue.stats()['pending'] == 0
+    assert queue.dead_letters()[0]['attempts'] == 3
+
+
+def test_dead_letters_can_be_requeued_or_discarded(make_queue, backend):
+    queue = make_queue()
+    first = queue.enqueue({'n': 0, 'bad': True})
+    second = queue.enqueue({'n': 1, 'bad': True})
+    queue.flush_once()
+    assert queue.stats()['dead'] == 2
+
+    assert queue.discard_dead([second['id']]) == 1
+    assert queue.requeue_dead() == 1
+    assert [record['id'] for record in queue.pending_records()] == [first['id']]
+    assert queue.flush_once() == 0
+    assert queue.stats()['dead'] == 1
@@ -0,0 +1,72 @@
+"""
+Tests for the columnar incident store
+Run with: python -m pytest test_incident_store.py
+"""
+
+import threading
+import uuid
+
+from incident_store import IncidentStore
+
+
+def incident(incident_id=None, student_id='s1', updated_at='2024-03-01T00:00:00', severity=2):
+    return {
+        'id': incident_id or str(uuid.uuid4()), 'student_id': student_id,
+        'incident_date': '2024-03-01', 'incident_time': '10:00:00', 'severity': severity,
+        'updated_at': updated_at,
+    }
+
+
+def test_upsert_replaces_changed_rows_and_skips_unchanged():
+    rows = [incident() for _ in range(3)]
+    store = IncidentStore.from_records(rows)
+    changed = dict(rows[0], severity=5, updated_at='2024-03-02T00:00:00')
+    assert store.upsert([rows[1], changed, incident()]) == 2
+    frame = store.frame
+    assert len(frame) == 4 and frame['id'].is_unique
+    assert frame.set_index('id').loc[rows[0]['id'], 'severity'] == 5
+
+
+def test_upsert_keeps_last_row_per_duplicate_id():
+    row = incident()
+    store = IncidentStore.from_records([incident()])
+    # An optimistic copy appended next to the database row
+    store.append([row, dict(row)])
+    assert store.upsert([dict(row, severity=3, updated_at='a'), dict(row, severity=4, updated_at='b')]) == 1
+    frame = store.frame
+    assert len(frame) == 2 and frame['id'].is_unique
+    assert frame.set_index('id').loc[row['id'], 'severity'] == 4
+
+
+def test_remove_and_student_slices():
+    rows = [incident(student_id=f's{n % 3}') for n in range(9)]
+    store = IncidentStore.from_records(rows)
+    assert len(store.for_student('s1')) == 3
+    assert store.remove([rows[1]['id'], 'missing']) == 1
+    assert len(store.for_student('s1')) == 2
+    assert list(store.for_student('s1')['student_id'].cat.categories) == ['s1']
+
+
+def test_concurrent_appends_and_upserts_lose_no_rows():
+    store = IncidentStore.from_records([incident() for _ in range(100)])
+    appended = [incident() for _ in range(300)]
+    upserted = [incident() for _ in range(300)]
+
+    def append():
+        for row in appended:
+            store.append([row])
+
+    def upsert():
+        for start in range(0, len(upserted), 10):
+            store.upsert(upserted[start:start + 10])
+
+    def read():
+        for _ in range(50):
+            store.for_student('s1')
+
+    threads = [threading.Thread(target=target) for target in (append, upsert, read, read)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(store.frame) == 700 and store.frame['id'].is_unique